@@ -8,14 +8,36 @@ This package contains all the specialized agents for market research:
 - DecisionAgent: Final recommendation synthesis
 """
 
-from .incumbents_agent import IncumbentsAgent
-from .funding_agent import FundingAgent
-from .growth_agent import GrowthAgent
-from .decision_agent import DecisionAgent
+import importlib
+
+# Agents are imported on first access, so importing a helper module such as
+# agents.keywords does not load every agent
+_LAZY_EXPORTS = {
+    'IncumbentsAgent': '.incumbents_agent',
+    'FundingAgent': '.funding_agent',
+    'GrowthAgent': '.growth_agent',
+    'DecisionAgent': '.decision_agent',
+    'FusedAgent': '.fused_agent',
+    'MicroBatchAgent': '.micro_batch_agent'
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
 
 __all__ = [
     'IncumbentsAgent',
     'FundingAgent', 
     'GrowthAgent',
-    'DecisionAgent'
+    'DecisionAgent',
+    'FusedAgent',
+    'MicroBatchAgent'
 ]
@@ -4,48 +4,299 @@ Base Agent Class
 Provides common functionality for all market research agents.
 """
 
-import openai
-from typing import Dict, Any
-from config import OPENAI_API_KEY, OPENAI_MODEL
+import time
+from typing import TYPE_CHECKING, Dict, Any, Callable, Optional, Tuple
+from config import OPENAI_MODEL, STREAM_RESPONSES
+from .cache import ResponseCache, get_response_cache
+from .client import get_shared_client
+from .retry import (
+    RetryPolicy, DeadlineExceeded, StreamInterrupted, get_latency_tracker, retry_after_seconds
+)
+from .rate_limiter import RateLimiter, RESEARCH_PRIORITY, get_rate_limiter
+from .circuit_breaker import CircuitBreaker, CircuitOpen, get_circuit_breaker
+from .tokens import estimate_tokens, estimate_request_tokens, estimate_cost
+from .keywords import KeywordMatcher
+
+if TYPE_CHECKING:
+    import openai
 
 
 class BaseAgent:
     """Base class for all market research agents"""
     
-    def __init__(self, name: str, system_prompt: str):
+    # Scheduling priority with the rate limiter (lower goes first)
+    request_priority = RESEARCH_PRIORITY
+    
+    # Result field holding the generated text
+    output_field = "analysis"
+    
+    # Keyword indicators for the confidence heuristic
+    CONFIDENCE_KEYWORDS = ("likely", "evidence", "data", "research", "analysis")
+    UNCERTAINTY_KEYWORDS = ("unclear", "uncertain", "difficult", "limited")
+    keyword_matcher = KeywordMatcher({
+        "confidence": CONFIDENCE_KEYWORDS,
+        "uncertainty": UNCERTAINTY_KEYWORDS
+    })
+    
+    def __init__(self, name: str, system_prompt: str, cache: Optional[ResponseCache] = None,
+                 client: Optional["openai.OpenAI"] = None, retry_policy: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[RateLimiter] = None, stream: Optional[bool] = None,
+                 model: Optional[str] = None, circuit_breaker: Optional[CircuitBreaker] = None):
         self.name = name
         self.system_prompt = system_prompt
-        self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        self.model = model or OPENAI_MODEL
+        self._client = client  # the shared client is fetched on the first API call
+        self.cache = cache if cache is not None else get_response_cache()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else get_circuit_breaker()
+        self.stream = STREAM_RESPONSES if stream is None else stream
+    
+    @property
+    def client(self) -> "openai.OpenAI":
+        """The OpenAI client, falling back to the shared one on first use"""
+        if self._client is None:
+            self._client = get_shared_client()
+        return self._client
+    
+    @client.setter
+    def client(self, client: "openai.OpenAI"):
+        self._client = client
     
-    def research(self, product_idea: str) -> Dict[str, Any]:
-        """Main research method - to be implemented by subclasses"""
+    def run(self, product_idea: str, inputs: Dict[str, str],
+            on_chunk: Optional[Callable[[str], None]] = None, model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run this agent as a pipeline step, given the output text of its
+        upstream agents. model overrides the agent's own for this run.
+        """
+        return self.research(product_idea, on_chunk=on_chunk, context=inputs, model=model)
+    
+    def research(self, product_idea: str, on_chunk: Optional[Callable[[str], None]] = None,
+                 context: Optional[Dict[str, str]] = None, model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Main research method - to be implemented by subclasses
+        
+        Pass on_chunk to stream the analysis text as it is generated, and
+        context to include other agents' analyses (by agent name) in the prompt.
+        """
+        user_message = f"Research this product idea: {product_idea}"
+        for agent_name, analysis in (context or {}).items():
+            user_message += f"\n\n{agent_name.upper()} ANALYSIS:\n{analysis}"
+        
+        metrics = {}
         try:
-            response = self.client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": f"Research this product idea: {product_idea}"}
-                ],
+            content = self._complete(
+                user_message,
                 temperature=0.7,
-                max_tokens=500
+                max_tokens=500,
+                metrics=metrics,
+                on_chunk=on_chunk,
+                model=model
             )
+            return self.build_result(product_idea, content, metrics)
+        except Exception as e:
+            metrics["error"] = type(e).__name__
+            status = "circuit_open" if isinstance(e, CircuitOpen) else "error"
+            return self.failed_result(product_idea, f"Error: {str(e)}", status=status, metrics=metrics)
+    
+    def build_result(self, product_idea: str, content: str, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """Result of a run that produced content"""
+        return {
+            "agent": self.name,
+            "product_idea": product_idea,
+            "analysis": content,
+            "confidence": self._calculate_confidence(content),
+            "status": "ok",
+            "metrics": metrics
+        }
+    
+    def failed_result(self, product_idea: str, message: str, status: str = "error",
+                      metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Result of a run that produced no text: it failed ("error"), the
+        circuit breaker refused the call ("circuit_open") or the pipeline
+        skipped it ("skipped")
+        """
+        return {
+            "agent": self.name,
+            "product_idea": product_idea,
+            self.output_field: message,
+            "confidence": 0.0,
+            "status": status,
+            "metrics": metrics if metrics is not None else {}
+        }
+    
+    def _complete(self, user_message: str, temperature: float, max_tokens: int,
+                  metrics: Dict[str, Any], on_chunk: Optional[Callable[[str], None]] = None,
+                  response_format: Optional[Dict[str, Any]] = None, model: Optional[str] = None,
+                  validate: Optional[Callable[[str], Any]] = None) -> str:
+        """
+        Run one chat completion for this agent's system prompt.
+        
+        Responses are served from and stored in the response cache when one
+        is configured. API calls run under the retry policy, so they respect
+        AGENT_TIMEOUT and MAX_RETRIES. When streaming (self.stream or an
+        on_chunk callback), text is forwarded to on_chunk as it arrives.
+        Details of the call (wall and queue time, tokens, estimated cost,
+        retries, cache status) are written into metrics, even when it fails.
+        While the circuit breaker is open, cache misses raise CircuitOpen
+        without calling the API.
+        response_format is passed to the API as is (e.g. {"type": "json_object"}).
+        model defaults to the agent's own.
+        validate, when given, raises for a reply the caller cannot use: such
+        a reply is never cached, and a cached one is not served.
+        """
+        start_time = time.monotonic()
+        model = model or self.model
+        metrics["model"] = model
+        try:
+            return self._complete_with_cache(user_message, temperature, max_tokens, metrics, on_chunk,
+                                             response_format, model, validate)
+        finally:
+            metrics["wall_time"] = round(time.monotonic() - start_time, 3)
+    
+    def _complete_with_cache(self, user_message: str, temperature: float, max_tokens: int,
+                             metrics: Dict[str, Any], on_chunk: Optional[Callable[[str], None]],
+                             response_format: Optional[Dict[str, Any]] = None,
+                             model: str = OPENAI_MODEL,
+                             validate: Optional[Callable[[str], Any]] = None) -> str:
+        """The body of _complete: cache lookup, then a rate-limited, retried API call"""
+        cache_key = None
+        metrics["cache"] = "off"
+        if self.cache is not None:
+            cache_key = self.cache.make_key(model, self.system_prompt, user_message,
+                                            temperature, max_tokens)
+            cached, metrics["cache"] = self.cache.get(cache_key)
+            if cached is not None and validate is not None and not self._valid(cached, validate):
+                cached, metrics["cache"] = None, "miss"
+            if cached is not None:
+                # Served locally, so nothing was spent
+                metrics.update(prompt_tokens=0, completion_tokens=0, cost_usd=0.0)
+                if on_chunk is not None:
+                    on_chunk(cached)
+                return cached
+        
+        # Deferred so that constructing agents never loads the OpenAI SDK; the
+        # shared client is built here on the very first API call
+        import openai
+        client = self.client
+        
+        stream = self.stream or on_chunk is not None
+        stream_args = {"stream": True, "stream_options": {"include_usage": True}} if stream else {}
+        if response_format is not None:
+            stream_args["response_format"] = response_format
+        estimated_tokens = estimate_request_tokens([self.system_prompt, user_message], max_tokens)
+        metrics["queue_time"] = 0.0
+        
+        def create(timeout: float):
+            # Every attempt, including retries and hedges, is budgeted separately
+            waited = self.rate_limiter.acquire(estimated_tokens, self.request_priority, timeout)
+            metrics["queue_time"] = round(metrics["queue_time"] + waited, 3)
+            if timeout - waited <= 0:
+                raise DeadlineExceeded("No time left after waiting for rate limit budget")
+            
+            request_start = time.monotonic()
+            try:
+                response = client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": self.system_prompt},
+                        {"role": "user", "content": user_message}
+                    ],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=timeout - waited,
+                    **stream_args
+                )
+            except openai.RateLimitError as e:
+                # Hold back every caller instead of letting each one retry into the 429
+                self.rate_limiter.pause(retry_after_seconds(e) or 1.0)
+                raise
             
-            content = response.choices[0].message.content
-            return {
-                "agent": self.name,
-                "product_idea": product_idea,
-                "analysis": content,
-                "confidence": self._calculate_confidence(content)
-            }
+            if stream:
+                return self._read_stream(response, on_chunk, metrics, request_start,
+                                         request_start + timeout - waited)
+            return response.choices[0].message.content, response.usage
+        
+        latencies = get_latency_tracker(f"{self.name}:{model}")
+        self.circuit_breaker.before_call()
+        try:
+            # Two hedged streams would both forward their chunks, so never hedge a stream
+            content, usage = self.retry_policy.call(create, latencies, metrics,
+                                                    hedge=False if stream else None)
+        except Exception as e:
+            self.circuit_breaker.after_call(e)
+            raise
+        self.circuit_breaker.after_call()
+        
+        if usage is not None:
+            self.rate_limiter.settle(estimated_tokens, usage.total_tokens)
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+        else:
+            # Some servers omit usage; fall back to the local estimate
+            prompt_tokens = estimated_tokens - max_tokens
+            completion_tokens = estimate_tokens(content or "")
+            metrics["usage_estimated"] = True
+        metrics["prompt_tokens"] = prompt_tokens
+        metrics["completion_tokens"] = completion_tokens
+        metrics["cost_usd"] = estimate_cost(model, prompt_tokens, completion_tokens)
+        
+        if validate is not None:
+            validate(content)
+        if cache_key is not None and content:
+            self.cache.put(cache_key, content)
+        return content
+    
+    @staticmethod
+    def _valid(content: str, validate: Callable[[str], Any]) -> bool:
+        try:
+            validate(content)
+        except Exception:
+            return False
+        return True
+    
+    def _read_stream(self, stream, on_chunk: Optional[Callable[[str], None]],
+                     metrics: Dict[str, Any], start_time: float, deadline: float) -> Tuple[str, Any]:
+        """
+        Consume a streamed completion, forwarding text chunks as they arrive.
+        
+        Records time-to-first-token (from the start of the request) and the
+        generation time after it. Returns the assembled text and the usage
+        reported in the final chunk.
+        """
+        parts = []
+        usage = None
+        first_token_time = None
+        try:
+            for chunk in stream:
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                
+                text = chunk.choices[0].delta.content
+                if first_token_time is None:
+                    first_token_time = time.monotonic()
+                    metrics["ttft"] = round(first_token_time - start_time, 3)
+                parts.append(text)
+                if on_chunk is not None:
+                    on_chunk(text)
+                
+                if time.monotonic() > deadline:
+                    raise DeadlineExceeded("Stream did not finish before the deadline")
         except Exception as e:
-            return {
-                "agent": self.name,
-                "product_idea": product_idea,
-                "analysis": f"Error: {str(e)}",
-                "confidence": 0.0
-            }
+            if parts and not isinstance(e, DeadlineExceeded):
+                # Text has already been forwarded, so a retry would repeat it
+                raise StreamInterrupted(f"Stream interrupted: {str(e)}") from e
+            raise
+        finally:
+            stream.close()
+        
+        metrics["generation_time"] = round(time.monotonic() - (first_token_time or start_time), 3)
+        return "".join(parts), usage
     
-    def _calculate_confidence(self, analysis: str) -> float:
+    def _calculate_confidence(self, analysis: str,
+                              keyword_counts: Optional[Dict[str, int]] = None) -> float:
         """
         Simple confidence calculation based on response length and keywords.
         
@@ -53,17 +304,19 @@ class BaseAgent:
         1. Length-based scoring (longer responses tend to be more detailed)
         2. Keyword analysis (academic/research terms vs uncertainty terms)
 
+        keyword_counts may be passed in from an earlier keyword_matcher scan
+        of the same text to avoid scanning it again.
         """
         if not analysis or len(analysis) < 50:
             return 0.3
         
         # Simple keyword-based confidence indicators
         # This is a basic heuristic - could be improved with semantic analysis
-        confidence_keywords = ["likely", "evidence", "data", "research", "analysis"]
-        uncertainty_keywords = ["unclear", "uncertain", "difficult", "limited"]
+        if keyword_counts is None:
+            keyword_counts = self.keyword_matcher.scan(analysis)
         
-        confidence_score = len([w for w in confidence_keywords if w in analysis.lower()])
-        uncertainty_score = len([w for w in uncertainty_keywords if w in analysis.lower()])
+        confidence_score = keyword_counts["confidence"]
+        uncertainty_score = keyword_counts["uncertainty"]
         
         base_confidence = min(0.9, len(analysis) / 300)
         keyword_adjustment = (confidence_score - uncertainty_score) * 0.1
@@ -0,0 +1,169 @@
+"""
+Response Cache
+
+Persistent SQLite cache for chat completions, with TTL and size-based eviction.
+"""
+
+import os
+import time
+import json
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, Tuple
+import config
+from config import CACHE_ENABLED, CACHE_PATH, CACHE_TTL, CACHE_MAX_ENTRIES
+
+
+class ResponseCache:
+    """
+    On-disk cache of completion text keyed on the full request.
+
+    Modes:
+    - "use": read from and write to the cache (default)
+    - "refresh": skip lookups but store fresh responses, overwriting old ones
+    - "bypass": neither read nor write
+    """
+
+    MODES = ("use", "refresh", "bypass")
+    EVICTION_INTERVAL = 100  # writes between size-based eviction passes
+
+    def __init__(self, path: str = CACHE_PATH, ttl: Optional[float] = CACHE_TTL,
+                 max_entries: Optional[int] = CACHE_MAX_ENTRIES, mode: Optional[str] = None):
+        mode = mode if mode is not None else config.CACHE_MODE
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " content TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_message: str,
+                 temperature: float, max_tokens: int) -> str:
+        """
+        Build the cache key for a request.
+
+        The system prompt is included by hash, so editing an agent's prompt
+        invalidates all of its old entries.
+        """
+        prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        payload = json.dumps([model, prompt_hash, user_message, temperature, max_tokens])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Tuple[Optional[str], str]:
+        """Look up a response, returning (content or None, cache status)"""
+        if self.mode != "use":
+            return None, self.mode
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None, "miss"
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0], "hit"
+
+    def put(self, key: str, content: str):
+        """Store a response unless the cache is bypassed"""
+        if self.mode == "bypass":
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, content, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)", (key, content, now, now)
+            )
+            self._conn.commit()
+            self._writes += 1
+            run_eviction = self._writes % self.EVICTION_INTERVAL == 0
+
+        if run_eviction:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then the least recently used beyond max_entries"""
+        removed = 0
+        with self._lock:
+            if self.ttl is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+                )
+                removed += cursor.rowcount
+
+            if self.max_entries is not None:
+                count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if count > self.max_entries:
+                    cursor = self._conn.execute(
+                        "DELETE FROM responses WHERE key IN ("
+                        " SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+                    removed += cursor.rowcount
+
+            self._conn.commit()
+        return removed
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cumulative hit/miss counters for this cache instance"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries
+        }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache used by agents that are not given one explicitly"""
+    global _shared_cache
+    if not CACHE_ENABLED:
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache()
+        return _shared_cache
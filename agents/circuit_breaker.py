@@ -0,0 +1,205 @@
+"""
+Circuit Breaker
+
+Process-wide breaker around API completion calls. While the API looks down
+(an outage, an invalid key), calls fail at once instead of each waiting for
+its own timeout.
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, Callable, Optional
+from config import (
+    CIRCUIT_BREAKER_ENABLED, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_ERROR_RATE, CIRCUIT_WINDOW,
+    CIRCUIT_MIN_CALLS, CIRCUIT_COOLDOWN, CIRCUIT_PROBE_CALLS
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Receives every state change as {"from", "to", "reason", "time"}
+TransitionListener = Callable[[Dict[str, Any]], None]
+
+
+class CircuitOpen(Exception):
+    """Raised instead of making a call the breaker does not let through"""
+
+    def __init__(self, message: str, retry_in: float):
+        super().__init__(message)
+        self.retry_in = retry_in  # seconds until the breaker probes again (0 while probing)
+
+
+def counts_as_failure(error: Exception) -> bool:
+    """
+    Whether a failed call says the API is unhealthy. A request rejected as
+    invalid does not; connection failures, timeouts, server errors, rate
+    limits that outlasted the retries and authentication errors do.
+    """
+    if isinstance(error, CircuitOpen):
+        return False
+    import openai
+    return not isinstance(error, (openai.BadRequestError, openai.UnprocessableEntityError))
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through. The breaker opens after failure_threshold
+    consecutive failures, or once error_rate of the last `window` calls
+    failed (counted from min_calls calls on).
+
+    Open: calls raise CircuitOpen until cooldown seconds have passed.
+
+    Half-open: up to probe_calls calls go through at once. A success closes
+    the breaker, a failure opens it for another cooldown.
+
+    Every allowed call must be reported with after_call. clock returns the
+    current time in seconds (tests pass a fake one).
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 error_rate: float = CIRCUIT_ERROR_RATE, window: int = CIRCUIT_WINDOW,
+                 min_calls: int = CIRCUIT_MIN_CALLS, cooldown: float = CIRCUIT_COOLDOWN,
+                 probe_calls: int = CIRCUIT_PROBE_CALLS, enabled: bool = CIRCUIT_BREAKER_ENABLED,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.probe_calls = probe_calls
+        self.enabled = enabled
+        self.clock = clock
+        self._state = CLOSED
+        self._outcomes = deque(maxlen=window)  # True for a failed call
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._counts = {"opened": 0, "rejected": 0}
+        self._listeners = []
+        # Reentrant, so listeners may read the breaker while being notified
+        self._condition = threading.Condition(threading.RLock())
+
+    @property
+    def state(self) -> str:
+        with self._condition:
+            self._check_cooldown()
+            return self._state
+
+    def subscribe(self, listener: TransitionListener) -> TransitionListener:
+        """Call listener on every state change (on the thread that caused it)"""
+        with self._condition:
+            self._listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener: TransitionListener):
+        with self._condition:
+            self._listeners.remove(listener)
+
+    def before_call(self):
+        """Raise CircuitOpen unless a call may be made now"""
+        if not self.enabled:
+            return
+        with self._condition:
+            self._check_cooldown()
+            if self._state == OPEN:
+                self._counts["rejected"] += 1
+                retry_in = self._retry_in()
+                raise CircuitOpen(f"Circuit breaker open, API calls paused for {retry_in:.1f}s", retry_in)
+            if self._state == HALF_OPEN:
+                if self._probes >= self.probe_calls:
+                    self._counts["rejected"] += 1
+                    raise CircuitOpen("Circuit breaker half-open, waiting for a probe call", 0.0)
+                self._probes += 1
+
+    def after_call(self, error: Optional[Exception] = None):
+        """Report the outcome of a call before_call let through (error None for success)"""
+        if not self.enabled:
+            return
+        failure = error is not None and counts_as_failure(error)
+        with self._condition:
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if failure:
+                    self._open(f"probe call failed ({type(error).__name__})")
+                elif error is None:
+                    self._transition(CLOSED, "probe call succeeded")
+                return
+            if self._state == OPEN or (error is not None and not failure):
+                return  # started before the breaker opened, or says nothing about the API
+
+            self._outcomes.append(failure)
+            self._consecutive_failures = self._consecutive_failures + 1 if failure else 0
+            if not failure:
+                return
+            failed = sum(self._outcomes)
+            if self._consecutive_failures >= self.failure_threshold:
+                self._open(f"{self._consecutive_failures} consecutive failures ({type(error).__name__})")
+            elif len(self._outcomes) >= self.min_calls and failed / len(self._outcomes) >= self.error_rate:
+                self._open(f"{failed} of the last {len(self._outcomes)} calls failed")
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> float:
+        """Block while the breaker is open (at most timeout seconds); returns the seconds waited"""
+        start_time = self.clock()
+        deadline = start_time + timeout if timeout is not None else None
+        with self._condition:
+            while True:
+                self._check_cooldown()
+                if self._state != OPEN:
+                    break
+                wait = self._retry_in()
+                if deadline is not None:
+                    wait = min(wait, deadline - self.clock())
+                    if wait <= 0:
+                        break
+                self._condition.wait(wait)
+        return self.clock() - start_time
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and counters, for monitoring"""
+        with self._condition:
+            self._check_cooldown()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "recent_error_rate": (round(sum(self._outcomes) / len(self._outcomes), 3)
+                                      if self._outcomes else None),
+                "retry_in": round(self._retry_in(), 3) if self._state == OPEN else None,
+                "opened_total": self._counts["opened"],
+                "rejected_total": self._counts["rejected"]
+            }
+
+    def _retry_in(self) -> float:
+        return max(0.0, self._opened_at + self.cooldown - self.clock())
+
+    def _check_cooldown(self):
+        if self._state == OPEN and self._retry_in() <= 0:
+            self._transition(HALF_OPEN, f"cooldown of {self.cooldown}s over")
+
+    def _open(self, reason: str):
+        self._opened_at = self.clock()
+        self._counts["opened"] += 1
+        self._transition(OPEN, reason)
+
+    def _transition(self, state: str, reason: str):
+        previous, self._state = self._state, state
+        self._outcomes.clear()
+        self._consecutive_failures = 0
+        self._probes = 0
+        self._condition.notify_all()
+        change = {"from": previous, "to": state, "reason": reason, "time": round(time.time(), 3)}
+        for listener in list(self._listeners):
+            listener(change)
+
+
+_shared_breaker = None
+_shared_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """The process-wide breaker shared by every agent"""
+    global _shared_breaker
+    with _shared_breaker_lock:
+        if _shared_breaker is None:
+            _shared_breaker = CircuitBreaker()
+        return _shared_breaker
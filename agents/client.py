@@ -0,0 +1,133 @@
+"""
+OpenAI Client Factory
+
+Builds pooled OpenAI clients that are shared by every agent, and tracks how
+often their HTTP connections are reused.
+"""
+
+import threading
+import warnings
+import importlib.util
+from typing import TYPE_CHECKING, Dict, Any, Optional
+import config
+from config import HTTP_POOL_SIZE, HTTP_KEEPALIVE_EXPIRY, HTTP2_ENABLED
+
+if TYPE_CHECKING:
+    import openai
+
+
+class ConnectionStats:
+    """
+    Counts requests and newly opened connections for one HTTP client.
+
+    Fed by httpcore's trace extension, so every request that does not open a
+    TCP connection was served over a kept-alive one.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+        self._lock = threading.Lock()
+
+    def trace(self, event_name: str, info: Dict[str, Any]):
+        """httpcore trace callback"""
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+        elif event_name in ("http11.send_request_headers.started",
+                            "http2.send_request_headers.started"):
+            with self._lock:
+                self.requests += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """Current cumulative counters"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "tls_handshakes": self.tls_handshakes
+            }
+
+    @staticmethod
+    def summarize(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, Any]:
+        """Connection usage between two snapshots, including the reuse ratio"""
+        requests = after["requests"] - before["requests"]
+        connections = after["connections"] - before["connections"]
+        reused = max(0, requests - connections)
+        return {
+            "requests": requests,
+            "new_connections": connections,
+            "tls_handshakes": after["tls_handshakes"] - before["tls_handshakes"],
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / requests, 3) if requests else 0.0
+        }
+
+
+def create_client(pool_size: int = HTTP_POOL_SIZE,
+                  keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+                  http2: bool = HTTP2_ENABLED,
+                  base_url: Optional[str] = None,
+                  api_key: Optional[str] = None) -> "openai.OpenAI":
+    """
+    Create an OpenAI client backed by one pooled, keep-alive HTTP client.
+
+    base_url defaults to OPENAI_BASE_URL, so the agents can be pointed at a
+    compatible server (e.g. benchmarks/mock_openai.py). The returned client
+    carries a `connection_stats` attribute. HTTP/2 needs
+    the optional `h2` package and falls back to HTTP/1.1 when it is missing.
+    """
+    # Imported here rather than at module level: together they take most of
+    # a cold start, and nothing needs them before the first API call
+    import httpx
+    import openai
+
+    if http2 and importlib.util.find_spec("h2") is None:
+        warnings.warn("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+        http2 = False
+
+    stats = ConnectionStats()
+
+    def attach_trace(request: httpx.Request):
+        request.extensions["trace"] = stats.trace
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=keepalive_expiry
+        ),
+        http2=http2,
+        event_hooks={"request": [attach_trace]}
+    )
+
+    # Retries and timeouts are handled per call by RetryPolicy
+    client = openai.OpenAI(
+        api_key=api_key or config.OPENAI_API_KEY,
+        base_url=base_url or config.OPENAI_BASE_URL,
+        http_client=http_client,
+        max_retries=0
+    )
+    client.connection_stats = stats
+    return client
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client() -> "openai.OpenAI":
+    """Process-wide client used by agents that are not given one explicitly"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = create_client()
+        return _shared_client
+
+
+def peek_shared_client() -> Optional["openai.OpenAI"]:
+    """The process-wide client if it has been built already, without building it"""
+    return _shared_client
@@ -0,0 +1,160 @@
+"""
+Prompt Compaction
+
+Extractive compaction of the upstream analyses passed to DecisionAgent, so
+the combined prompt fits a token budget.
+"""
+
+import re
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
+
+
+STOPWORDS = frozenset((
+    "a", "an", "the", "and", "or", "but", "of", "to", "in", "on", "for", "with", "as", "by", "at",
+    "from", "is", "are", "was", "were", "be", "been", "it", "its", "this", "that", "these", "those",
+    "there", "their", "they", "which", "who", "will", "would", "can", "could", "may", "might",
+    "has", "have", "had", "not", "also", "such", "more", "most", "very", "some", "any", "into"
+))
+
+# Words that usually mark a sentence carrying a fact or a judgement
+SIGNAL_WORDS = frozenset((
+    "competitor", "competitors", "incumbent", "incumbents", "leader", "share", "funding", "raised",
+    "round", "valuation", "investor", "investors", "vc", "acquisition", "market", "tam", "size",
+    "growth", "cagr", "revenue", "pricing", "margin", "profit", "risk", "risks", "barrier",
+    "barriers", "regulation", "opportunity", "threat", "advantage", "weakness", "trend", "demand",
+    "saturated", "recommend", "however"
+))
+
+# Figures: money, percentages, years and other numbers
+FIGURE_PATTERN = re.compile(r"\$\s?\d|\d+(?:\.\d+)?\s?(?:%|percent|billion|million|bn|m\b|k\b)|\b(?:19|20)\d\d\b")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+WORD_PATTERN = re.compile(r"[a-z0-9$%]+")
+
+# Sentences sharing more content words than this with a kept sentence are dropped
+REDUNDANCY_THRESHOLD = 0.7
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences and list items of a text, with bullet markers kept"""
+    return [sentence.strip() for sentence in SENTENCE_PATTERN.split(text) if sentence.strip()]
+
+
+def _sentence_breaks(text: str, sentences: List[str]) -> List[bool]:
+    """For each sentence after the first, whether a line break comes before it in text"""
+    breaks, end = [], 0
+    for index, sentence in enumerate(sentences):
+        start = text.index(sentence, end)
+        if index:
+            breaks.append("\n" in text[end:start])
+        end = start + len(sentence)
+    return breaks
+
+
+def _content_words(sentence: str) -> List[str]:
+    return [word for word in WORD_PATTERN.findall(sentence.lower()) if word not in STOPWORDS]
+
+
+def compact_text(text: str, budget: int, word_weights: Optional[Counter] = None) -> str:
+    """
+    The most informative sentences of text that fit in `budget` tokens, in
+    their original order and with the line breaks between them.
+
+    Sentences score on figures (money, percentages, years), signal words and
+    how central their words are (word_weights, by default the text's own word
+    counts). Short, dense sentences are preferred, and a sentence that
+    mostly repeats one already kept is skipped. The first sentence gets a
+    small bonus because analyses often open with their conclusion.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    sentences = split_sentences(text)
+    word_weights = word_weights if word_weights is not None else Counter(_content_words(text))
+
+    candidates = []
+    for position, sentence in enumerate(sentences):
+        words = _content_words(sentence)
+        if not words:
+            continue
+        unique = set(words)
+        score = (
+            2.0 * len(FIGURE_PATTERN.findall(sentence))
+            + 1.0 * len(unique & SIGNAL_WORDS)
+            + sum(math.log1p(word_weights[word]) for word in unique) / math.sqrt(len(unique))
+            + (0.5 if position == 0 else 0.0)
+        )
+        tokens = estimate_tokens(sentence)
+        candidates.append((score / math.sqrt(tokens), position, tokens, unique))
+
+    kept: List[Tuple[int, set]] = []
+    remaining = budget
+    for _, position, tokens, unique in sorted(candidates, key=lambda c: c[0], reverse=True):
+        if tokens > remaining:
+            continue
+        if any(len(unique & other) / len(unique | other) > REDUNDANCY_THRESHOLD for _, other in kept):
+            continue
+        kept.append((position, unique))
+        remaining -= tokens
+
+    if not kept:
+        # Every sentence is longer than the budget: cut the first one
+        return sentences[0][:budget * CHARS_PER_TOKEN] if sentences else ""
+    # List items and paragraphs stay on their own lines
+    breaks = _sentence_breaks(text, sentences)
+    positions = sorted(position for position, _ in kept)
+    parts = [sentences[positions[0]]]
+    for previous, position in zip(positions, positions[1:]):
+        line_break = any(breaks[index - 1] for index in range(previous + 1, position + 1))
+        parts.append(("\n" if line_break else " ") + sentences[position])
+    return "".join(parts)
+
+
+def allocate_budget(token_counts: Dict[str, int], budget: int) -> Dict[str, int]:
+    """
+    Split a token budget across texts: an equal share each, with the share a
+    short text does not need passed on to the longer ones.
+    """
+    allocation = {}
+    pending = dict(token_counts)
+    remaining = budget
+    while pending:
+        share = remaining // len(pending)
+        fitting = {name: tokens for name, tokens in pending.items() if tokens <= share}
+        if not fitting:
+            for name in pending:
+                allocation[name] = share
+            break
+        for name, tokens in fitting.items():
+            allocation[name] = tokens
+            remaining -= tokens
+            del pending[name]
+    return allocation
+
+
+def compact_analyses(analyses: Dict[str, str], budget: Optional[int]) -> Tuple[Dict[str, str], Dict[str, int]]:
+    """
+    Fit several analyses into one token budget.
+
+    Returns the (possibly) shortened analyses and the estimated tokens
+    before and after, and tokens saved. A budget of None leaves them as is.
+    """
+    token_counts = {name: estimate_tokens(text) for name, text in analyses.items()}
+    input_tokens = sum(token_counts.values())
+    if budget is None or input_tokens <= budget:
+        return dict(analyses), {"input_tokens": input_tokens, "output_tokens": input_tokens, "tokens_saved": 0}
+
+    # Words that recur across the analyses are what the decision hinges on
+    word_weights = Counter()
+    for text in analyses.values():
+        word_weights.update(_content_words(text))
+
+    allocation = allocate_budget(token_counts, budget)
+    compacted = {name: compact_text(text, allocation[name], word_weights) for name, text in analyses.items()}
+    output_tokens = sum(estimate_tokens(text) for text in compacted.values())
+    return compacted, {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "tokens_saved": input_tokens - output_tokens
+    }
@@ -4,16 +4,40 @@ Decision Agent
 Synthesizes research from all agents and makes final investment recommendation.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
+from config import DECISION_PROMPT_TOKEN_BUDGET
 from .base_agent import BaseAgent
-from config import OPENAI_MODEL
+from .circuit_breaker import CircuitOpen
+from .compaction import compact_analyses
+from .keywords import KeywordMatcher
+from .rate_limiter import DECISION_PRIORITY
 
 
 class DecisionAgent(BaseAgent):
     """Agent specialized in synthesizing research and making final recommendations"""
     
-    def __init__(self):
-        system_prompt = """You are a strategic investment advisor.
+    # Finish ideas already in flight before new research starts
+    request_priority = DECISION_PRIORITY
+    
+    # Recommendation indicators, checked in this order
+    GOOD_KEYWORDS = ("good opportunity", "recommend", "positive", "strong potential")
+    POOR_KEYWORDS = ("poor", "avoid", "risky", "challenging", "difficult")
+    
+    # Confidence and recommendation come out of a single scan
+    keyword_matcher = KeywordMatcher({
+        "confidence": BaseAgent.CONFIDENCE_KEYWORDS,
+        "uncertainty": BaseAgent.UNCERTAINTY_KEYWORDS,
+        "good": GOOD_KEYWORDS,
+        "poor": POOR_KEYWORDS
+    })
+    
+    # Result field holding the generated text
+    output_field = "reasoning"
+    
+    # Prompt headings for the upstream analyses, by agent name (default: the name)
+    SECTION_TITLES = {"Incumbents": "COMPETITORS"}
+    
+    SYSTEM_PROMPT = """You are a strategic investment advisor.
         Your job is to synthesize market research and make a final recommendation.
         
         You will receive analysis from three areas: competitors, funding, and growth.
@@ -24,63 +48,95 @@ class DecisionAgent(BaseAgent):
         - Confidence level in your assessment
         
         Be decisive but balanced in your judgment."""
-        
-        super().__init__("Decision", system_prompt)
+    
+    def __init__(self, prompt_token_budget: Optional[int] = DECISION_PROMPT_TOKEN_BUDGET,
+                 name: str = "Decision", system_prompt: str = SYSTEM_PROMPT, **kwargs):
+        self.prompt_token_budget = prompt_token_budget
+        super().__init__(name, system_prompt, **kwargs)
+    
+    def run(self, product_idea: str, inputs: Dict[str, str],
+            on_chunk: Optional[Callable[[str], None]] = None, model: Optional[str] = None) -> Dict[str, Any]:
+        return self.decide(product_idea, inputs, on_chunk=on_chunk, model=model)
     
     def make_decision(self, incumbents_analysis: str, funding_analysis: str, 
-                     growth_analysis: str, product_idea: str) -> Dict[str, Any]:
-        """Make final decision based on all agent inputs"""
-        combined_prompt = f"""
-        Product Idea: {product_idea}
-        
-        COMPETITORS ANALYSIS:
-        {incumbents_analysis}
-        
-        FUNDING ANALYSIS:
-        {funding_analysis}
+                     growth_analysis: str, product_idea: str,
+                     on_chunk: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Make final decision based on the three standard research analyses"""
+        return self.decide(product_idea, {
+            "Incumbents": incumbents_analysis,
+            "Funding": funding_analysis,
+            "Growth": growth_analysis
+        }, on_chunk=on_chunk)
+    
+    def decide(self, product_idea: str, analyses: Dict[str, str],
+               on_chunk: Optional[Callable[[str], None]] = None, model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Make final decision based on any set of upstream analyses (by agent name)
         
-        GROWTH ANALYSIS:
-        {growth_analysis}
+        Pass on_chunk to stream the reasoning text as it is generated. The
+        analyses are compacted to prompt_token_budget tokens first; the
+        estimated tokens saved are reported in metrics["compaction"].
+        """
+        metrics = {}
+        analyses, metrics["compaction"] = compact_analyses(analyses, self.prompt_token_budget)
         
-        Based on the above research, provide your final recommendation."""
+        # Laid out line by line as the prompt always was, so cached responses still match
+        lines = ["", f"Product Idea: {product_idea}", ""]
+        for agent_name, analysis in analyses.items():
+            lines += [f"{self.SECTION_TITLES.get(agent_name, agent_name.upper())} ANALYSIS:", analysis, ""]
+        lines.append("Based on the above research, provide your final recommendation.")
+        combined_prompt = "\n        ".join(lines)
         
         try:
-            response = self.client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": combined_prompt}
-                ],
+            content = self._complete(
+                combined_prompt,
                 temperature=0.5,   # Lower temperature for more consistent decisions
-                max_tokens=400
+                max_tokens=400,
+                metrics=metrics,
+                on_chunk=on_chunk,
+                model=model
             )
-            
-            content = response.choices[0].message.content
-            recommendation = self._extract_recommendation(content)
-            
-            return {
-                "agent": self.name,
-                "product_idea": product_idea,
-                "recommendation": recommendation,
-                "reasoning": content,
-                "confidence": self._calculate_confidence(content)
-            }
+            return self.build_result(product_idea, content, metrics)
         except Exception as e:
-            return {
-                "agent": self.name,
-                "product_idea": product_idea,
-                "recommendation": "Error",
-                "reasoning": f"Error: {str(e)}",
-                "confidence": 0.0
-            }
+            metrics["error"] = type(e).__name__
+            status = "circuit_open" if isinstance(e, CircuitOpen) else "error"
+            return self.failed_result(product_idea, f"Error: {str(e)}", status=status, metrics=metrics)
+    
+    def build_result(self, product_idea: str, content: str, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        keyword_counts = self.keyword_matcher.scan(content)
+        recommendation = self._extract_recommendation(content, keyword_counts)
+        
+        return {
+            "agent": self.name,
+            "product_idea": product_idea,
+            "recommendation": recommendation,
+            "reasoning": content,
+            "confidence": self._calculate_confidence(content, keyword_counts),
+            "status": "ok",
+            "metrics": metrics
+        }
+    
+    def failed_result(self, product_idea: str, message: str, status: str = "error",
+                      metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return {
+            "agent": self.name,
+            "product_idea": product_idea,
+            "recommendation": "Error",
+            "reasoning": message,
+            "confidence": 0.0,
+            "status": status,
+            "metrics": metrics if metrics is not None else {}
+        }
     
-    def _extract_recommendation(self, analysis: str) -> str:
+    def _extract_recommendation(self, analysis: str,
+                                keyword_counts: Optional[Dict[str, int]] = None) -> str:
         """Extract recommendation from analysis text"""
-        analysis_lower = analysis.lower()
+        if keyword_counts is None:
+            keyword_counts = self.keyword_matcher.scan(analysis)
         
-        if any(word in analysis_lower for word in ["good opportunity", "recommend", "positive", "strong potential"]):
+        if keyword_counts["good"]:
             return "Good"
-        elif any(word in analysis_lower for word in ["poor", "avoid", "risky", "challenging", "difficult"]):
+        elif keyword_counts["poor"]:
             return "Poor"
         else:
             return "Neutral"
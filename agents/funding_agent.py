@@ -10,8 +10,7 @@ from .base_agent import BaseAgent
 class FundingAgent(BaseAgent):
     """Agent specialized in analyzing funding landscape and investor sentiment"""
     
-    def __init__(self):
-        system_prompt = """You are a venture capital research expert.
+    SYSTEM_PROMPT = """You are a venture capital research expert.
         Your job is to analyze funding activity and investor interest in a given product space.
         
         Focus on:
@@ -21,5 +20,6 @@ class FundingAgent(BaseAgent):
         - Market attractiveness to VCs
         
         Provide specific insights about funding landscape. Be data-driven where possible."""
-        
-        super().__init__("Funding", system_prompt)
+    
+    def __init__(self, name: str = "Funding", system_prompt: str = SYSTEM_PROMPT, **kwargs):
+        super().__init__(name, system_prompt, **kwargs)
@@ -0,0 +1,128 @@
+"""
+Fused Agent
+
+Asks for every agent's section (research and decision) in one JSON
+completion, for cheap triage with one round trip instead of four.
+"""
+
+import re
+import json
+import inspect
+from typing import Dict, Any, List, Optional, Sequence
+from config import FUSED_MAX_TOKENS
+from .base_agent import BaseAgent
+
+# A reply wrapped in a Markdown code fence despite JSON mode
+CODE_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.S)
+
+# Per-call figures that are split across sections in proportion to their length
+SHARED_FIELDS = ("wall_time", "queue_time", "prompt_tokens", "completion_tokens", "cost_usd")
+
+
+class FusedOutputError(ValueError):
+    """The fused completion could not be split into its sections"""
+
+
+class FusedAgent(BaseAgent):
+    """Agent that writes several agents' sections in a single structured completion"""
+
+    def __init__(self, sections: Dict[str, str], inputs: Optional[Dict[str, Sequence[str]]] = None,
+                 max_tokens: int = FUSED_MAX_TOKENS, name: str = "Fused", **kwargs):
+        self.section_names = list(sections)
+        self.max_tokens = max_tokens
+        super().__init__(name, self.build_prompt(sections, inputs or {}), **kwargs)
+
+    @staticmethod
+    def build_prompt(sections: Dict[str, str], inputs: Dict[str, Sequence[str]]) -> str:
+        """
+        One system prompt covering every section: each section's own agent
+        prompt, in order, with later sections told which earlier ones to build on.
+        """
+        keys = ", ".join(json.dumps(name) for name in sections)
+        parts = [
+            "You are a market research team writing several sections of one report.",
+            f"Return a JSON object with exactly these keys: {keys}.",
+            "Each value is that section's text as a plain string. Write the sections in this order.",
+        ]
+        for name, prompt in sections.items():
+            parts.append(f"\n## {name}\n{inspect.cleandoc(prompt)}")
+            if inputs.get(name):
+                parts.append(f"Base this section on the {', '.join(inputs[name])} sections above.")
+        return "\n".join(parts)
+
+    def research_sections(self, product_idea: str, metrics: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Every section's text for a product idea, by section name.
+
+        Raises FusedOutputError when the reply is not a JSON object with a
+        non-empty string for every section; such a reply is not cached. Call
+        details are written into metrics either way.
+        """
+        content = self._complete(
+            f"Research this product idea: {product_idea}",
+            temperature=0.5,
+            max_tokens=self.max_tokens,
+            metrics=metrics,
+            response_format={"type": "json_object"},
+            validate=self.parse_sections
+        )
+        return self.parse_sections(content)
+
+    def parse_sections(self, content: str) -> Dict[str, str]:
+        text = (content or "").strip()
+        fenced = CODE_FENCE_PATTERN.match(text)
+        if fenced:
+            text = fenced.group(1)
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise FusedOutputError(f"Reply is not valid JSON: {e}")
+        if not isinstance(data, dict):
+            raise FusedOutputError("Reply is not a JSON object")
+
+        missing = [name for name in self.section_names
+                   if not isinstance(data.get(name), str) or not data[name].strip()]
+        if missing:
+            raise FusedOutputError(f"Reply is missing sections: {', '.join(missing)}")
+        return {name: data[name].strip() for name in self.section_names}
+
+
+def split_metrics(metrics: Dict[str, Any], sections: Dict[str, str],
+                  marker: str = "fused") -> Dict[str, Dict[str, Any]]:
+    """
+    Per-section metrics for one fused (or micro-batched) call, each flagged
+    with metrics[marker] = True.
+
+    Time, tokens and cost are shared out in proportion to each section's
+    length, so per-run totals still add up to the one call. Attempts and
+    retries go to the first section only, for the same reason.
+    """
+    lengths = {name: max(1, len(text)) for name, text in sections.items()}
+    total_length = sum(lengths.values())
+    names: List[str] = list(sections)
+    split = {}
+    for index, name in enumerate(names):
+        share = lengths[name] / total_length
+        section_metrics = {key: value for key, value in metrics.items()
+                           if key not in SHARED_FIELDS and key not in ("attempts", "retries", "latencies")}
+        section_metrics[marker] = True
+        for field in SHARED_FIELDS:
+            value = metrics.get(field)
+            if isinstance(value, int) and not isinstance(value, bool):
+                section_metrics[field] = round(value * share)
+            elif isinstance(value, float):
+                section_metrics[field] = round(value * share, 6)
+            else:
+                section_metrics[field] = value
+        if index == 0:
+            for field in ("attempts", "retries", "latencies"):
+                if field in metrics:
+                    section_metrics[field] = metrics[field]
+        split[name] = section_metrics
+
+    # Rounding must not lose or invent tokens
+    for field in ("prompt_tokens", "completion_tokens"):
+        if isinstance(metrics.get(field), int):
+            counted = sum(split[name][field] for name in names[:-1])
+            split[names[-1]][field] = metrics[field] - counted
+    return split
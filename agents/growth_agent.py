@@ -10,8 +10,7 @@ from .base_agent import BaseAgent
 class GrowthAgent(BaseAgent):
     """Agent specialized in market growth and revenue potential analysis"""
     
-    def __init__(self):
-        system_prompt = """You are a market growth analyst.
+    SYSTEM_PROMPT = """You are a market growth analyst.
         Your job is to evaluate market size, growth potential, and revenue opportunities.
         
         Focus on:
@@ -21,5 +20,6 @@ class GrowthAgent(BaseAgent):
         - Economic factors affecting growth
         
         Provide quantitative insights where possible. Focus on growth trajectory."""
-        
-        super().__init__("Growth", system_prompt)
+    
+    def __init__(self, name: str = "Growth", system_prompt: str = SYSTEM_PROMPT, **kwargs):
+        super().__init__(name, system_prompt, **kwargs)
@@ -10,8 +10,7 @@ from .base_agent import BaseAgent
 class IncumbentsAgent(BaseAgent):
     """Agent specialized in analyzing competitors and market incumbents"""
     
-    def __init__(self):
-        system_prompt = """You are a market research expert specializing in competitive analysis. 
+    SYSTEM_PROMPT = """You are a market research expert specializing in competitive analysis. 
         Your job is to identify existing competitors and their key features for a given product idea.
         
         Focus on:
@@ -21,5 +20,6 @@ class IncumbentsAgent(BaseAgent):
         - Strengths and weaknesses
         
         Provide specific, actionable insights. Be concise but thorough."""
-        
-        super().__init__("Incumbents", system_prompt)
+    
+    def __init__(self, name: str = "Incumbents", system_prompt: str = SYSTEM_PROMPT, **kwargs):
+        super().__init__(name, system_prompt, **kwargs)
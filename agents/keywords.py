@@ -0,0 +1,48 @@
+"""
+Keyword Matching
+
+Precompiled multi-group keyword matcher shared by the agents' heuristics and
+the evaluator.
+"""
+
+from typing import Dict, Iterable, List
+
+
+class KeywordMatcher:
+    """
+    Counts which keywords of several named groups occur in a text.
+
+    The groups are compiled once into a single deduplicated keyword list, so
+    one scan lowercases the text once and checks each distinct keyword once,
+    however many groups share it. Matching is plain substring presence, the
+    same as `keyword in text.lower()`. A keyword listed twice in a group
+    counts twice, as it would in a loop over that group.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self.groups = {name: tuple(keywords) for name, keywords in groups.items()}
+        self.keywords = tuple(dict.fromkeys(
+            keyword for keywords in self.groups.values() for keyword in keywords
+        ))
+
+        # For each distinct keyword, the groups it counts towards
+        self._plan = tuple(
+            (keyword, tuple(name for name, keywords in self.groups.items()
+                            for listed in keywords if listed == keyword))
+            for keyword in self.keywords
+        )
+
+    def presence(self, text: str) -> List[bool]:
+        """Whether each distinct keyword (in self.keywords order) occurs in text"""
+        lowered = text.lower()
+        return [keyword in lowered for keyword in self.keywords]
+
+    def scan(self, text: str) -> Dict[str, int]:
+        """Number of each group's keywords present in text"""
+        lowered = text.lower()
+        counts = dict.fromkeys(self.groups, 0)
+        for keyword, group_names in self._plan:
+            if keyword in lowered:
+                for name in group_names:
+                    counts[name] += 1
+        return counts
@@ -0,0 +1,84 @@
+"""
+Micro-batch Agent
+
+Writes one research agent's analysis of several product ideas in one JSON
+completion, one section per idea, so ideas in flight together share a request.
+"""
+
+import json
+import inspect
+from typing import Dict, Any, List
+from .base_agent import BaseAgent
+from .fused_agent import CODE_FENCE_PATTERN
+
+# max_tokens of one idea, as in BaseAgent.research
+IDEA_MAX_TOKENS = 500
+
+
+class MicroBatchOutputError(ValueError):
+    """The batched completion is not a JSON object, or has no usable section"""
+
+
+class MicroBatchAgent(BaseAgent):
+    """
+    Researches `size` ideas at once with another agent's prompt.
+
+    Calls go through that agent's cache, client, retry policy, rate limiter
+    and circuit breaker, on its model and at its priority.
+    """
+
+    def __init__(self, agent: BaseAgent, size: int):
+        self.keys = [str(number) for number in range(1, size + 1)]
+        super().__init__(f"{agent.name}Batch", self.build_prompt(agent.system_prompt, self.keys),
+                         cache=agent.cache, client=agent._client, retry_policy=agent.retry_policy,
+                         rate_limiter=agent.rate_limiter, stream=False, model=agent.model,
+                         circuit_breaker=agent.circuit_breaker)
+        self.request_priority = agent.request_priority
+
+    @staticmethod
+    def build_prompt(system_prompt: str, keys: List[str]) -> str:
+        """The agent's own prompt, asking for one section per numbered idea"""
+        return "\n".join([
+            inspect.cleandoc(system_prompt),
+            "",
+            "You will be given several numbered product ideas. Research each one separately, "
+            "as if it were the only one.",
+            f"Return a JSON object with exactly these keys: {', '.join(json.dumps(key) for key in keys)}.",
+            "Each value is your full analysis of the idea with that number, as a plain string."
+        ])
+
+    def research_ideas(self, product_ideas: List[str], metrics: Dict[str, Any]) -> Dict[str, str]:
+        """
+        The analysis of every idea that came back usable, by key ("1" for
+        the first idea, ...). Raises MicroBatchOutputError when the reply is
+        not a JSON object or has no usable section; such a reply is not
+        cached. Call details are written into metrics either way.
+        """
+        user_message = "Research these product ideas:\n" + "\n".join(
+            f"{key}. {idea}" for key, idea in zip(self.keys, product_ideas))
+        content = self._complete(
+            user_message,
+            temperature=0.7,
+            max_tokens=IDEA_MAX_TOKENS * len(product_ideas),
+            metrics=metrics,
+            response_format={"type": "json_object"},
+            validate=self.parse_sections
+        )
+        return self.parse_sections(content)
+
+    def parse_sections(self, content: str) -> Dict[str, str]:
+        text = (content or "").strip()
+        fenced = CODE_FENCE_PATTERN.match(text)
+        if fenced:
+            text = fenced.group(1)
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise MicroBatchOutputError(f"Reply is not valid JSON: {e}")
+        if not isinstance(data, dict):
+            raise MicroBatchOutputError("Reply is not a JSON object")
+        sections = {key: data[key].strip() for key in self.keys
+                    if isinstance(data.get(key), str) and data[key].strip()}
+        if not sections:
+            raise MicroBatchOutputError("Reply has no usable section")
+        return sections
@@ -0,0 +1,144 @@
+"""
+Rate Limiter
+
+Process-wide token-bucket scheduler that keeps API traffic under the
+provider's requests/min and tokens/min quotas.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Optional
+from config import RATE_LIMIT_RPM, RATE_LIMIT_TPM
+from .retry import DeadlineExceeded
+
+
+# Lower values are served first
+DECISION_PRIORITY = 0
+RESEARCH_PRIORITY = 1
+
+
+class RateLimiter:
+    """
+    Two token buckets (requests and tokens) refilled continuously per minute.
+
+    Callers queue in priority order, then FIFO. Only the caller at the head of
+    the queue may take budget, so a large request cannot be starved by a
+    stream of small ones. Decision calls go ahead of research calls, which
+    lets ideas already in flight finish before new ones start.
+
+    clock returns the current time in seconds (tests pass a fake one).
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = RATE_LIMIT_RPM,
+                 tokens_per_minute: Optional[float] = RATE_LIMIT_TPM,
+                 clock: Callable[[], float] = time.monotonic):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.clock = clock
+        self._request_budget = requests_per_minute or 0.0
+        self._token_budget = tokens_per_minute or 0.0
+        self._paused_until = 0.0
+        self._last_refill = self.clock()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.requests_per_minute or self.tokens_per_minute)
+
+    def acquire(self, tokens: int, priority: int = RESEARCH_PRIORITY,
+                timeout: Optional[float] = None) -> float:
+        """
+        Block until a request estimated at `tokens` may be sent.
+
+        Returns the seconds spent waiting. Raises DeadlineExceeded if the
+        budget is not available within `timeout` seconds.
+        """
+        if not self.enabled:
+            return 0.0
+
+        if self.tokens_per_minute:
+            # A single request may never need more than a full bucket
+            tokens = min(tokens, self.tokens_per_minute)
+
+        start_time = self.clock()
+        deadline = start_time + timeout if timeout is not None else None
+        ticket = (priority, next(self._sequence))
+
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = self.clock()
+                    wait_time = None
+                    if self._waiters[0] == ticket:
+                        wait_time = self._time_until_available(tokens, now)
+                        if wait_time <= 0:
+                            self._request_budget -= 1
+                            self._token_budget -= tokens
+                            heapq.heappop(self._waiters)
+                            self._condition.notify_all()
+                            return now - start_time
+
+                    if deadline is not None:
+                        if now >= deadline:
+                            raise DeadlineExceeded("Timed out waiting for rate limit budget")
+                        wait_time = deadline - now if wait_time is None else min(wait_time, deadline - now)
+                    self._condition.wait(timeout=wait_time)
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._condition.notify_all()
+                raise
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """Return budget that was reserved for a request but not used"""
+        if not self.tokens_per_minute or actual_tokens >= estimated_tokens:
+            return
+        with self._condition:
+            self._token_budget = min(self.tokens_per_minute,
+                                     self._token_budget + estimated_tokens - actual_tokens)
+            self._condition.notify_all()
+
+    def pause(self, seconds: float):
+        """Hold every caller back, e.g. after the provider answered 429"""
+        if not self.enabled:
+            return
+        with self._condition:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+            self._condition.notify_all()
+
+    def _time_until_available(self, tokens: int, now: float) -> float:
+        """Refill both buckets and return how long until the request fits"""
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        wait_time = self._paused_until - now
+
+        if self.requests_per_minute:
+            rate = self.requests_per_minute / 60
+            self._request_budget = min(self.requests_per_minute, self._request_budget + elapsed * rate)
+            wait_time = max(wait_time, (1 - self._request_budget) / rate)
+
+        if self.tokens_per_minute:
+            rate = self.tokens_per_minute / 60
+            self._token_budget = min(self.tokens_per_minute, self._token_budget + elapsed * rate)
+            wait_time = max(wait_time, (tokens - self._token_budget) / rate)
+
+        return wait_time
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide limiter shared by every agent"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
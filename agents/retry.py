@@ -0,0 +1,200 @@
+"""
+Retry Policy
+
+Deadline-aware retries with jittered exponential backoff, plus optional hedged
+requests to cut tail latency.
+"""
+
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from typing import Dict, Any, Callable, Optional, Tuple
+from config import (
+    AGENT_TIMEOUT, MAX_RETRIES, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX,
+    HEDGE_ENABLED, HEDGE_PERCENTILE, HEDGE_MIN_DELAY, HEDGE_MIN_SAMPLES
+)
+
+
+def retryable_errors() -> Tuple[type, ...]:
+    """
+    Transient failures worth another attempt. Everything else (bad request,
+    authentication, ...) fails immediately.
+
+    A function rather than a constant so openai is only imported once a
+    call has actually been made.
+    """
+    import openai
+    return (
+        openai.APIConnectionError,   # includes APITimeoutError
+        openai.RateLimitError,
+        openai.InternalServerError
+    )
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call runs out of its time budget"""
+
+
+class StreamInterrupted(Exception):
+    """Raised when a stream fails after text was forwarded, so it cannot be retried"""
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies, used to pick the hedge delay"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percent: float, min_samples: int = 1) -> Optional[float]:
+        """Nearest-rank percentile, or None with fewer than min_samples samples"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples or len(samples) < min_samples:
+            return None
+        rank = max(0, min(len(samples) - 1, int(round(percent / 100 * len(samples))) - 1))
+        return samples[rank]
+
+
+_latency_trackers = {}
+_latency_trackers_lock = threading.Lock()
+
+
+def get_latency_tracker(key: str) -> LatencyTracker:
+    """Process-wide latency history for one agent/model pair"""
+    with _latency_trackers_lock:
+        if key not in _latency_trackers:
+            _latency_trackers[key] = LatencyTracker()
+        return _latency_trackers[key]
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """The Retry-After hint on an API error response, if there is one"""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(retry_after) if retry_after else None
+    except ValueError:
+        return None
+
+
+def _run_in_thread(fn: Callable, *args) -> Future:
+    """Run fn on its own daemon thread and return a future for its result"""
+    future = Future()
+
+    def runner():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=runner, daemon=True).start()
+    return future
+
+
+class RetryPolicy:
+    """
+    Runs a call within a total deadline, retrying transient failures.
+
+    The call receives the time it has left, so each attempt's HTTP timeout
+    shrinks as the deadline approaches. With hedging on, a duplicate attempt
+    is fired once the primary has run longer than the recent latency
+    percentile, and whichever succeeds first wins.
+    """
+
+    def __init__(self, timeout: float = AGENT_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = RETRY_BACKOFF_BASE, backoff_max: float = RETRY_BACKOFF_MAX,
+                 hedge: bool = HEDGE_ENABLED, hedge_percentile: float = HEDGE_PERCENTILE,
+                 hedge_min_delay: float = HEDGE_MIN_DELAY, hedge_min_samples: int = HEDGE_MIN_SAMPLES):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+
+    def call(self, fn: Callable[[float], Any], latencies: LatencyTracker,
+             metrics: Dict[str, Any], hedge: Optional[bool] = None) -> Any:
+        """
+        Call fn(timeout_seconds) until it succeeds, fails permanently or the
+        deadline passes.
+
+        Attempt and retry counts, per-attempt latencies and whether a hedge
+        was fired are written into metrics, even when the call ultimately fails. Pass
+        hedge=False to turn hedging off for one call.
+        """
+        hedge = self.hedge if hedge is None else hedge
+        deadline = time.monotonic() + self.timeout
+        metrics["attempts"] = 0
+        metrics["retries"] = 0
+        metrics["latencies"] = []
+        metrics["hedged"] = False
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"No response within {self.timeout}s")
+
+            metrics["attempts"] += 1
+            metrics["retries"] = metrics["attempts"] - 1
+            start_time = time.monotonic()
+            try:
+                if hedge:
+                    result = self._hedged_call(fn, deadline, latencies, metrics)
+                else:
+                    result = fn(remaining)
+                elapsed = time.monotonic() - start_time
+                latencies.record(elapsed)
+                metrics["latencies"].append(round(elapsed, 3))
+                return result
+            except Exception as e:
+                metrics["latencies"].append(round(time.monotonic() - start_time, 3))
+                if not isinstance(e, retryable_errors()) or metrics["attempts"] > self.max_retries:
+                    raise
+
+                delay = self._backoff_delay(metrics["attempts"], e)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, never shorter than a Retry-After hint"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        retry_after = retry_after_seconds(error)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def _hedged_call(self, fn: Callable[[float], Any], deadline: float,
+                     latencies: LatencyTracker, metrics: Dict[str, Any]) -> Any:
+        """Run fn, firing a duplicate if it is slower than the hedge delay"""
+        hedge_delay = latencies.percentile(self.hedge_percentile, self.hedge_min_samples)
+        if hedge_delay is None:
+            # Not enough history to know what "slow" means yet
+            return fn(deadline - time.monotonic())
+        hedge_delay = max(hedge_delay, self.hedge_min_delay)
+
+        futures = [_run_in_thread(fn, deadline - time.monotonic())]
+        done, _ = wait(futures, timeout=min(hedge_delay, deadline - time.monotonic()))
+        if not done and deadline - time.monotonic() > 0:
+            metrics["hedged"] = True
+            futures.append(_run_in_thread(fn, deadline - time.monotonic()))
+
+        last_error = None
+        while futures:
+            done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded(f"No response within {self.timeout}s")
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+            futures = list(pending)
+        raise last_error
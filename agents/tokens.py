@@ -0,0 +1,34 @@
+"""
+Token Estimation
+
+Cheap local token-count estimates for budgeting requests before they are
+sent, and cost estimates for the tokens they used.
+"""
+
+import math
+from typing import Iterable, Optional
+from config import MODEL_PRICING
+
+# Rough average for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many tokens a piece of text will use"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def estimate_request_tokens(messages: Iterable[str], max_tokens: int) -> int:
+    """Worst-case token cost of a chat request: prompt estimate plus max_tokens"""
+    return sum(estimate_tokens(message) for message in messages) + max_tokens
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Estimated USD cost of a call, or None for a model without known pricing"""
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        return None
+    prompt_price, completion_price = pricing
+    return round((prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000, 6)
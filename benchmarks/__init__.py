@@ -0,0 +1,6 @@
+"""
+Benchmarks Package
+
+Standalone performance benchmarks. Run each module from the project root,
+e.g. `python -m benchmarks.bench_keywords`.
+"""
@@ -0,0 +1,132 @@
+"""
+Decision Prompt Compaction Check
+
+Measures what compaction does to DecisionAgent's input over saved results:
+tokens saved, how many figures and signal words survive, and the cost of
+compacting. With --live, it also re-runs the decision on each result with
+and without compaction. AgentEvaluator then scores both decisions, so a
+budget can be checked for quality before it is adopted. --live makes real
+API calls unless OPENAI_BASE_URL points at benchmarks/mock_openai.py.
+
+Usage: python -m benchmarks.bench_compaction results.jsonl ["research_results_*.json" ...]
+                                             [--budget 600] [--live] [--limit 20]
+"""
+
+import glob
+import time
+import argparse
+from statistics import mean
+from typing import Dict, Any, List
+from agents.compaction import FIGURE_PATTERN, SIGNAL_WORDS, compact_analyses
+from config import DECISION_PROMPT_TOKEN_BUDGET
+from core.batch import iter_saved_results
+
+
+ANALYSES = (("incumbents", "Incumbents"), ("funding", "Funding"), ("growth", "Growth"))
+
+
+def load_inputs(paths: List[str], limit: int) -> List[Dict[str, Any]]:
+    """Product idea and the three research analyses of each saved result"""
+    inputs = []
+    for _, result in iter_saved_results(paths):
+        research = result.get("research_results", {})
+        if not all(name in research for _, name in ANALYSES):
+            continue
+        inputs.append({
+            "product_idea": result.get("product_idea", ""),
+            "analyses": {key: research[name].get("analysis", "") for key, name in ANALYSES}
+        })
+        if limit and len(inputs) >= limit:
+            break
+    return inputs
+
+
+def retention(original: str, compacted: str) -> Dict[str, float]:
+    """Share of the original's distinct figures and signal words still present"""
+    figures = set(FIGURE_PATTERN.findall(original))
+    kept_figures = set(FIGURE_PATTERN.findall(compacted))
+    words = set(original.lower().split()) & SIGNAL_WORDS
+    kept_words = set(compacted.lower().split()) & SIGNAL_WORDS
+    return {
+        "figures": len(kept_figures) / len(figures) if figures else 1.0,
+        "signal_words": len(kept_words) / len(words) if words else 1.0
+    }
+
+
+def offline_report(inputs: List[Dict[str, Any]], budget: int):
+    saved = []
+    input_tokens = []
+    figure_retention = []
+    word_retention = []
+    start_time = time.perf_counter()
+    for item in inputs:
+        compacted, stats = compact_analyses(item["analyses"], budget)
+        saved.append(stats["tokens_saved"])
+        input_tokens.append(stats["input_tokens"])
+        kept = retention(" ".join(item["analyses"].values()), " ".join(compacted.values()))
+        figure_retention.append(kept["figures"])
+        word_retention.append(kept["signal_words"])
+    elapsed = time.perf_counter() - start_time
+
+    print(f"Compaction to {budget} tokens over {len(inputs)} saved results")
+    print(f"   Input tokens (mean):       {mean(input_tokens):.0f}")
+    print(f"   Tokens saved (mean):       {mean(saved):.0f} ({sum(saved) / max(1, sum(input_tokens)):.0%})")
+    print(f"   Figures kept (mean):       {mean(figure_retention):.0%}")
+    print(f"   Signal words kept (mean):  {mean(word_retention):.0%}")
+    print(f"   Time per call:             {elapsed / len(inputs) * 1000:.2f} ms")
+
+
+def live_report(inputs: List[Dict[str, Any]], budget: int):
+    """Decide each result with and without compaction and compare the evaluator's scores"""
+    from agents import DecisionAgent
+    from agents.cache import ResponseCache
+    from core import AgentEvaluator
+
+    evaluator = AgentEvaluator()
+    cache = ResponseCache(mode="bypass")
+    agents = {
+        "full": DecisionAgent(prompt_token_budget=None, cache=cache),
+        "compacted": DecisionAgent(prompt_token_budget=budget, cache=cache)
+    }
+    scores = {label: [] for label in agents}
+    prompt_tokens = {label: [] for label in agents}
+    agreement = 0
+    for item in inputs:
+        recommendations = {}
+        for label, agent in agents.items():
+            analyses = item["analyses"]
+            decision = agent.make_decision(analyses["incumbents"], analyses["funding"],
+                                           analyses["growth"], item["product_idea"])
+            scores[label].append(evaluator.evaluate_agent_response("Decision", decision)["overall_score"])
+            prompt_tokens[label].append(decision["metrics"].get("prompt_tokens") or 0)
+            recommendations[label] = decision["recommendation"]
+        agreement += recommendations["full"] == recommendations["compacted"]
+
+    print(f"\nLive decisions ({len(inputs)} ideas)")
+    print(f"   {'':<12}{'Prompt tokens':>15}{'Decision score':>16}")
+    for label in agents:
+        print(f"   {label:<12}{mean(prompt_tokens[label]):>15.0f}{mean(scores[label]):>16.2f}")
+    print(f"   Same recommendation: {agreement}/{len(inputs)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check decision prompt compaction on saved results")
+    parser.add_argument("patterns", nargs="+", help="saved results (.json/.jsonl, globs allowed)")
+    parser.add_argument("--budget", type=int, default=DECISION_PROMPT_TOKEN_BUDGET or 600)
+    parser.add_argument("--limit", type=int, default=0, help="use at most this many results")
+    parser.add_argument("--live", action="store_true",
+                        help="also re-run DecisionAgent with and without compaction (API calls)")
+    args = parser.parse_args()
+
+    paths = sorted(path for pattern in args.patterns for path in (glob.glob(pattern) or [pattern]))
+    inputs = load_inputs(paths, args.limit)
+    if not inputs:
+        parser.error("no saved results with all three research analyses found")
+
+    offline_report(inputs, args.budget)
+    if args.live:
+        live_report(inputs, args.budget)
+
+
+if __name__ == "__main__":
+    main()
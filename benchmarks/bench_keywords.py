@@ -0,0 +1,145 @@
+"""
+Keyword Scoring Micro-benchmark
+
+Compares the precompiled KeywordMatcher path against the original per-criterion
+substring scans, on a few large texts and on a large set of typical results,
+and checks that every score is identical.
+
+Usage: python -m benchmarks.bench_keywords
+"""
+
+import random
+import time
+from typing import List, Tuple
+from agents.base_agent import BaseAgent
+from agents.decision_agent import DecisionAgent
+from core.evaluator import AgentEvaluator
+
+
+# Original implementations, kept here as the baseline
+
+def legacy_score_criterion(analysis: str, criterion: str) -> float:
+    analysis_lower = analysis.lower()
+    keyword_sets = {
+        "completeness": ["competitor", "company", "market", "player", "incumbent"],
+        "specificity": ["feature", "product", "service", "$", "million", "billion"],
+        "insight_quality": ["opportunity", "advantage", "weakness", "trend", "strategy"],
+        "relevance": ["funding", "investment", "venture", "capital", "round"],
+        "recency": ["recent", "2023", "2024", "latest", "current"],
+        "investor_perspective": ["investor", "valuation", "return", "portfolio", "vc"],
+        "market_sizing": ["market", "size", "billion", "million", "tam", "revenue"],
+        "growth_trends": ["growth", "increase", "trend", "forecast", "projection"],
+        "revenue_potential": ["revenue", "profit", "monetization", "pricing", "income"],
+        "synthesis": ["based on", "considering", "overall", "combination", "together"],
+        "clarity": ["recommend", "good", "poor", "neutral", "opportunity"],
+        "reasoning": ["because", "due to", "reason", "evidence", "analysis"]
+    }
+    if criterion in keyword_sets:
+        keyword_count = sum(1 for keyword in keyword_sets[criterion] if keyword in analysis_lower)
+        keyword_score = min(keyword_count / 3, 1.0) * 6
+        length_score = min(len(analysis) / 200, 1.0) * 4
+        return min(10.0, keyword_score + length_score)
+    return 5.0 if len(analysis) > 50 else 2.0
+
+
+def legacy_confidence(analysis: str) -> float:
+    if not analysis or len(analysis) < 50:
+        return 0.3
+    confidence_keywords = ["likely", "evidence", "data", "research", "analysis"]
+    uncertainty_keywords = ["unclear", "uncertain", "difficult", "limited"]
+    confidence_score = len([w for w in confidence_keywords if w in analysis.lower()])
+    uncertainty_score = len([w for w in uncertainty_keywords if w in analysis.lower()])
+    base_confidence = min(0.9, len(analysis) / 300)
+    keyword_adjustment = (confidence_score - uncertainty_score) * 0.1
+    return max(0.1, min(0.9, base_confidence + keyword_adjustment))
+
+
+def legacy_recommendation(analysis: str) -> str:
+    analysis_lower = analysis.lower()
+    if any(word in analysis_lower for word in ["good opportunity", "recommend", "positive", "strong potential"]):
+        return "Good"
+    elif any(word in analysis_lower for word in ["poor", "avoid", "risky", "challenging", "difficult"]):
+        return "Poor"
+    return "Neutral"
+
+
+def score_legacy(evaluator: AgentEvaluator, documents: List[Tuple[str, str]]) -> List[tuple]:
+    scores = []
+    for agent_key, text in documents:
+        criteria = evaluator.evaluation_criteria[agent_key]
+        criterion_scores = tuple(legacy_score_criterion(text, c) for c in criteria)
+        recommendation = legacy_recommendation(text) if agent_key == "decision" else None
+        scores.append((criterion_scores, legacy_confidence(text), recommendation))
+    return scores
+
+
+def score_compiled(evaluator: AgentEvaluator, documents: List[Tuple[str, str]]) -> List[tuple]:
+    research_agent = BaseAgent.__new__(BaseAgent)
+    decision_agent = DecisionAgent.__new__(DecisionAgent)
+    scores = []
+    for agent_key, text in documents:
+        keyword_counts = evaluator._keyword_matcher(agent_key).scan(text)
+        criterion_scores = tuple(
+            evaluator._score_criterion(text, criterion, agent_key, keyword_counts)
+            for criterion in evaluator.evaluation_criteria[agent_key]
+        )
+        if agent_key == "decision":
+            counts = decision_agent.keyword_matcher.scan(text)
+            recommendation = decision_agent._extract_recommendation(text, counts)
+            confidence = decision_agent._calculate_confidence(text, counts)
+        else:
+            recommendation = None
+            confidence = research_agent._calculate_confidence(text)
+        scores.append((criterion_scores, confidence, recommendation))
+    return scores
+
+
+def make_text(rng: random.Random, length: int) -> str:
+    """Filler prose with a sprinkling of scoring keywords"""
+    vocabulary = (
+        "the a market of and to growth in is that investor for on with revenue as this "
+        "Competitor by Data at from it strategy an be are or Funding was which likely "
+        "company product trend $ analysis because Recommend risky based on evidence"
+    ).split()
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(vocabulary)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def time_it(fn, *args) -> Tuple[float, list]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def run_case(label: str, evaluator: AgentEvaluator, documents: List[Tuple[str, str]]):
+    legacy_time, legacy = time_it(score_legacy, evaluator, documents)
+    compiled_time, compiled = time_it(score_compiled, evaluator, documents)
+    if legacy != compiled:
+        raise AssertionError(f"{label}: compiled scores differ from the original implementation")
+    print(f"{label:<32} legacy {legacy_time * 1000:9.1f} ms   "
+          f"compiled {compiled_time * 1000:9.1f} ms   speedup {legacy_time / compiled_time:5.2f}x")
+
+
+def main():
+    rng = random.Random(42)
+    evaluator = AgentEvaluator()
+    agent_keys = list(evaluator.evaluation_criteria)
+
+    print("Keyword scoring: original scans vs precompiled matcher (scores verified identical)\n")
+    for length in (100_000, 1_000_000):
+        documents = [(key, make_text(rng, length)) for key in agent_keys]
+        run_case(f"{len(documents)} texts x {length // 1000} KB", evaluator, documents)
+
+    for count in (10_000, 50_000):
+        documents = [(rng.choice(agent_keys), make_text(rng, rng.randint(40, 2500)))
+                     for _ in range(count)]
+        run_case(f"{count} results x ~1.3 KB", evaluator, documents)
+
+
+if __name__ == "__main__":
+    main()
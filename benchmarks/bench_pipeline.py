@@ -0,0 +1,245 @@
+"""
+Pipeline Benchmark
+
+Runs MarketResearchSystem end to end over N ideas against the local mock
+OpenAI server. For each execution mode it reports per-idea latency
+percentiles, throughput, tokens, cost, evaluation score and peak memory. No real
+API calls are made and the response cache is bypassed.
+
+Modes:
+  sequential  agents one after another, one idea at a time
+  parallel    research agents fanned out, one idea at a time
+  concurrent  research agents fanned out, --concurrency ideas in flight
+  fused       one JSON completion for all agents, one idea at a time
+              (per-agent fallback on malformed replies)
+  strong      like parallel, every research agent on STRONG_MODEL
+  routed      like parallel, research agents on FAST_MODEL first and re-run
+              on STRONG_MODEL below the quality floor (compare with strong;
+              --fast-model and --weak-rate give the mock a fast, weaker tier)
+  microbatch  like concurrent, the research steps of ideas in flight sharing
+              one completion per agent (compare with concurrent)
+
+Usage: python -m benchmarks.bench_pipeline [--ideas 20] [--modes sequential,parallel,concurrent]
+                                          [--latency 0.8] [--token-latency 0.002] [--error-rate 0.02]
+                                          [--malformed-rate 0.1] [--fast-model gpt-4o-mini]
+                                          [--weak-rate 0.2] [--rpm 120] [--json report.json]
+"""
+
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from .mock_openai import add_server_arguments, server_from_args
+
+
+MODES = ("sequential", "parallel", "concurrent", "fused", "strong", "routed", "microbatch")
+
+IDEA_TEMPLATES = (
+    "AI-powered {} assistant for small businesses",
+    "Subscription marketplace for {} equipment",
+    "Mobile app that gamifies {} habits",
+    "B2B analytics platform for {} teams",
+    "Peer-to-peer {} rental service"
+)
+IDEA_TOPICS = ("fitness", "gardening", "accounting", "music", "travel", "cooking", "pet care", "language")
+
+
+def make_ideas(count: int) -> List[str]:
+    ideas = []
+    for i in range(count):
+        template = IDEA_TEMPLATES[i % len(IDEA_TEMPLATES)]
+        ideas.append(f"{template.format(IDEA_TOPICS[i % len(IDEA_TOPICS)])} #{i + 1}")
+    return ideas
+
+
+def percentile(samples: List[float], percent: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_mode(mode: str, base_url: str, ideas: List[str], concurrency: int,
+             rpm: Optional[float] = None) -> Dict[str, Any]:
+    """Research every idea in one mode and measure it (runs in its own process)"""
+    from agents.cache import ResponseCache
+    from agents.client import create_client
+    from agents.rate_limiter import RateLimiter
+    from config import STRONG_MODEL
+    from core import MarketResearchSystem
+
+    client = create_client(base_url=base_url, api_key="mock")
+    system = MarketResearchSystem(parallel=mode != "sequential", verbose=False,
+                                  cache=ResponseCache(mode="bypass"), client=client, fused=mode == "fused",
+                                  routing=mode == "routed", micro_batch=mode == "microbatch")
+    if rpm:
+        # A requests/min quota, as RATE_LIMIT_RPM would set
+        limiter = RateLimiter(requests_per_minute=rpm, tokens_per_minute=None)
+        for agent in list(system.agents.values()) + [system.fused_agent]:
+            if agent is not None:
+                agent.rate_limiter = limiter
+    if mode == "strong":
+        for spec in system.registry:
+            if spec.tiered:
+                system.agents[spec.name].model = STRONG_MODEL
+    connections_before = client.connection_stats.snapshot()
+
+    def research(idea: str) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        result = system.research_product_idea(idea)
+        usage = result["evaluation"]["usage"]["total"]
+        routing = {name: agent["routing"] for name, agent in result["evaluation"]["usage"]["agents"].items()
+                   if "routing" in agent}
+        tokens = usage["prompt_tokens"] + usage["completion_tokens"]
+        fallback = result.get("fused", {}).get("status") == "fallback"
+        if fallback:
+            # The unusable fused call was paid for too
+            wasted = result["fused"]["metrics"]
+            tokens += (wasted.get("prompt_tokens") or 0) + (wasted.get("completion_tokens") or 0)
+        return {"latency": time.perf_counter() - start_time, "usage": usage, "tokens": tokens,
+                "fallback": fallback, "routing": routing,
+                "score": result["evaluation"]["system_performance"]["overall_score"]}
+
+    workers = concurrency if mode in ("concurrent", "microbatch") else 1
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        runs = list(executor.map(research, ideas))
+    elapsed = time.perf_counter() - start_time
+
+    latencies = [run["latency"] for run in runs]
+    escalation_rates = {}
+    for name in sorted({name for run in runs for name in run["routing"]}):
+        routed = [run["routing"][name] for run in runs if name in run["routing"]]
+        escalation_rates[name] = round(sum(routing["escalated"] for routing in routed) / len(routed), 3)
+    costs = [run["usage"]["cost_usd"] for run in runs]
+    connections = client.connection_stats.summarize(connections_before, client.connection_stats.snapshot())
+    return {
+        "mode": mode,
+        "ideas": len(ideas),
+        "in_flight": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "ideas_per_second": round(len(ideas) / elapsed, 3),
+        "latency_p50": round(percentile(latencies, 50), 3),
+        "latency_p95": round(percentile(latencies, 95), 3),
+        "latency_p99": round(percentile(latencies, 99), 3),
+        "failed_calls": sum(run["usage"]["errors"] for run in runs),
+        "retries": sum(run["usage"]["retries"] for run in runs),
+        "tokens_per_idea": round(sum(run["tokens"] for run in runs) / len(runs)),
+        "cost_per_idea": round(sum(costs) / len(costs), 6) if None not in costs else None,
+        "mean_score": round(sum(run["score"] for run in runs) / len(runs), 2),
+        "fused_fallbacks": sum(run["fallback"] for run in runs),
+        "escalation_rates": escalation_rates,
+        "micro_batch": system.micro_batcher.stats() if system.micro_batcher is not None else None,
+        "requests": connections["requests"],
+        "reuse_ratio": connections["reuse_ratio"],
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+def run_mode_in_subprocess(mode: str, base_url: str, ideas: int, concurrency: int,
+                           rpm: Optional[float] = None) -> Dict[str, Any]:
+    """Fresh interpreter per mode, so peak RSS and process-wide state are not shared"""
+    command = [sys.executable, "-m", "benchmarks.bench_pipeline", "--run-mode", mode,
+               "--base-url", base_url, "--ideas", str(ideas), "--concurrency", str(concurrency)]
+    if rpm:
+        command += ["--rpm", str(rpm)]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(output)
+
+
+def print_report(reports: List[Dict[str, Any]]):
+    print(f"\n{'Mode':<12}{'In flight':>10}{'Ideas/s':>10}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}"
+          f"{'Tokens':>8}{'Score':>7}{'Failed':>8}{'Retries':>9}{'Reuse':>8}{'Peak MB':>9}")
+    print("-" * 108)
+    for report in reports:
+        print(f"{report['mode']:<12}{report['in_flight']:>10}{report['ideas_per_second']:>10.2f}"
+              f"{report['latency_p50']:>9.2f}{report['latency_p95']:>9.2f}{report['latency_p99']:>9.2f}"
+              f"{report['tokens_per_idea']:>8}{report['mean_score']:>7.2f}"
+              f"{report['failed_calls']:>8}{report['retries']:>9}{report['reuse_ratio']:>8.0%}"
+              f"{report['peak_rss_mb']:>9.1f}")
+
+    baseline = reports[0]
+    if len(reports) > 1:
+        print()
+    for report in reports[1:]:
+        print(f"{report['mode']} vs {baseline['mode']}: "
+              f"{report['ideas_per_second'] / baseline['ideas_per_second']:.2f}x throughput, "
+              f"p50 latency {report['latency_p50'] / baseline['latency_p50']:.2f}x, "
+              f"tokens {report['tokens_per_idea'] / max(1, baseline['tokens_per_idea']):.2f}x")
+    by_mode = {report["mode"]: report for report in reports}
+    for report in reports:
+        if report["mode"] == "fused":
+            print(f"fused replies that fell back to per-agent calls: {report['fused_fallbacks']}/{report['ideas']}")
+        if report["mode"] == "microbatch" and report["micro_batch"]:
+            batching = report["micro_batch"]
+            concurrent = by_mode.get("concurrent")
+            baseline_requests = f" (concurrent: {concurrent['requests']})" if concurrent else ""
+            print(f"microbatch: {report['requests']} requests{baseline_requests}, "
+                  f"{batching['requests_saved']} saved by {batching['batches']} batches, "
+                  f"{batching['retried']} steps re-run alone, "
+                  f"{batching['mean_window_wait']}s mean window wait per step")
+        if report["mode"] == "routed":
+            rates = ", ".join(f"{name} {rate:.0%}" for name, rate in report["escalation_rates"].items())
+            print(f"routed escalations to the strong model: {rates}")
+            strong = by_mode.get("strong")
+            if strong is not None and strong["cost_per_idea"] and report["cost_per_idea"] is not None:
+                print(f"routed vs strong: cost per idea ${report['cost_per_idea']:.4f} vs "
+                      f"${strong['cost_per_idea']:.4f} ({report['cost_per_idea'] / strong['cost_per_idea']:.2f}x), "
+                      f"p50 latency {report['latency_p50'] / strong['latency_p50']:.2f}x, "
+                      f"score {report['mean_score']:.2f} vs {strong['mean_score']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the research pipeline against a mock API")
+    parser.add_argument("--ideas", type=int, default=20, help="ideas per mode")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated modes to run")
+    parser.add_argument("--concurrency", type=int, default=8, help="ideas in flight in concurrent mode")
+    parser.add_argument("--rpm", type=float, help="client-side requests/min quota for every mode")
+    parser.add_argument("--json", metavar="FILE", help="also write the report as JSON")
+    parser.add_argument("--run-mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        report = run_mode(args.run_mode, args.base_url, make_ideas(args.ideas), args.concurrency, args.rpm)
+        print(json.dumps(report))
+        return
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    with server_from_args(args) as server:
+        print(f"Mock API: {args.distribution} latency {args.latency}s ± {args.jitter}s "
+              f"+ {args.token_latency}s/token, {args.error_rate:.0%} errors, {args.rate_limit_rate:.0%} 429s, "
+              f"{args.malformed_rate:.0%} malformed JSON, {args.response_tokens} tokens per response")
+        reports = []
+        for mode in modes:
+            print(f"Running {mode} over {args.ideas} ideas...", file=sys.stderr)
+            reports.append(run_mode_in_subprocess(mode, server.base_url, args.ideas, args.concurrency, args.rpm))
+        served = dict(server.counts)
+
+    print_report(reports)
+    print(f"\nMock server handled {served['requests']} requests "
+          f"({served['errors']} errors, {served['rate_limited']} rate limited)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"settings": vars(args), "modes": reports, "server": served}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Service Benchmark
+
+Sends a burst of research requests, some for the same idea, against the
+local mock OpenAI server two ways and compares latency and upstream calls:
+
+  cli      one `python main.py "<idea>"` process per request
+  service  one `python main.py --serve` process; requests POST /research?wait
+
+Usage: python -m benchmarks.bench_service [--requests 24] [--distinct 8] [--concurrency 8]
+                                         [--latency 0.8] [--json report.json]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from .mock_openai import add_server_arguments, server_from_args
+from .bench_pipeline import make_ideas, percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("cli", "service")
+
+
+def make_requests(count: int, distinct: int) -> List[str]:
+    """count requests cycling through distinct ideas, with case and spacing varied like real callers"""
+    ideas = make_ideas(distinct)
+    requests = []
+    for i in range(count):
+        idea = ideas[i % distinct]
+        requests.append(idea.upper() if (i // distinct) % 2 else f"  {idea} ")
+    return requests
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_cli(requests: List[str], concurrency: int, env: Dict[str, str]) -> List[float]:
+    def research(idea: str) -> float:
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", idea, "--no-store", "--no-cache"], cwd=ROOT, env=env,
+                       check=True, stdout=subprocess.DEVNULL)
+        return time.perf_counter() - start_time
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(research, requests))
+
+
+def run_service(requests: List[str], concurrency: int, env: Dict[str, str]) -> List[float]:
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "main.py", "--serve", "--port", str(port), "--no-store", "--no-cache",
+         "--concurrency", str(concurrency)],
+        cwd=ROOT, env=env, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                urllib.request.urlopen(f"{base_url}/health").read()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+        def research(idea: str) -> float:
+            start_time = time.perf_counter()
+            request = urllib.request.Request(f"{base_url}/research?wait=300", data=json.dumps({"idea": idea}).encode(),
+                                             headers={"Content-Type": "application/json"})
+            job = json.loads(urllib.request.urlopen(request).read())
+            if job["status"] != "done":
+                raise RuntimeError(f"Job {job['job_id']} ended {job['status']}: {job.get('error')}")
+            return time.perf_counter() - start_time
+
+        with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+            return list(executor.map(research, requests))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-request processes against the research service")
+    parser.add_argument("--requests", type=int, default=24, help="requests sent at once")
+    parser.add_argument("--distinct", type=int, default=8, help="different ideas among them")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="processes at once (cli) or service workers (service)")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated modes to run")
+    parser.add_argument("--json", metavar="FILE", help="also write the report as JSON")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    requests = make_requests(args.requests, args.distinct)
+    reports = []
+    with server_from_args(args) as server:
+        env = dict(os.environ, OPENAI_BASE_URL=server.base_url, OPENAI_API_KEY="mock")
+        for mode in [mode.strip() for mode in args.modes.split(",") if mode.strip()]:
+            print(f"Running {mode}: {len(requests)} requests for {args.distinct} ideas...", file=sys.stderr)
+            calls_before = server.counts["requests"]
+            start_time = time.perf_counter()
+            latencies = (run_cli if mode == "cli" else run_service)(requests, args.concurrency, env)
+            elapsed = time.perf_counter() - start_time
+            reports.append({
+                "mode": mode,
+                "requests": len(requests),
+                "elapsed_seconds": round(elapsed, 3),
+                "latency_p50": round(percentile(latencies, 50), 3),
+                "latency_p95": round(percentile(latencies, 95), 3),
+                "api_calls": server.counts["requests"] - calls_before
+            })
+
+    print(f"\n{'Mode':<10}{'Requests':>10}{'Total s':>10}{'p50 s':>9}{'p95 s':>9}{'API calls':>11}")
+    print("-" * 59)
+    for report in reports:
+        print(f"{report['mode']:<10}{report['requests']:>10}{report['elapsed_seconds']:>10.2f}"
+              f"{report['latency_p50']:>9.2f}{report['latency_p95']:>9.2f}{report['api_calls']:>11}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"settings": vars(args), "modes": reports}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
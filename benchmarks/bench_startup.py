@@ -0,0 +1,106 @@
+"""
+Startup Budget Check
+
+Times short-lived entry points (importing the packages, evaluating a saved
+result, building the system, printing usage) in fresh interpreters, and
+reports any that go over their time budget or load a module they should not
+need yet. tests/test_startup.py enforces the same budgets, so slow imports
+cannot creep back into the CLI and worker start-up path.
+
+Usage: python -m benchmarks.bench_startup [--runs 5]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, Any, List, Tuple
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that only the first API call (or the corpus re-scorer) may load
+HEAVY_MODULES = ("openai", "httpx", "dotenv", "numpy")
+
+# (name, code, budget in ms, modules the code must not load)
+SCENARIOS: Tuple[Tuple[str, str, float, Tuple[str, ...]], ...] = (
+    ("import core", "import core", 30, HEAVY_MODULES + ("agents.base_agent",)),
+    ("import agents", "import agents", 30, HEAVY_MODULES + ("agents.base_agent",)),
+    ("evaluate a saved result",
+     "from core import AgentEvaluator\n"
+     "AgentEvaluator().evaluate_full_research({'Growth': {'analysis': 'market growth'}})",
+     50, HEAVY_MODULES + ("agents.base_agent",)),
+    ("build MarketResearchSystem",
+     "from core import MarketResearchSystem\n"
+     "MarketResearchSystem(verbose=False)",
+     150, ("openai", "httpx", "numpy")),
+    ("main.py usage message",
+     "import runpy\n"
+     "sys.argv = ['main.py']\n"
+     "try:\n"
+     "    runpy.run_path(os.path.join(PROJECT_ROOT, 'main.py'), run_name='__main__')\n"
+     "except SystemExit:\n"
+     "    pass",
+     30, HEAVY_MODULES + ("core.system", "agents.base_agent"))
+)
+
+# Wraps a scenario so the child reports its own elapsed time and loaded modules
+PROBE = """
+import os, sys, io, json, time
+PROJECT_ROOT = {root!r}
+sys.path.insert(0, PROJECT_ROOT)
+stdout, sys.stdout = sys.stdout, io.StringIO()
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+sys.stdout = stdout
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure(code: str, runs: int, workdir: str) -> Dict[str, Any]:
+    """Best-of-N time for code in a fresh interpreter, plus the modules it loaded"""
+    probe = PROBE.format(root=PROJECT_ROOT, code=code)
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "startup-check"))
+    timings = []
+    modules = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", probe], cwd=workdir, env=env,
+                                check=True, stdout=subprocess.PIPE).stdout
+        report = json.loads(output.decode().strip().splitlines()[-1])
+        timings.append(report["ms"])
+        modules = report["modules"]
+    return {"ms": min(timings), "modules": modules}
+
+
+def check(code: str, budget: float, forbidden: Tuple[str, ...], runs: int,
+          workdir: str) -> Tuple[float, List[str]]:
+    """Best-of-N time for one scenario and what is wrong with it (empty if nothing)"""
+    result = measure(code, runs, workdir)
+    loaded = [module for module in forbidden if module in result["modules"]]
+    problems = []
+    if result["ms"] > budget:
+        problems.append("over budget")
+    if loaded:
+        problems.append(f"loaded {', '.join(loaded)}")
+    return result["ms"], problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check start-up time budgets")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per scenario")
+    args = parser.parse_args()
+
+    print(f"{'Scenario':<30}{'Time ms':>10}{'Budget':>10}   Status")
+    print("-" * 64)
+    # A scratch directory keeps the response cache file out of the project
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, code, budget, forbidden in SCENARIOS:
+            ms, problems = check(code, budget, forbidden, args.runs, workdir)
+            print(f"{name:<30}{ms:>10.1f}{budget:>10.0f}   {'; '.join(problems) or 'ok'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Mock OpenAI Server
+
+Local stand-in for the chat completions endpoint, for benchmarking the
+pipeline without paying for API calls. Latency, jitter, error and 429 rates
+and response length are configurable; streamed requests get SSE chunks, and
+JSON-mode requests get a JSON object (optionally malformed at a set rate).
+One model can be made a faster, weaker tier for tiered routing.
+
+Usage: python -m benchmarks.mock_openai [--port 8000] [--latency 0.8] [--error-rate 0.01]
+       then OPENAI_BASE_URL=http://127.0.0.1:8000/v1 python main.py "idea"
+"""
+
+import re
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, List, Optional
+
+
+# Sentences that touch every evaluation criterion, so mock answers score like real ones
+RESPONSE_SENTENCES = (
+    "Based on recent market research, the leading competitor companies already offer similar product features.",
+    "The total addressable market size is estimated at $4 billion with steady growth and a positive trend.",
+    "Venture capital investors closed several funding rounds in 2024 at higher valuations.",
+    "Revenue potential depends on pricing and monetization, with subscription income forecast to increase.",
+    "Considering the evidence and analysis overall, we recommend this as a good opportunity with strong potential.",
+    "The main weakness is customer acquisition cost, because incumbent players have a distribution advantage.",
+    "Data from portfolio returns suggests the latest entrants are likely to grow due to current demand.",
+    "Together these factors point to a clear strategy, although regulation remains uncertain."
+)
+
+# A vague answer that misses the evaluation keywords, as a weak model might give
+WEAK_SENTENCE = "This idea might work for some people, but it is hard to say much more about it."
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+# JSON-mode keys announced in the system prompt, as FusedAgent does
+JSON_KEYS_PATTERN = re.compile(r"JSON object with exactly these keys: (.*)\.")
+
+
+class MockOpenAIServer:
+    """
+    Threaded HTTP server answering POST .../chat/completions.
+
+    Each request sleeps for a latency drawn from the configured distribution
+    (mean `latency` seconds, spread `jitter` seconds) plus `token_latency`
+    per completion token. It then fails with a 500 at `error_rate`, fails
+    with a 429 plus Retry-After at `rate_limit_rate`, or answers with about
+    `response_tokens` tokens (capped by max_tokens).
+    Streamed requests spend `ttft_share` of the latency before the first
+    chunk and the rest spread over the chunks. JSON-mode requests get one
+    such answer per announced key, cut off at `malformed_rate`. Requests
+    for `fast_model` take 1/`fast_speedup` of the time, and `weak_rate` of
+    their answers are vague text that scores low.
+    """
+
+    def __init__(self, latency: float = 0.8, jitter: float = 0.2, distribution: str = "lognormal",
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 1.0,
+                 response_tokens: int = 300, token_latency: float = 0.0, ttft_share: float = 0.3,
+                 malformed_rate: float = 0.0, fast_model: Optional[str] = None, fast_speedup: float = 3.0,
+                 weak_rate: float = 0.0, host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {', '.join(LATENCY_DISTRIBUTIONS)}")
+        self.latency = latency
+        self.jitter = jitter
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.response_tokens = response_tokens
+        self.token_latency = token_latency
+        self.ttft_share = ttft_share
+        self.malformed_rate = malformed_rate
+        self.fast_model = fast_model
+        self.fast_speedup = fast_speedup
+        self.weak_rate = weak_rate
+        self.counts = {"requests": 0, "errors": 0, "rate_limited": 0, "streamed": 0, "malformed": 0,
+                       "fast": 0, "weak": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _draw(self) -> Dict[str, Any]:
+        """Latency and outcome for one request"""
+        with self._lock:
+            rng = self._random
+            if self.distribution == "fixed":
+                latency = self.latency
+            elif self.distribution == "uniform":
+                latency = rng.uniform(self.latency - self.jitter, self.latency + self.jitter)
+            elif self.distribution == "normal":
+                latency = rng.gauss(self.latency, self.jitter)
+            else:
+                # Long right tail like real completions; mean and spread match the settings
+                variance = max(self.jitter, 1e-9) ** 2
+                sigma2 = math.log(1 + variance / self.latency ** 2)
+                mu = math.log(self.latency) - sigma2 / 2
+                latency = rng.lognormvariate(mu, sigma2 ** 0.5)
+
+            roll = rng.random()
+            if roll < self.error_rate:
+                outcome = "error"
+            elif roll < self.error_rate + self.rate_limit_rate:
+                outcome = "rate_limited"
+            else:
+                outcome = "ok"
+            self.counts["requests"] += 1
+            if outcome == "error":
+                self.counts["errors"] += 1
+            elif outcome == "rate_limited":
+                self.counts["rate_limited"] += 1
+            return {"latency": max(0.0, latency), "outcome": outcome}
+
+    def _response_words(self, max_tokens: Optional[int]) -> List[str]:
+        """About response_tokens tokens of text, never more than max_tokens"""
+        tokens = min(self.response_tokens, max_tokens or self.response_tokens)
+        words = []
+        sentence = 0
+        while len(words) * 4 // 3 < tokens:  # ~0.75 words per token
+            words.extend(RESPONSE_SENTENCES[sentence % len(RESPONSE_SENTENCES)].split())
+            sentence += 1
+        return words[:max(1, tokens * 3 // 4)]
+
+    def _response_text(self, request: Dict[str, Any]) -> str:
+        """The completion for a request: plain text, or a JSON object in JSON mode"""
+        if (request.get("response_format") or {}).get("type") != "json_object":
+            words = self._response_words(request.get("max_tokens"))
+            if self._is_fast(request):
+                with self._lock:
+                    weak = self._random.random() < self.weak_rate
+                    if weak:
+                        self.counts["weak"] += 1
+                if weak:
+                    words = (WEAK_SENTENCE.split() * len(words))[:len(words)]
+            return " ".join(words)
+
+        system_prompt = next((m.get("content") or "" for m in request.get("messages", [])
+                              if m.get("role") == "system"), "")
+        match = JSON_KEYS_PATTERN.search(system_prompt)
+        keys = json.loads(f"[{match.group(1)}]") if match else ["result"]
+        section_tokens = (request.get("max_tokens") or self.response_tokens * len(keys)) // len(keys)
+        text = json.dumps({key: " ".join(self._response_words(section_tokens)) for key in keys})
+        with self._lock:
+            malformed = self._random.random() < self.malformed_rate
+            if malformed:
+                self.counts["malformed"] += 1
+        return text[:len(text) // 2] if malformed else text
+
+    def _is_fast(self, request: Dict[str, Any]) -> bool:
+        return self.fast_model is not None and request.get("model") == self.fast_model
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+                    return
+
+                draw = server._draw()
+                text = server._response_text(request) if draw["outcome"] == "ok" else ""
+                latency = draw["latency"] + server.token_latency * (len(text) // 4)
+                if server._is_fast(request):
+                    latency /= server.fast_speedup
+                    with server._lock:
+                        server.counts["fast"] += 1
+                stream = bool(request.get("stream"))
+                if draw["outcome"] != "ok" or not stream:
+                    time.sleep(latency)
+                if draw["outcome"] == "error":
+                    self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+                elif draw["outcome"] == "rate_limited":
+                    self._send_json(429, {"error": {"message": "Injected rate limit", "type": "rate_limit_error"}},
+                                    {"Retry-After": str(server.retry_after)})
+                elif stream:
+                    self._send_stream(request, text, latency)
+                else:
+                    self._send_completion(request, text)
+
+            def _usage(self, request: Dict[str, Any], completion_tokens: int) -> Dict[str, int]:
+                prompt_chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+                prompt_tokens = prompt_chars // 4 + 1
+                return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens}
+
+            def _send_completion(self, request: Dict[str, Any], text: str):
+                self._send_json(200, {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "mock"),
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": text}
+                    }],
+                    "usage": self._usage(request, len(text) // 4 + 1)
+                })
+
+            def _send_stream(self, request: Dict[str, Any], text: str, latency: float):
+                with server._lock:
+                    server.counts["streamed"] += 1
+                words = text.split(" ")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                time.sleep(latency * server.ttft_share)
+                word_delay = latency * (1 - server.ttft_share) / len(words)
+                for i, word in enumerate(words):
+                    self._send_event({
+                        "id": "chatcmpl-mock",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": request.get("model", "mock"),
+                        "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word},
+                                     "finish_reason": None}]
+                    })
+                    time.sleep(word_delay)
+                if (request.get("stream_options") or {}).get("include_usage"):
+                    self._send_event({
+                        "id": "chatcmpl-mock",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": request.get("model", "mock"),
+                        "choices": [],
+                        "usage": self._usage(request, len(text) // 4 + 1)
+                    })
+                self._send_chunk(b"data: [DONE]\n\n")
+                self._send_chunk(b"")
+
+            def _send_event(self, payload: Dict[str, Any]):
+                self._send_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+
+            def _send_chunk(self, data: bytes):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def _send_json(self, status: int, payload: Dict[str, Any],
+                           headers: Optional[Dict[str, str]] = None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    """Command-line options shared by every script that starts a mock server"""
+    parser.add_argument("--latency", type=float, default=0.8, help="mean seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.2, help="latency spread in seconds")
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429s")
+    parser.add_argument("--response-tokens", type=int, default=300, help="tokens per completion")
+    parser.add_argument("--token-latency", type=float, default=0.0,
+                        help="extra seconds per completion token (generation time)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="fraction of JSON-mode replies cut off mid-object")
+    parser.add_argument("--fast-model", help="model answered faster (and sometimes weakly), e.g. gpt-4o-mini")
+    parser.add_argument("--fast-speedup", type=float, default=3.0, help="how much faster the fast model is")
+    parser.add_argument("--weak-rate", type=float, default=0.0,
+                        help="fraction of fast-model answers that are vague and score low")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible runs")
+
+
+def server_from_args(args: argparse.Namespace, port: int = 0) -> MockOpenAIServer:
+    return MockOpenAIServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        distribution=args.distribution,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        response_tokens=args.response_tokens,
+        token_latency=args.token_latency,
+        malformed_rate=args.malformed_rate,
+        fast_model=args.fast_model,
+        fast_speedup=args.fast_speedup,
+        weak_rate=args.weak_rate,
+        port=port,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI chat completions endpoint")
+    parser.add_argument("--port", type=int, default=8000)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args, port=args.port)
+    print(f"Mock OpenAI endpoint at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nServed {server.counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,116 @@
 import os
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Settings read from the environment (after loading the .env file) on first
+# access, so importing config stays cheap. Values here are the defaults.
+ENVIRONMENT_SETTINGS = {
+    "OPENAI_API_KEY": None,
+    "OPENAI_BASE_URL": None,  # None uses the official endpoint
+    "CACHE_MODE": "use"  # use, refresh or bypass
+}
 
-# OpenAI Configuration
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+_dotenv_loaded = False
+
+
+def __getattr__(name):
+    global _dotenv_loaded
+    if name not in ENVIRONMENT_SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    if not _dotenv_loaded:
+        # Load environment variables from .env file
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+
+    value = os.getenv(name, ENVIRONMENT_SETTINGS[name])
+    globals()[name] = value  # later lookups skip this function
+    return value
+
+
+# OpenAI Configuration (OPENAI_API_KEY and OPENAI_BASE_URL come from the environment)
 OPENAI_MODEL = "gpt-3.5-turbo"
 
+# Model Pricing (USD per 1K prompt tokens, USD per 1K completion tokens)
+MODEL_PRICING = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4": (0.03, 0.06)
+}
+
+# HTTP Connection Pool (shared by all agents)
+HTTP_POOL_SIZE = 20  # maximum open connections
+HTTP_KEEPALIVE_EXPIRY = 30  # seconds an idle connection is kept open
+HTTP2_ENABLED = False  # requires the optional h2 package
+
 # Agent Configuration
-AGENT_TIMEOUT = 30  # seconds
+AGENT_TIMEOUT = 30  # seconds, total budget per agent call including retries
 MAX_RETRIES = 3
+RETRY_BACKOFF_BASE = 0.5  # seconds, doubled on every retry (with full jitter)
+RETRY_BACKOFF_MAX = 8.0  # seconds
+HEDGE_ENABLED = False  # fire a duplicate request when a call runs unusually long
+HEDGE_PERCENTILE = 95  # hedge once a call is slower than this latency percentile
+HEDGE_MIN_DELAY = 1.0  # seconds, never hedge sooner than this
+HEDGE_MIN_SAMPLES = 20  # latencies needed before hedging starts
+PARALLEL_AGENTS = True  # run the independent research agents concurrently
+BATCH_MAX_IN_FLIGHT = 8  # ideas researched at once in batch mode (per worker process)
+BATCH_WORKERS = 1  # worker processes in batch mode; more than 1 uses the sharded runner
+BATCH_CHECKPOINT_PATH = "batch_checkpoint.jsonl"  # finished ideas of a sharded batch, for resuming
+BATCH_ON_CIRCUIT_OPEN = "pause"  # "pause" re-queues ideas the circuit breaker refused, "drain" fails them
+BATCH_CIRCUIT_MAX_PAUSE = 600.0  # seconds a batch may spend paused in total before it drains
+STREAM_RESPONSES = False  # stream completions to record time-to-first-token
+DECISION_PROMPT_TOKEN_BUDGET = None  # tokens of upstream analysis sent to DecisionAgent (check with bench_compaction first)
+FUSED_MODE = False  # ask for every agent's section in one JSON completion (cheap triage)
+FUSED_MAX_TOKENS = 1900  # the four agents' own max_tokens combined
+
+# Tiered Model Routing (research agents try FAST_MODEL first and are re-run on
+# STRONG_MODEL only when the output misses the evaluation thresholds below)
+MODEL_ROUTING = False
+FAST_MODEL = "gpt-4o-mini"
+STRONG_MODEL = "gpt-4o"
+
+# Circuit Breaker (completion calls fail fast while the API looks down)
+CIRCUIT_BREAKER_ENABLED = True
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive failed calls (after retries) that open the breaker
+CIRCUIT_ERROR_RATE = 0.5  # share of failed calls in the window that opens the breaker
+CIRCUIT_WINDOW = 20  # recent calls the error rate is measured over
+CIRCUIT_MIN_CALLS = 10  # calls in the window before the error rate counts
+CIRCUIT_COOLDOWN = 30.0  # seconds the breaker stays open before probing
+CIRCUIT_PROBE_CALLS = 1  # calls let through at once while probing (half-open)
+
+# Micro-batching (the research steps of ideas in flight together share one
+# JSON completion per agent; saves requests under a requests/min quota)
+MICRO_BATCHING = False
+MICRO_BATCH_WINDOW = 0.05  # seconds a step waits for others to join its batch
+MICRO_BATCH_MAX_SIZE = 4  # ideas per batched completion
+
+# Client-side Rate Limits (None disables a limit)
+RATE_LIMIT_RPM = None  # requests per minute
+RATE_LIMIT_TPM = None  # tokens per minute, estimated as prompt size plus max_tokens
+
+# Response Cache
+CACHE_ENABLED = True
+CACHE_PATH = ".cache/llm_responses.sqlite3"
+CACHE_TTL = 7 * 24 * 3600  # seconds, None keeps entries forever
+CACHE_MAX_ENTRIES = 10000
+# CACHE_MODE comes from the environment (see ENVIRONMENT_SETTINGS)
+
+# Near-duplicate Ideas
+DEDUP_MODE = None  # None (off), "reuse" answers from the similar result, "flag" only reports it
+DEDUP_THRESHOLD = 0.8  # Jaccard similarity of normalized idea words
+DEDUP_NUM_PERM = 64  # MinHash signature length
+DEDUP_BANDS = 16  # LSH bands; ideas sharing any band are compared exactly
+
+# Result Store
+RESULT_STORE_PATH = "research_results.sqlite3"  # every research run is appended here
+
+# HTTP Service (python main.py --serve)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8080
+SERVICE_QUEUE_SIZE = 100  # queued jobs beyond this are rejected with 429
+SERVICE_JOB_HISTORY = 1000  # finished jobs kept for polling
 
-# Evaluation Thresholds
+# Evaluation Thresholds (also the quality floor of tiered model routing)
 GOOD_SCORE_THRESHOLD = 7.0  # out of 10
 MIN_RESPONSE_LENGTH = 100  # characters
@@ -1,13 +1,52 @@
 """
 Core Package
 
-Contains evaluation and system orchestration components.
+Contains evaluation, the agent registry, system orchestration and batch
+execution components.
 """
 
-from .evaluator import AgentEvaluator
-from .system import MarketResearchSystem
+import importlib
+
+# Imported on first access, so e.g. using AgentEvaluator alone does not load
+# the agents or the HTTP stack
+_LAZY_EXPORTS = {
+    'AgentEvaluator': '.evaluator',
+    'MarketResearchSystem': '.system',
+    'BatchRunner': '.batch',
+    'ShardedBatchRunner': '.sharded',
+    'AgentSpec': '.registry',
+    'AgentRegistry': '.registry',
+    'default_registry': '.registry',
+    'DagExecutor': '.executor',
+    'TieredRouter': '.routing',
+    'MicroBatcher': '.micro_batch',
+    'ResearchService': '.service',
+    'ConsolePrinter': '.console'
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
 
 __all__ = [
     'AgentEvaluator',
-    'MarketResearchSystem'
+    'MarketResearchSystem',
+    'BatchRunner',
+    'ShardedBatchRunner',
+    'AgentSpec',
+    'AgentRegistry',
+    'default_registry',
+    'DagExecutor',
+    'TieredRouter',
+    'MicroBatcher',
+    'ResearchService',
+    'ConsolePrinter'
 ]
@@ -0,0 +1,204 @@
+"""
+Batch Runner
+
+Streams product ideas from a text or JSONL source through one shared
+MarketResearchSystem with a bounded number of ideas in flight.
+"""
+
+import os
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Iterable, Iterator, Optional, TextIO, Tuple
+from config import BATCH_MAX_IN_FLIGHT, BATCH_ON_CIRCUIT_OPEN, BATCH_CIRCUIT_MAX_PAUSE
+from agents.circuit_breaker import CircuitBreaker, CLOSED, get_circuit_breaker
+from agents.client import ConnectionStats
+
+CIRCUIT_MODES = ("pause", "drain")
+
+_END = object()
+
+
+def circuit_tripped(result: Dict[str, Any]) -> bool:
+    """Whether the circuit breaker refused any step of a result, so the idea was not fully researched"""
+    return any(step.get("status") == "circuit_open" for step in result.get("research_results", {}).values())
+
+
+def is_failed(result: Dict[str, Any]) -> bool:
+    """
+    Whether a batch result counts as failed (and is retried when a
+    checkpointed batch resumes): the run raised, or any step did not
+    succeed, including a decision that was skipped for lack of inputs.
+    """
+    if "error" in result:
+        return True
+    steps = result.get("research_results") or {}
+    return not steps or any(step.get("status", "ok") != "ok" for step in steps.values())
+
+
+def iter_ideas(source: TextIO) -> Iterator[str]:
+    """
+    Yield product ideas one line at a time.
+
+    Plain lines are taken as the idea itself. Lines that look like JSON objects
+    are read as JSONL records with an "idea" or "product_idea" field. Blank
+    lines are skipped.
+    """
+    for line_number, line in enumerate(source, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith("{"):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+            idea = record.get("idea") or record.get("product_idea")
+            if not idea:
+                raise ValueError(f"No 'idea' field on line {line_number}")
+            yield str(idea).strip()
+        else:
+            yield line
+
+
+def iter_saved_results(paths: Iterable[str], oldest_first: bool = False) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (source, result) for every stored research result.
+
+    .json files hold one result (as written by main.py before the result
+    store). .jsonl files hold one result per line (as written by batch
+    mode). .sqlite3/.db files are result stores, read newest first, or
+    oldest first like the files when oldest_first is set.
+    """
+    for path in paths:
+        if path.endswith((".sqlite3", ".db")):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No result store at {path}")
+            from .store import ResultStore
+            store = ResultStore(path)
+            for result in store.query(full=True, oldest_first=oldest_first):
+                yield f"{path}#{result.get('product_idea')}", result
+            store.close()
+            continue
+        with open(path) as f:
+            if path.endswith(".jsonl"):
+                for line_number, line in enumerate(f, 1):
+                    if line.strip():
+                        yield f"{path}:{line_number}", json.loads(line)
+            else:
+                yield path, json.load(f)
+
+
+class BatchRunner:
+    """
+    Runs many product ideas through a single warm system.
+
+    While the circuit breaker is open, on_circuit_open="pause" holds back
+    new ideas and re-queues those it refused. The batch resumes with one
+    idea at a time once the breaker probes again, and at full concurrency
+    when it has closed. After max_pause seconds paused in total, the batch
+    drains instead. With "drain", refused ideas are written as failed
+    straight away.
+    """
+
+    def __init__(self, system, max_in_flight: int = BATCH_MAX_IN_FLIGHT, store=None,
+                 circuit_breaker: Optional[CircuitBreaker] = None, on_circuit_open: str = BATCH_ON_CIRCUIT_OPEN,
+                 max_pause: float = BATCH_CIRCUIT_MAX_PAUSE):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if on_circuit_open not in CIRCUIT_MODES:
+            raise ValueError(f"on_circuit_open must be one of {', '.join(CIRCUIT_MODES)}")
+        self.system = system
+        self.max_in_flight = max_in_flight
+        self.store = store  # ResultStore that also receives every result, if given
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else get_circuit_breaker()
+        self.on_circuit_open = on_circuit_open
+        self.max_pause = max_pause
+
+    def run(self, ideas: Iterable[str], output: TextIO) -> Dict[str, Any]:
+        """
+        Research every idea and write each finished result as one JSONL line.
+
+        Ideas are pulled from the iterable only when a slot frees up, so the
+        batch is never held in memory. Results are written in completion
+        order, not input order.
+        """
+        completed = 0
+        failed = 0
+        requeued = 0
+        paused = 0.0
+        connection_snapshot = getattr(self.system, "connection_snapshot", None)
+        connections_before = connection_snapshot() if connection_snapshot is not None else None
+        start_time = time.perf_counter()
+
+        ideas = iter(ideas)
+        retry = deque()  # ideas the open breaker refused, tried again before new ones
+        exhausted = False
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            pending = {}  # future -> idea
+            while True:
+                pausing = self.on_circuit_open == "pause" and paused < self.max_pause
+                # While the breaker is not closed, one idea at a time probes it
+                limit = 1 if pausing and self.circuit_breaker.state != CLOSED else self.max_in_flight
+                if pending and (len(pending) >= limit or (exhausted and not retry)):
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        idea = pending.pop(future)
+                        result = future.result()
+                        if pausing and circuit_tripped(result):
+                            retry.append(idea)
+                            requeued += 1
+                        else:
+                            failed += self._write_result(result, output)
+                            completed += 1
+                    continue
+                if exhausted and not retry:
+                    break
+
+                if pausing:
+                    paused += self.circuit_breaker.wait_until_ready(self.max_pause - paused)
+                idea = retry.popleft() if retry else next(ideas, _END)
+                if idea is _END:
+                    exhausted = True
+                    continue
+                pending[executor.submit(self._research, idea)] = idea
+
+        elapsed = time.perf_counter() - start_time
+        idea_index = getattr(self.system, "idea_index", None)
+        micro_batcher = getattr(self.system, "micro_batcher", None)
+        return {
+            "ideas": completed,
+            "failed": failed,
+            "elapsed_seconds": round(elapsed, 2),
+            "ideas_per_minute": round(completed / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "connections": self._connection_usage(connections_before),
+            "dedup": idea_index.stats() if idea_index is not None else None,
+            "micro_batch": micro_batcher.stats() if micro_batcher is not None else None,
+            "requeued": requeued,
+            "paused_seconds": round(paused, 2),
+            "circuit": self.circuit_breaker.snapshot()
+        }
+
+    def _research(self, product_idea: str) -> Dict[str, Any]:
+        """Research one idea, turning unexpected failures into an error record"""
+        try:
+            return self.system.research_product_idea(product_idea)
+        except Exception as e:
+            return {"product_idea": product_idea, "error": str(e)}
+
+    def _connection_usage(self, before: Optional[Dict[str, int]]) -> Optional[Dict[str, Any]]:
+        """Connection reuse over the whole batch, if the system's client tracks it"""
+        if before is None:
+            return None
+        after = self.system.connection_snapshot()
+        return ConnectionStats.summarize(before, after) if after is not None else None
+
+    def _write_result(self, result: Dict[str, Any], output: TextIO) -> int:
+        """Write one result line and return 1 if it was a failure"""
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        if self.store is not None:
+            self.store.add(result)
+        return 1 if is_failed(result) else 0
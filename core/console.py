@@ -0,0 +1,217 @@
+"""
+Console Printer
+
+Subscriber that prints research events to the console: step results in
+registration order, streamed text as it arrives, and the evaluation summary.
+"""
+
+import sys
+import threading
+from typing import Dict, Any, Optional, TextIO
+from .events import (
+    ResearchEvent, ResearchStarted, IdeaReused, SimilarIdeaFound, FusedStarted, FusedFallback,
+    AgentStarted, AgentChunk, AgentFinished, EvaluationReady
+)
+
+# Console preview (label, characters) of streamed text, by the result field an agent writes it to
+OUTPUT_PREVIEWS = {"analysis": ("Analysis", 200)}
+
+# Result fields not previewed while streaming: a decision's recommendation, known
+# only once it finishes, is printed before its reasoning
+UNSTREAMED_FIELDS = ("reasoning",)
+
+
+class _StreamPreview:
+    """Prints the start of a streamed text as it arrives, truncated like the static preview"""
+
+    def __init__(self, out: TextIO, label: str, limit: int):
+        self.out = out
+        self.limit = limit
+        self.length = 0
+        self.finished = False
+        out.write(f"   {label}: ")
+        out.flush()
+
+    def __call__(self, text: str):
+        if self.finished:
+            return  # a step that overran its timeout may still be streaming
+        if self.length < self.limit:
+            self.out.write(text[:self.limit - self.length])
+            self.out.flush()
+        self.length += len(text)
+
+    def finish(self, final_text: str):
+        """End the preview line, showing final_text if nothing was streamed (e.g. an error)"""
+        if self.length == 0:
+            self(final_text)
+        self.finished = True
+        self.out.write(f"{'...' if self.length > self.limit else ''}\n")
+        self.out.flush()
+
+
+class ConsolePrinter:
+    """
+    Prints the events of one run at a time.
+
+    Steps finish in any order but are printed in registration order. The
+    step next in line prints its title when it starts and, when streaming,
+    its text as it arrives (except a decision's reasoning, which follows its
+    recommendation); the others print once it is their turn.
+    """
+
+    def __init__(self, out: Optional[TextIO] = None):
+        self.out = out if out is not None else sys.stdout
+        self._lock = threading.Lock()  # chunks arrive on the steps' own threads
+        self._reset([])
+
+    def __call__(self, event: ResearchEvent):
+        handler = getattr(self, f"_on_{event.kind}", None)
+        if handler is not None:
+            handler(event)
+
+    def _reset(self, order):
+        self.order = list(order)
+        self.next = 0
+        self.results = {}
+        self.titles = {}
+        self.output_fields = {}
+        self.titled = set()
+        self.previews = {}
+        self.reused = False
+
+    def _print(self, *args):
+        print(*args, file=self.out)
+
+    def _on_research_started(self, event: ResearchStarted):
+        self._reset(event.agents)
+        self._print(f"\n Researching product idea: {event.product_idea}")
+        self._print("=" * 60)
+
+    def _on_idea_reused(self, event: IdeaReused):
+        self.reused = True
+        self._print(f"\n♻️  Reusing research for \"{event.similar['product_idea']}\" "
+                    f"(similarity {event.similar['similarity']:.2f}, "
+                    f"{event.api_calls_avoided} API calls avoided)")
+
+    def _on_fused_started(self, event: FusedStarted):
+        self._print("\n⚡ Fused research (one call for all agents)...")
+
+    def _on_fused_fallback(self, event: FusedFallback):
+        self._print(f"   Fused reply unusable ({event.reason}), falling back to per-agent calls")
+
+    def _on_agent_started(self, event: AgentStarted):
+        self.titles[event.agent] = event.title
+        self.output_fields[event.agent] = event.output_field
+        if self.next < len(self.order) and self.order[self.next] == event.agent:
+            self._print(f"\n{event.title}")
+            self.titled.add(event.agent)
+
+    def _on_agent_chunk(self, event: AgentChunk):
+        with self._lock:
+            if event.agent not in self.titled or event.agent in self.results:
+                return  # not this step's turn, or already printed
+            if self.output_fields[event.agent] in UNSTREAMED_FIELDS:
+                return
+            preview = self.previews.get(event.agent)
+            if preview is None:
+                label, limit = OUTPUT_PREVIEWS.get(self.output_fields[event.agent], OUTPUT_PREVIEWS["analysis"])
+                preview = self.previews[event.agent] = _StreamPreview(self.out, label, limit)
+            preview(event.text)
+
+    def _on_agent_finished(self, event: AgentFinished):
+        with self._lock:
+            self.titles[event.agent] = event.title
+            self.results[event.agent] = event.result
+            while self.next < len(self.order) and self.order[self.next] in self.results:
+                name = self.order[self.next]
+                if name not in self.titled:
+                    self._print(f"\n{self.titles[name]}")
+                preview = self.previews.get(name)
+                if preview is not None:
+                    result = self.results[name]
+                    preview.finish(result.get("analysis") or result.get("reasoning") or "")
+                self._print_step_result(self.results[name], streamed=preview is not None)
+                self.next += 1
+
+    def _on_evaluation_ready(self, event: EvaluationReady):
+        if not self.reused:
+            self._print("\n📊 System Evaluation")
+            self._print("-" * 30)
+        self._print_evaluation(event.evaluation)
+
+    def _on_similar_idea_found(self, event: SimilarIdeaFound):
+        self._print(f"\n   Similar to earlier idea \"{event.similar['product_idea']}\" "
+                    f"(similarity {event.similar['similarity']:.2f})")
+
+    def _print_step_result(self, result: Dict[str, Any], streamed: bool = False):
+        """Print one step's result in the format of its kind of agent"""
+        if "recommendation" in result:
+            self._print_decision_result(result, streamed)
+        else:
+            self._print_agent_result(result, streamed)
+
+    def _print_agent_result(self, result: Dict[str, Any], streamed: bool = False):
+        """Print formatted agent result (the analysis preview is skipped if it was streamed)"""
+        analysis = result.get("analysis", "No analysis available")
+        confidence = result.get("confidence", 0.0)
+
+        if not streamed:
+            self._print(f"   Analysis: {analysis[:200]}{'...' if len(analysis) > 200 else ''}")
+        self._print(f"   Confidence: {confidence:.1f}")
+
+    def _print_decision_result(self, result: Dict[str, Any], streamed: bool = False):
+        """Print formatted decision result (the reasoning preview is skipped if it was streamed)"""
+        recommendation = result.get("recommendation", "Unknown")
+        reasoning = result.get("reasoning", "No reasoning available")
+        confidence = result.get("confidence", 0.0)
+
+        # Color coding for recommendations
+        colors = {
+            "Good": "🟢",
+            "Neutral": "🟡",
+            "Poor": "🔴",
+            "Error": "⚠️"
+        }
+
+        self._print(f"   {colors.get(recommendation, '❓')} Recommendation: {recommendation}")
+        if not streamed:
+            self._print(f"   Reasoning: {reasoning[:300]}{'...' if len(reasoning) > 300 else ''}")
+        self._print(f"   Confidence: {confidence:.1f}")
+
+    def _print_evaluation(self, evaluation: Dict[str, Any]):
+        """Print system evaluation summary"""
+        system_perf = evaluation.get("system_performance", {})
+        overall_score = system_perf.get("overall_score", 0)
+        recommendations = evaluation.get("recommendations", [])
+
+        self._print(f"   Overall Score: {overall_score}/10")
+        self._print(f"   Performance: {self._get_performance_label(overall_score)}")
+
+        usage = evaluation.get("usage")
+        if usage:
+            total = usage["total"]
+            cost = f"${total['cost_usd']:.4f}" if total["cost_usd"] is not None else "unknown cost"
+            slowest = total["slowest_agent"]
+            self._print(f"   Usage: {total['prompt_tokens'] + total['completion_tokens']} tokens, {cost}, "
+                        f"slowest agent {slowest} ({usage['agents'][slowest]['wall_time']}s)")
+            routing = total.get("routing")
+            if routing:
+                self._print(f"   Routing: {routing['routed'] - routing['escalated']}/{routing['routed']} agents "
+                            f"on the fast model, est. ${routing['cost_saved_usd']:.4f} and "
+                            f"{routing['latency_saved']}s saved")
+
+        if recommendations:
+            self._print("   Recommendations:")
+            for rec in recommendations[:2]:  # Show top 2
+                self._print(f"     • {rec}")
+
+    def _get_performance_label(self, score: float) -> str:
+        """Get performance label from score"""
+        if score >= 8.0:
+            return "Excellent ⭐"
+        elif score >= 6.0:
+            return "Good ✅"
+        elif score >= 4.0:
+            return "Adequate ⚠️"
+        else:
+            return "Needs Improvement ❌"
@@ -0,0 +1,240 @@
+"""
+Corpus Evaluator
+
+Re-scores a stored corpus of research results with array operations, so a
+change to AgentEvaluator's criteria can be applied to thousands of saved runs
+in seconds.
+
+Usage: python -m core.corpus [research_results.sqlite3 "research_results_*.json" ...] [--output scores.jsonl]
+"""
+
+import sys
+import glob
+import json
+import time
+import argparse
+import numpy as np
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
+from config import RESULT_STORE_PATH
+from .evaluator import AgentEvaluator
+from .batch import iter_saved_results
+
+
+class CorpusEvaluator:
+    """
+    Vectorized equivalent of AgentEvaluator.evaluate_full_research.
+
+    Analyses are streamed from disk and reduced to a document x keyword
+    presence matrix per agent type plus a length vector, so no text is held
+    in memory. Every per-criterion score, agent score, system score and
+    score_distribution bucket is then computed with NumPy. Scores match evaluate_full_research
+    exactly; agents without evaluation criteria are skipped.
+    """
+
+    CHUNK_SIZE = 4096  # documents buffered before they are packed into an array
+
+    def __init__(self, evaluator: Optional[AgentEvaluator] = None):
+        self.evaluator = evaluator if evaluator is not None else AgentEvaluator()
+        self.agent_keys = list(self.evaluator.evaluation_criteria)
+
+        # Per agent type: its keyword matcher and keyword x criterion incidence
+        # matrix (a keyword listed twice in a criterion counts twice)
+        self._matchers = {}
+        self._incidence = {}
+        self._has_keywords = {}
+        for agent_key, criteria in self.evaluator.evaluation_criteria.items():
+            matcher = self.evaluator._keyword_matcher(agent_key)
+            incidence = np.zeros((len(matcher.keywords), len(criteria)))
+            keyword_index = {keyword: i for i, keyword in enumerate(matcher.keywords)}
+            for column, criterion in enumerate(criteria):
+                for keyword in self.evaluator.KEYWORD_SETS.get(criterion, ()):
+                    incidence[keyword_index[keyword], column] += 1
+            self._matchers[agent_key] = matcher
+            self._incidence[agent_key] = incidence
+            self._has_keywords[agent_key] = np.array([c in self.evaluator.KEYWORD_SETS for c in criteria])
+
+    def iter_results(self, paths: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (source, result) for every stored result (.json or .jsonl)"""
+        return iter_saved_results(paths)
+
+    def evaluate(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """Score every stored result and return per-result scores plus a summary"""
+        start_time = time.perf_counter()
+        documents, sources, ideas, agent_names, result_ids = self._load(paths)
+
+        agent_scores = np.zeros(len(result_ids))
+        criterion_means = {}
+        for agent_key, (doc_ids, presence, lengths) in documents.items():
+            criterion_scores = self._criterion_scores(agent_key, presence, lengths)
+            agent_scores[doc_ids] = self._agent_scores(criterion_scores)
+            criterion_means[agent_key] = criterion_scores.mean(axis=0) if len(doc_ids) else None
+
+        # Per-result system scores, summed in agent order like evaluate_full_research
+        result_count = len(sources)
+        agents_per_result = np.bincount(result_ids, minlength=result_count)
+        score_sums = np.bincount(result_ids, weights=agent_scores, minlength=result_count)
+        system_scores = np.where(agents_per_result > 0, score_sums / np.maximum(agents_per_result, 1), 0.0)
+
+        bucket_ids = np.digitize(agent_scores, [4, 6, 8])  # poor, adequate, good, excellent
+        buckets = np.zeros((result_count, 4), dtype=int)
+        np.add.at(buckets, (result_ids, bucket_ids), 1)
+
+        results = []
+        offsets = np.concatenate([[0], np.cumsum(agents_per_result)]).tolist()
+        agent_score_list = agent_scores.tolist()
+        for i, source in enumerate(sources):
+            agent_range = range(offsets[i], offsets[i + 1])
+            results.append({
+                "source": source,
+                "product_idea": ideas[i],
+                "overall_score": round(float(system_scores[i]), 2),
+                "agent_scores": {agent_names[j]: agent_score_list[j] for j in agent_range},
+                "score_distribution": {
+                    "excellent": int(buckets[i, 3]),
+                    "good": int(buckets[i, 2]),
+                    "adequate": int(buckets[i, 1]),
+                    "poor": int(buckets[i, 0])
+                }
+            })
+
+        return {
+            "results": results,
+            "summary": self._summarize(documents, agent_scores, criterion_means, system_scores,
+                                       time.perf_counter() - start_time)
+        }
+
+    def _load(self, paths: Iterable[str]):
+        """
+        Stream results into one presence matrix per agent type.
+
+        Documents are numbered in reading order (results in order, agents in
+        their stored order), which keeps each result's agents contiguous.
+        """
+        chunks = {agent_key: [] for agent_key in self.agent_keys}
+        buffers = {agent_key: [] for agent_key in self.agent_keys}
+        lengths = {agent_key: [] for agent_key in self.agent_keys}
+        doc_ids = {agent_key: [] for agent_key in self.agent_keys}
+        sources = []
+        ideas = []
+        agent_names = []
+        result_ids = []
+
+        for source, result in self.iter_results(paths):
+            research = result.get("research_results", {})
+            for agent_name, response in research.items():
+                agent_key = agent_name.lower()
+                if agent_name == "summary" or agent_key not in self._matchers:
+                    continue
+                analysis = response.get("analysis", "") or response.get("reasoning", "")
+                buffer = buffers[agent_key]
+                buffer.append(self._matchers[agent_key].presence(analysis))
+                lengths[agent_key].append(len(analysis))
+                doc_ids[agent_key].append(len(result_ids))
+                result_ids.append(len(sources))
+                agent_names.append(agent_name)
+                if len(buffer) >= self.CHUNK_SIZE:
+                    chunks[agent_key].append(np.array(buffer, dtype=np.uint8))
+                    buffers[agent_key] = []
+            sources.append(source)
+            ideas.append(result.get("product_idea", ""))
+
+        documents = {}
+        for agent_key in self.agent_keys:
+            keyword_count = len(self._matchers[agent_key].keywords)
+            parts = chunks[agent_key] + [
+                np.array(buffers[agent_key], dtype=np.uint8).reshape(-1, keyword_count)
+            ]
+            documents[agent_key] = (
+                np.array(doc_ids[agent_key], dtype=int),
+                np.vstack(parts),
+                np.array(lengths[agent_key], dtype=float)
+            )
+        return documents, sources, ideas, agent_names, np.array(result_ids, dtype=int)
+
+    def _criterion_scores(self, agent_key: str, presence: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Document x criterion scores, same formula as AgentEvaluator._score_criterion"""
+        keyword_counts = presence @ self._incidence[agent_key]
+        keyword_score = np.minimum(keyword_counts / 3, 1.0) * 6
+        length_score = np.minimum(lengths / 200, 1.0) * 4
+        keyword_based = np.minimum(10.0, keyword_score + length_score[:, None])
+        default = np.where(lengths > 50, 5.0, 2.0)[:, None]
+        return np.where(self._has_keywords[agent_key], keyword_based, default)
+
+    def _agent_scores(self, criterion_scores: np.ndarray) -> np.ndarray:
+        """Each document's mean criterion score, rounded to 2 places"""
+        total = np.zeros(len(criterion_scores))
+        for column in range(criterion_scores.shape[1]):  # left-to-right, as sum() does
+            total = total + criterion_scores[:, column]
+        scores = total / criterion_scores.shape[1]
+        # Python's round() is correctly rounded; np.round can differ on ties
+        return np.array([round(score, 2) for score in scores.tolist()])
+
+    def _summarize(self, documents: Dict[str, tuple], agent_scores: np.ndarray,
+                   criterion_means: Dict[str, Any], system_scores: np.ndarray,
+                   elapsed: float) -> Dict[str, Any]:
+        """Corpus-wide averages per agent and criterion"""
+        agents = {}
+        for agent_key, (doc_ids, _, _) in documents.items():
+            if not len(doc_ids):
+                continue
+            agents[agent_key] = {
+                "documents": len(doc_ids),
+                "mean_score": round(float(agent_scores[doc_ids].mean()), 2),
+                "criteria": {
+                    criterion: round(float(mean), 2)
+                    for criterion, mean in zip(self.evaluator.evaluation_criteria[agent_key],
+                                               criterion_means[agent_key])
+                }
+            }
+
+        return {
+            "results": len(system_scores),
+            "documents": len(agent_scores),
+            "mean_overall_score": round(float(system_scores.mean()), 2) if len(system_scores) else 0.0,
+            "overall_distribution": {
+                "excellent": int((system_scores >= 8).sum()),
+                "good": int(((system_scores >= 6) & (system_scores < 8)).sum()),
+                "adequate": int(((system_scores >= 4) & (system_scores < 6)).sum()),
+                "poor": int((system_scores < 4).sum())
+            },
+            "agents": agents,
+            "elapsed_seconds": round(elapsed, 3)
+        }
+
+
+def print_summary(summary: Dict[str, Any], output=sys.stdout):
+    """Print the corpus summary as a table"""
+    print(f"\n Re-scored {summary['results']} results ({summary['documents']} agent responses) "
+          f"in {summary['elapsed_seconds']}s", file=output)
+    print(f"   Mean overall score: {summary['mean_overall_score']}/10", file=output)
+    distribution = summary["overall_distribution"]
+    print("   Distribution: " + ", ".join(f"{label} {count}" for label, count in distribution.items()),
+          file=output)
+
+    print(f"\n   {'Agent':<12}{'Docs':>8}{'Mean':>8}   Criteria", file=output)
+    print("   " + "-" * 70, file=output)
+    for agent_key, stats in summary["agents"].items():
+        criteria = ", ".join(f"{name} {score}" for name, score in stats["criteria"].items())
+        print(f"   {agent_key:<12}{stats['documents']:>8}{stats['mean_score']:>8}   {criteria}", file=output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored research results")
+    parser.add_argument("patterns", nargs="*", default=[RESULT_STORE_PATH],
+                        help="files or glob patterns (.json, .jsonl or a result store)")
+    parser.add_argument("--output", metavar="FILE",
+                        help="write per-result scores as JSONL")
+    args = parser.parse_args()
+
+    paths = sorted(path for pattern in args.patterns for path in (glob.glob(pattern) or [pattern]))
+    report = CorpusEvaluator().evaluate(paths)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            for result in report["results"]:
+                f.write(json.dumps(result) + "\n")
+    print_summary(report["summary"])
+
+
+if __name__ == "__main__":
+    main()
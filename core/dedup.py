@@ -0,0 +1,201 @@
+"""
+Near-duplicate Idea Detection
+
+MinHash/LSH index over previously researched product ideas, so an idea that
+is only a rewording of one already researched (e.g. "AI-powered fitness app"
+vs "AI fitness app") can reuse that result instead of four new LLM calls.
+"""
+
+import re
+import copy
+import random
+import hashlib
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from config import DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_BANDS
+from .batch import iter_saved_results
+
+
+# Words that do not change what an idea is about
+STOPWORDS = frozenset((
+    "a", "an", "the", "for", "of", "to", "and", "or", "with", "that", "which", "in", "on", "at",
+    "by", "from", "your", "our", "their", "my", "its", "is", "are", "be", "this", "using", "via"
+))
+
+# Modifiers that only link a technology to the idea: "AI-powered", "powered by AI" -> "ai"
+MODIFIERS = frozenset(("powered", "based", "driven", "enabled"))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_idea(idea: str) -> List[str]:
+    """Lowercased content words of an idea, with modifiers and plurals folded"""
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", idea.lower()):  # hyphenated words split apart
+        if word in STOPWORDS or word in MODIFIERS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]  # "apps" -> "app"
+        tokens.append(word)
+    return tokens
+
+
+def shingles(idea: str) -> Set[str]:
+    """The set compared between ideas: normalized words, order ignored"""
+    return set(normalize_idea(idea))
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class IdeaIndex:
+    """
+    Incremental index of researched ideas and their results.
+
+    Each idea's shingle set gets a MinHash signature that is split into LSH
+    bands, so a lookup only compares against ideas that share a band. The
+    candidates are then checked with the exact Jaccard similarity against
+    `threshold`. In "reuse" mode a match answers the idea from the stored
+    result; in "flag" mode the idea is researched anyway and the match is
+    only reported. Safe to share between threads.
+    """
+
+    MODES = ("reuse", "flag")
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, mode: str = "reuse",
+                 num_perm: int = DEDUP_NUM_PERM, bands: int = DEDUP_BANDS):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown dedup mode: {mode}")
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.mode = mode
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # Fixed seed: signatures must not change between runs
+        rng = random.Random(1)
+        self._permutations = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(_MERSENNE_PRIME))
+                              for _ in range(num_perm)]
+        self._entries: List[Tuple[str, Set[str], Dict[str, Any]]] = []
+        self._exact: Dict[frozenset, int] = {}
+        self._buckets: Dict[Tuple[int, tuple], List[int]] = {}
+        self._lock = threading.Lock()
+        self.matches = 0
+        self.api_calls_avoided = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, idea: str, result: Dict[str, Any]):
+        """Index a researched idea; a later result for the same wording replaces it"""
+        idea_shingles = shingles(idea)
+        if not idea_shingles:
+            return
+        key = frozenset(idea_shingles)
+        signature = self._signature(idea_shingles)
+
+        with self._lock:
+            if key in self._exact:
+                index = self._exact[key]
+                self._entries[index] = (idea, idea_shingles, result)
+                return
+            index = len(self._entries)
+            self._entries.append((idea, idea_shingles, result))
+            self._exact[key] = index
+            for band in range(self.bands):
+                band_key = (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+                self._buckets.setdefault(band_key, []).append(index)
+
+    def load(self, paths: Iterable[str]) -> int:
+        """
+        Index the results stored in .json/.jsonl files and result stores and
+        return how many were added. Each source is read in the order it was
+        researched, so the latest run of an idea is the one reused.
+        """
+        added = 0
+        for _, result in iter_saved_results(paths, oldest_first=True):
+            if is_reusable(result):
+                self.add(result["product_idea"], result)
+                added += 1
+        return added
+
+    def find(self, idea: str) -> Optional[Dict[str, Any]]:
+        """
+        The most similar indexed idea at or above the threshold, as
+        {"product_idea", "similarity", "result"}, or None.
+        """
+        idea_shingles = shingles(idea)
+        if not idea_shingles:
+            return None
+        signature = self._signature(idea_shingles)
+
+        with self._lock:
+            candidates = set()
+            for band in range(self.bands):
+                band_key = (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+                candidates.update(self._buckets.get(band_key, ()))
+
+            best = None
+            for index in candidates:
+                stored_idea, stored_shingles, result = self._entries[index]
+                similarity = jaccard(idea_shingles, stored_shingles)
+                if similarity >= self.threshold and (best is None or similarity > best["similarity"]):
+                    best = {"product_idea": stored_idea, "similarity": round(similarity, 3), "result": result}
+            return best
+
+    def reuse(self, product_idea: str, match: Dict[str, Any]) -> Dict[str, Any]:
+        """A copy of the matched result answering product_idea, counting the calls it saved"""
+        result = copy.deepcopy(match["result"])
+        calls = len(result.get("research_results", {}))
+        with self._lock:
+            self.matches += 1
+            self.api_calls_avoided += calls
+
+        result["product_idea"] = product_idea
+        # No calls were made for this idea, so the original run's usage does not apply
+        result.get("evaluation", {}).pop("usage", None)
+        result["reused_from"] = {
+            "product_idea": match["product_idea"],
+            "similarity": match["similarity"],
+            "api_calls_avoided": calls
+        }
+        result["cache"] = {"hits": 0, "misses": 0}
+        result["connections"] = None
+        return result
+
+    def flag(self, match: Dict[str, Any]) -> Dict[str, Any]:
+        """The note attached to a result that was researched despite a match"""
+        with self._lock:
+            self.matches += 1
+        return {"product_idea": match["product_idea"], "similarity": match["similarity"]}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "indexed_ideas": len(self._entries),
+                "matches": self.matches,
+                "api_calls_avoided": self.api_calls_avoided
+            }
+
+    def _signature(self, idea_shingles: Set[str]) -> List[int]:
+        hashes = [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+                  for shingle in idea_shingles]
+        return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._permutations]
+
+
+def is_reusable(result: Dict[str, Any]) -> bool:
+    """Whether a stored result is complete enough to answer another idea"""
+    if "error" in result or not result.get("product_idea"):
+        return False
+    research = result.get("research_results", {})
+    for agent_result in research.values():
+        text = agent_result.get("analysis") or agent_result.get("reasoning") or ""
+        failed = agent_result.get("status", "ok") != "ok" or agent_result.get("metrics", {}).get("error")
+        if failed or text.startswith("Error:"):
+            return False
+    return bool(research)
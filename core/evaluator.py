@@ -1,8 +1,25 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import json
+from agents.keywords import KeywordMatcher
 
 
 class AgentEvaluator:
+    # Define keyword sets for each criterion
+    KEYWORD_SETS = {
+        "completeness": ["competitor", "company", "market", "player", "incumbent"],
+        "specificity": ["feature", "product", "service", "$", "million", "billion"],
+        "insight_quality": ["opportunity", "advantage", "weakness", "trend", "strategy"],
+        "relevance": ["funding", "investment", "venture", "capital", "round"],
+        "recency": ["recent", "2023", "2024", "latest", "current"],
+        "investor_perspective": ["investor", "valuation", "return", "portfolio", "vc"],
+        "market_sizing": ["market", "size", "billion", "million", "tam", "revenue"],
+        "growth_trends": ["growth", "increase", "trend", "forecast", "projection"],
+        "revenue_potential": ["revenue", "profit", "monetization", "pricing", "income"],
+        "synthesis": ["based on", "considering", "overall", "combination", "together"],
+        "clarity": ["recommend", "good", "poor", "neutral", "opportunity"],
+        "reasoning": ["because", "due to", "reason", "evidence", "analysis"]
+    }
+    
     def __init__(self):
         # Define which criteria each agent type is evaluated on
         self.evaluation_criteria = {
@@ -11,6 +28,15 @@ class AgentEvaluator:
             "growth": ["market_sizing", "growth_trends", "revenue_potential"],
             "decision": ["synthesis", "clarity", "reasoning"]
         }
+        self._matchers = {}
+    
+    def register_agent(self, agent_name: str, criteria: List[str],
+                       keyword_sets: Optional[Dict[str, List[str]]] = None):
+        """Evaluate agent_name on criteria; keyword_sets defines criteria not in KEYWORD_SETS"""
+        if keyword_sets:
+            self.KEYWORD_SETS = {**self.KEYWORD_SETS, **keyword_sets}
+            self._matchers = {}
+        self.evaluation_criteria[agent_name.lower()] = list(criteria)
     
     def evaluate_agent_response(self, agent_name: str, response: Dict[str, Any]) -> Dict[str, Any]:
         """Evaluate a single agent's response"""
@@ -24,8 +50,10 @@ class AgentEvaluator:
         scores = {}
         criteria = self.evaluation_criteria[agent_key]
         
+        # One scan of the text counts the keywords for every criterion
+        keyword_counts = self._keyword_matcher(agent_key).scan(analysis)
         for criterion in criteria:
-            scores[criterion] = self._score_criterion(analysis, criterion, agent_key)
+            scores[criterion] = self._score_criterion(analysis, criterion, agent_key, keyword_counts)
         
         overall_score = sum(scores.values()) / len(scores)
         
@@ -38,29 +66,25 @@ class AgentEvaluator:
             "confidence": response.get("confidence", 0.0)
         }
     
-    def _score_criterion(self, analysis: str, criterion: str, agent_type: str) -> float:
+    def _keyword_matcher(self, agent_key: str) -> KeywordMatcher:
+        """Matcher for one agent type's current criteria, compiled on first use"""
+        criteria = tuple(self.evaluation_criteria[agent_key])
+        matcher = self._matchers.get((agent_key, criteria))
+        if matcher is None:
+            matcher = KeywordMatcher({
+                criterion: self.KEYWORD_SETS[criterion]
+                for criterion in criteria if criterion in self.KEYWORD_SETS
+            })
+            self._matchers[(agent_key, criteria)] = matcher
+        return matcher
+    
+    def _score_criterion(self, analysis: str, criterion: str, agent_type: str,
+                         keyword_counts: Optional[Dict[str, int]] = None) -> float:
         """Score a specific criterion (simplified heuristic approach)"""
-        analysis_lower = analysis.lower()
-        
-        # Define keyword sets for each criterion
-        keyword_sets = {
-            "completeness": ["competitor", "company", "market", "player", "incumbent"],
-            "specificity": ["feature", "product", "service", "$", "million", "billion"],
-            "insight_quality": ["opportunity", "advantage", "weakness", "trend", "strategy"],
-            "relevance": ["funding", "investment", "venture", "capital", "round"],
-            "recency": ["recent", "2023", "2024", "latest", "current"],
-            "investor_perspective": ["investor", "valuation", "return", "portfolio", "vc"],
-            "market_sizing": ["market", "size", "billion", "million", "tam", "revenue"],
-            "growth_trends": ["growth", "increase", "trend", "forecast", "projection"],
-            "revenue_potential": ["revenue", "profit", "monetization", "pricing", "income"],
-            "synthesis": ["based on", "considering", "overall", "combination", "together"],
-            "clarity": ["recommend", "good", "poor", "neutral", "opportunity"],
-            "reasoning": ["because", "due to", "reason", "evidence", "analysis"]
-        }
-        
-        if criterion in keyword_sets:
-            keywords = keyword_sets[criterion]
-            keyword_count = sum(1 for keyword in keywords if keyword in analysis_lower)
+        if criterion in self.KEYWORD_SETS:
+            if keyword_counts is None or criterion not in keyword_counts:
+                keyword_counts = KeywordMatcher({criterion: self.KEYWORD_SETS[criterion]}).scan(analysis)
+            keyword_count = keyword_counts[criterion]
             
             # Base score on keyword presence and response length
             keyword_score = min(keyword_count / 3, 1.0) * 6  # Max 6 points from keywords
@@ -86,8 +110,9 @@ class AgentEvaluator:
         """Evaluate the complete research from all agents"""
         agent_evaluations = {}
         
+        # Agents registered without criteria are not scored
         for agent_name, result in research_results.items():
-            if agent_name != "summary":
+            if agent_name != "summary" and agent_name.lower() in self.evaluation_criteria:
                 agent_evaluations[agent_name] = self.evaluate_agent_response(agent_name, result)
         
         # Calculate system-wide metrics
@@ -0,0 +1,147 @@
+"""
+Research Events
+
+Typed progress events emitted by MarketResearchSystem while it researches an
+idea. Subscribers are plain callables taking one event; the console printer
+is one of them.
+"""
+
+from typing import Dict, Any, Callable, Sequence
+
+# Receives every event of the runs it is subscribed to
+Subscriber = Callable[["ResearchEvent"], None]
+
+
+class ResearchEvent:
+    """Base class of all events; every event names the idea it belongs to"""
+
+    kind = "event"
+
+    def __init__(self, product_idea: str):
+        self.product_idea = product_idea
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, with the event kind under "event" """
+        return {"event": self.kind, **vars(self)}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in vars(self).items()
+                           if name not in ("result", "evaluation"))
+        return f"{type(self).__name__}({fields})"
+
+
+class ResearchStarted(ResearchEvent):
+    """A run began; agents lists the steps in registration order"""
+
+    kind = "research_started"
+
+    def __init__(self, product_idea: str, agents: Sequence[str]):
+        super().__init__(product_idea)
+        self.agents = list(agents)
+
+
+class IdeaReused(ResearchEvent):
+    """A near-duplicate's earlier research answers this idea; no agents will run"""
+
+    kind = "idea_reused"
+
+    def __init__(self, product_idea: str, similar: Dict[str, Any], api_calls_avoided: int):
+        super().__init__(product_idea)
+        self.similar = similar
+        self.api_calls_avoided = api_calls_avoided
+
+
+class SimilarIdeaFound(ResearchEvent):
+    """The idea is a near-duplicate of an earlier one but was researched anyway (flag mode)"""
+
+    kind = "similar_idea_found"
+
+    def __init__(self, product_idea: str, similar: Dict[str, Any]):
+        super().__init__(product_idea)
+        self.similar = similar
+
+
+class FusedStarted(ResearchEvent):
+    """One fused completion is researching every step"""
+
+    kind = "fused_started"
+
+
+class FusedFallback(ResearchEvent):
+    """The fused reply was unusable; the steps run one by one instead"""
+
+    kind = "fused_fallback"
+
+    def __init__(self, product_idea: str, reason: str):
+        super().__init__(product_idea)
+        self.reason = reason
+
+
+class AgentStarted(ResearchEvent):
+    """A step began; output_field is the result field its text will be in"""
+
+    kind = "agent_started"
+
+    def __init__(self, product_idea: str, agent: str, title: str, output_field: str):
+        super().__init__(product_idea)
+        self.agent = agent
+        self.title = title
+        self.output_field = output_field
+
+
+class AgentChunk(ResearchEvent):
+    """
+    Text a streaming step has just generated. Delivered on the step's own
+    thread, so chunks of concurrent steps may interleave with other events.
+    """
+
+    kind = "agent_chunk"
+
+    def __init__(self, product_idea: str, agent: str, text: str):
+        super().__init__(product_idea)
+        self.agent = agent
+        self.text = text
+
+
+class AgentFinished(ResearchEvent):
+    """A step has its result (status "ok", "error", "circuit_open" or "skipped"), in completion order"""
+
+    kind = "agent_finished"
+
+    def __init__(self, product_idea: str, agent: str, title: str, result: Dict[str, Any]):
+        super().__init__(product_idea)
+        self.agent = agent
+        self.title = title
+        self.result = result
+
+
+class DecisionMade(ResearchEvent):
+    """The decision step finished; follows its AgentFinished"""
+
+    kind = "decision_made"
+
+    def __init__(self, product_idea: str, agent: str, recommendation: str, confidence: float):
+        super().__init__(product_idea)
+        self.agent = agent
+        self.recommendation = recommendation
+        self.confidence = confidence
+
+
+class EvaluationReady(ResearchEvent):
+    """The run's evaluation, including usage"""
+
+    kind = "evaluation_ready"
+
+    def __init__(self, product_idea: str, evaluation: Dict[str, Any]):
+        super().__init__(product_idea)
+        self.evaluation = evaluation
+
+
+class ResearchFinished(ResearchEvent):
+    """The run is over; result is what research_product_idea returns"""
+
+    kind = "research_finished"
+
+    def __init__(self, product_idea: str, result: Dict[str, Any]):
+        super().__init__(product_idea)
+        self.result = result
@@ -0,0 +1,146 @@
+"""
+DAG Executor
+
+Runs the agents of an AgentRegistry for one product idea. Each step starts as
+soon as the steps it reads from have finished, is bounded by its own timeout,
+and is skipped (not run) when an input it requires has failed.
+"""
+
+import time
+import threading
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from typing import Dict, Any, Callable, Optional
+from agents.base_agent import BaseAgent
+from .registry import AgentRegistry, AgentSpec
+
+# Extra time before the executor gives up on a step itself, so the agent's own
+# deadline normally fires first and the step's metrics are kept
+TIMEOUT_GRACE = 1.0
+
+# Called when a step starts; may return an on_chunk callback for its text
+StartCallback = Callable[[AgentSpec], Optional[Callable[[str], None]]]
+# Called when a step has a result (including skipped and timed-out steps)
+FinishCallback = Callable[[AgentSpec, Dict[str, Any]], None]
+# Runs one step: (spec, agent, product idea, inputs, on_chunk) -> result
+StepRunner = Callable[[AgentSpec, BaseAgent, str, Dict[str, str], Optional[Callable[[str], None]]],
+                      Dict[str, Any]]
+
+
+def _run_in_thread(fn: Callable, *args, **kwargs) -> Future:
+    """
+    Run fn on its own daemon thread. A step that overruns its timeout is
+    abandoned rather than joined, so it must not hold a pool worker.
+    """
+    future = Future()
+
+    def runner():
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=runner, daemon=True).start()
+    return future
+
+
+def output_text(result: Dict[str, Any]) -> str:
+    """The generated text of a step's result"""
+    return result.get("analysis") or result.get("reasoning") or ""
+
+
+def run_agent(spec: AgentSpec, agent: BaseAgent, product_idea: str, inputs: Dict[str, str],
+              on_chunk: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """The default step runner: one run of the step's agent"""
+    return agent.run(product_idea, inputs, on_chunk)
+
+
+class DagExecutor:
+    """
+    Executes the registry's dependency graph with up to max_workers steps
+    at once (None: no limit beyond the graph itself; 1: one step at a time,
+    in registration order).
+
+    Every result carries a status: "ok", "error", "circuit_open" (refused
+    by the open circuit breaker) or "skipped". Callbacks run
+    on the calling thread, never concurrently with each other, and a step's
+    dependents are only started after its on_finish has returned. Steps are
+    run by step_runner (run_agent unless another is given, e.g. a TieredRouter).
+    """
+
+    def __init__(self, registry: AgentRegistry, agents: Dict[str, BaseAgent],
+                 max_workers: Optional[int] = None, step_runner: StepRunner = run_agent):
+        self.registry = registry
+        self.agents = agents
+        self.max_workers = max_workers
+        self.step_runner = step_runner
+
+    def run(self, product_idea: str, on_start: Optional[StartCallback] = None,
+            on_finish: Optional[FinishCallback] = None) -> Dict[str, Dict[str, Any]]:
+        """Results of every step, in registration order"""
+        results: Dict[str, Dict[str, Any]] = {}
+        waiting = list(self.registry)
+        running: Dict[Future, tuple] = {}  # future -> (spec, deadline)
+
+        def finish(spec: AgentSpec, result: Dict[str, Any]):
+            results[spec.name] = result
+            if on_finish is not None:
+                on_finish(spec, result)
+
+        while waiting or running:
+            # Start (or skip) every step whose inputs are settled, in order
+            for spec in list(waiting):
+                if any(name not in results for name in spec.dependencies):
+                    continue
+                failed = self._failed_inputs(spec, results)
+                if failed:
+                    waiting.remove(spec)
+                    finish(spec, self._skipped_result(spec, product_idea, failed))
+                    continue
+                if self.max_workers is not None and len(running) >= self.max_workers:
+                    break
+                waiting.remove(spec)
+                on_chunk = on_start(spec) if on_start is not None else None
+                inputs = {name: output_text(results[name]) for name in spec.dependencies
+                          if results[name].get("status") == "ok"}
+                future = _run_in_thread(self.step_runner, spec, self.agents[spec.name], product_idea,
+                                        inputs, on_chunk)
+                running[future] = (spec, time.monotonic() + spec.timeout + TIMEOUT_GRACE)
+
+            if not running:
+                continue  # steps were skipped; their dependents may be ready now
+
+            next_deadline = min(deadline for _, deadline in running.values())
+            done, _ = wait(list(running), timeout=max(0.0, next_deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                spec, _ = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = self._error_result(spec, product_idea, e)
+                finish(spec, result)
+            now = time.monotonic()
+            for future, (spec, deadline) in list(running.items()):
+                if not future.done() and now >= deadline:
+                    del running[future]
+                    finish(spec, self._error_result(
+                        spec, product_idea, TimeoutError(f"Step did not finish within {spec.timeout}s")))
+
+        return {name: results[name] for name in self.registry.names()}
+
+    def _failed_inputs(self, spec: AgentSpec, results: Dict[str, Dict[str, Any]]) -> list:
+        """The inputs whose failure keeps this step from running (empty if it can run)"""
+        failed = [name for name in spec.inputs if results[name].get("status") != "ok"]
+        if failed or spec.inputs or not spec.optional_inputs:
+            return failed
+        if all(results[name].get("status") != "ok" for name in spec.optional_inputs):
+            return list(spec.optional_inputs)
+        return []
+
+    def _skipped_result(self, spec: AgentSpec, product_idea: str, failed: list) -> Dict[str, Any]:
+        message = f"Skipped: input failed ({', '.join(failed)})"
+        return self.agents[spec.name].failed_result(product_idea, message, status="skipped")
+
+    def _error_result(self, spec: AgentSpec, product_idea: str, error: Exception) -> Dict[str, Any]:
+        return self.agents[spec.name].failed_result(product_idea, f"Error: {error}",
+                                                    metrics={"error": type(error).__name__})
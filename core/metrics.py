@@ -0,0 +1,270 @@
+"""
+Usage Metrics
+
+Per-agent latency, token and cost figures for research runs, with export as a
+JSONL trace and a Prometheus text-format snapshot.
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, Any, Optional
+
+
+# Per-call figures copied from an agent result's metrics into the summary and trace
+CALL_FIELDS = ("model", "wall_time", "queue_time", "prompt_tokens", "completion_tokens",
+               "cost_usd", "attempts", "retries", "cache", "error")
+
+# Micro-batching figures copied from an agent result's metrics["micro_batch"]
+MICRO_BATCH_FIELDS = ("batch_size", "window_wait", "retried")
+
+# Tiered routing figures copied from an agent result's metrics["routing"]
+ROUTING_FIELDS = ("tier", "escalated", "fast_score", "cost_saved_usd", "latency_saved")
+
+# Upper bounds (seconds) of the wall-time histogram buckets
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def summarize_usage(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Per-agent call figures and totals for one research run.
+
+    The total wall_time is summed over agents, so with parallel research it
+    exceeds the run's elapsed time. Steps that never completed a call
+    (skipped, failed or refused by the circuit breaker) cost nothing; a total
+    cost of None means a model without known pricing was used. With tiered routing, the totals also count
+    routed and escalated steps and sum the estimated savings that are known.
+    With micro-batching, they count batched steps and sum the time steps
+    waited for their batch window.
+    """
+    agents = {}
+    for agent_name, result in results.items():
+        metrics = result.get("metrics", {})
+        agents[agent_name] = {"status": result.get("status"),
+                              **{field: metrics.get(field) for field in CALL_FIELDS}}
+        agents[agent_name]["prompt_tokens_saved"] = metrics.get("compaction", {}).get("tokens_saved", 0)
+        routing = metrics.get("routing")
+        if routing is not None:
+            agents[agent_name]["routing"] = {field: routing.get(field) for field in ROUTING_FIELDS}
+        micro_batch = metrics.get("micro_batch")
+        if isinstance(micro_batch, dict):
+            agents[agent_name]["micro_batch"] = {field: micro_batch.get(field) for field in MICRO_BATCH_FIELDS}
+
+    calls = list(agents.values())
+    # A completed call always reports its tokens, even when its cost is unknown
+    costs = [call["cost_usd"] for call in calls if call["prompt_tokens"] is not None]
+    slowest = max(agents, key=lambda name: agents[name]["wall_time"] or 0.0) if agents else None
+    routed = [call["routing"] for call in calls if "routing" in call]
+    total_routing = {
+        "routed": len(routed),
+        "escalated": sum(1 for routing in routed if routing["escalated"]),
+        "cost_saved_usd": round(sum(routing["cost_saved_usd"] or 0.0 for routing in routed), 6),
+        "latency_saved": round(sum(routing["latency_saved"] or 0.0 for routing in routed), 3)
+    } if routed else None
+    batched = [call["micro_batch"] for call in calls if "micro_batch" in call]
+    total_micro_batch = {
+        "batched": sum(1 for batch in batched if batch["batch_size"] > 1 and not batch["retried"]),
+        "retried": sum(1 for batch in batched if batch["retried"]),
+        "window_wait": round(sum(batch["window_wait"] for batch in batched), 3)
+    } if batched else None
+    return {
+        "agents": agents,
+        "total": {
+            "wall_time": round(sum(call["wall_time"] or 0.0 for call in calls), 3),
+            "queue_time": round(sum(call["queue_time"] or 0.0 for call in calls), 3),
+            "prompt_tokens": sum(call["prompt_tokens"] or 0 for call in calls),
+            "completion_tokens": sum(call["completion_tokens"] or 0 for call in calls),
+            "prompt_tokens_saved": sum(call["prompt_tokens_saved"] for call in calls),
+            "cost_usd": round(sum(costs), 6) if None not in costs else None,
+            "retries": sum(call["retries"] or 0 for call in calls),
+            "cache_hits": sum(1 for call in calls if call["cache"] == "hit"),
+            "errors": sum(1 for call in calls if call["error"]),
+            "skipped": sum(1 for call in calls if call["status"] == "skipped"),
+            "circuit_open": sum(1 for call in calls if call["status"] == "circuit_open"),
+            "slowest_agent": slowest,
+            "routing": total_routing,
+            "micro_batch": total_micro_batch
+        }
+    }
+
+
+class MetricsRecorder:
+    """
+    Collects agent call figures across many research runs.
+
+    Each recorded call is appended to an optional JSONL trace, and running
+    totals are kept for a Prometheus text-format snapshot. With a snapshot
+    path set, the snapshot file is rewritten after every run, so a
+    long-running batch can be scraped through node_exporter's textfile
+    collector. With a circuit breaker given, its state is exported too.
+    Safe to share between threads.
+    """
+
+    def __init__(self, trace_path: Optional[str] = None, snapshot_path: Optional[str] = None,
+                 circuit_breaker=None):
+        self.trace_path = trace_path
+        self.snapshot_path = snapshot_path
+        self.circuit_breaker = circuit_breaker
+        self._trace = open(trace_path, 'a') if trace_path else None
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._counters = {}  # (metric name, labels) -> value
+        self._histograms = {}  # agent -> [bucket counts..., +Inf count, sum]
+
+    def record(self, result: Dict[str, Any]):
+        """Record the agent calls of one research_product_idea result"""
+        usage = result.get("evaluation", {}).get("usage") or summarize_usage(
+            result.get("research_results", {}))
+        timestamp = time.time()
+
+        with self._lock:
+            self._runs += 1
+            for agent_name, call in usage["agents"].items():
+                self._count(agent_name, call)
+                if self._trace is not None:
+                    self._trace.write(json.dumps({
+                        "timestamp": round(timestamp, 3),
+                        "product_idea": result.get("product_idea"),
+                        "agent": agent_name,
+                        **call
+                    }) + "\n")
+            if self._trace is not None:
+                self._trace.flush()
+            if self.snapshot_path:
+                self._write_snapshot()
+
+    def prometheus_text(self) -> str:
+        """All totals in the Prometheus text exposition format"""
+        with self._lock:
+            return self._render()
+
+    def close(self):
+        """Flush the trace and write a final snapshot"""
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+            if self.snapshot_path:
+                self._write_snapshot()
+
+    def _count(self, agent_name: str, call: Dict[str, Any]):
+        """Add one call to the running totals"""
+        agent = {"agent": agent_name}
+        if call.get("status") == "skipped":
+            self._add("skipped_total", agent, 1)  # no call was made
+            return
+        if call.get("status") == "circuit_open":
+            self._add("circuit_open_total", agent, 1)  # refused without a call
+            return
+        self._add("calls_total", {**agent, "cache": call["cache"] or "off"}, 1)
+        self._add("errors_total", agent, 1 if call["error"] else 0)
+        self._add("retries_total", agent, call["retries"] or 0)
+        self._add("tokens_total", {**agent, "type": "prompt"}, call["prompt_tokens"] or 0)
+        self._add("tokens_total", {**agent, "type": "completion"}, call["completion_tokens"] or 0)
+        self._add("prompt_tokens_saved_total", agent, call.get("prompt_tokens_saved") or 0)
+        self._add("cost_usd_total", agent, call["cost_usd"] or 0.0)
+        self._add("queue_seconds_total", agent, call["queue_time"] or 0.0)
+        routing = call.get("routing")
+        if routing is not None:
+            self._add("routed_total", agent, 1)
+            self._add("escalations_total", agent, 1 if routing["escalated"] else 0)
+            self._add("routing_cost_saved_usd_total", agent, routing["cost_saved_usd"] or 0.0)
+            self._add("routing_seconds_saved_total", agent, routing["latency_saved"] or 0.0)
+        micro_batch = call.get("micro_batch")
+        if micro_batch is not None:
+            shared = micro_batch["batch_size"] > 1 and not micro_batch["retried"]
+            self._add("micro_batched_total", agent, 1 if shared else 0)
+            self._add("micro_batch_retries_total", agent, 1 if micro_batch["retried"] else 0)
+            self._add("micro_batch_window_seconds_total", agent, micro_batch["window_wait"] or 0.0)
+
+        if call["wall_time"] is not None:
+            histogram = self._histograms.setdefault(agent_name, [0] * (len(LATENCY_BUCKETS) + 1) + [0.0])
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if call["wall_time"] <= bound:
+                    histogram[i] += 1
+            histogram[len(LATENCY_BUCKETS)] += 1
+            histogram[-1] += call["wall_time"]
+
+    def _add(self, name: str, labels: Dict[str, str], value: float):
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def _render(self) -> str:
+        lines = [
+            "# HELP market_research_runs_total Research runs recorded.",
+            "# TYPE market_research_runs_total counter",
+            f"market_research_runs_total {self._runs}"
+        ]
+
+        descriptions = {
+            "calls_total": "Agent calls by cache status.",
+            "errors_total": "Agent calls that failed.",
+            "skipped_total": "Agent steps skipped because an input failed.",
+            "circuit_open_total": "Agent calls refused by the open circuit breaker.",
+            "retries_total": "API retries made by agent calls.",
+            "tokens_total": "Tokens used by agent calls.",
+            "prompt_tokens_saved_total": "Estimated prompt tokens removed by compaction.",
+            "cost_usd_total": "Estimated USD cost of agent calls.",
+            "queue_seconds_total": "Seconds agent calls waited for rate limit budget.",
+            "routed_total": "Agent steps run fast model first by tiered routing.",
+            "escalations_total": "Routed steps re-run on the strong model.",
+            "routing_cost_saved_usd_total": "Estimated USD saved by tiered routing (negative: extra cost).",
+            "routing_seconds_saved_total": "Estimated seconds saved by tiered routing (negative: extra time).",
+            "micro_batched_total": "Agent steps answered by a shared micro-batch completion.",
+            "micro_batch_retries_total": "Micro-batched steps re-run on their own.",
+            "micro_batch_window_seconds_total": "Seconds agent steps waited for their micro-batch window."
+        }
+        for name, description in descriptions.items():
+            metric = f"market_research_agent_{name}"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            for (counter_name, labels), value in sorted(self._counters.items()):
+                if counter_name == name:
+                    lines.append(f"{metric}{{{_format_labels(labels)}}} {_format_value(value)}")
+
+        metric = "market_research_agent_wall_seconds"
+        lines.append(f"# HELP {metric} Wall time of agent calls, including cache lookups and retries.")
+        lines.append(f"# TYPE {metric} histogram")
+        for agent_name, histogram in sorted(self._histograms.items()):
+            agent = f'agent="{_escape(agent_name)}"'
+            for bound, count in zip(LATENCY_BUCKETS, histogram):
+                lines.append(f'{metric}_bucket{{{agent},le="{bound}"}} {count}')
+            lines.append(f'{metric}_bucket{{{agent},le="+Inf"}} {histogram[len(LATENCY_BUCKETS)]}')
+            lines.append(f"{metric}_sum{{{agent}}} {_format_value(histogram[-1])}")
+            lines.append(f"{metric}_count{{{agent}}} {histogram[len(LATENCY_BUCKETS)]}")
+
+        if self.circuit_breaker is not None:
+            circuit = self.circuit_breaker.snapshot()
+            metric = "market_research_circuit_state"
+            lines.append(f"# HELP {metric} Circuit breaker state (1 for the current one).")
+            lines.append(f"# TYPE {metric} gauge")
+            for state in ("closed", "open", "half_open"):
+                lines.append(f'{metric}{{state="{state}"}} {int(circuit["state"] == state)}')
+            for name, description in (("opened_total", "Times the circuit breaker opened."),
+                                      ("rejected_total", "Calls refused by the open circuit breaker.")):
+                metric = f"market_research_circuit_{name}"
+                lines.append(f"# HELP {metric} {description}")
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {circuit[name]}")
+
+        return "\n".join(lines) + "\n"
+
+    def _write_snapshot(self):
+        """Replace the snapshot file atomically so a scraper never reads half of it"""
+        temp_path = f"{self.snapshot_path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(self._render())
+        os.replace(temp_path, self.snapshot_path)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+
+
+def _format_value(value: float) -> str:
+    return str(round(value, 6)) if isinstance(value, float) else str(value)
@@ -0,0 +1,164 @@
+"""
+Micro-batching
+
+Step runner that gathers the same research step of ideas in flight together
+over a short window and sends them as one structured completion. Ideas whose
+section is missing or malformed are re-run on their own.
+"""
+
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional
+from config import MICRO_BATCH_WINDOW, MICRO_BATCH_MAX_SIZE
+from agents.base_agent import BaseAgent
+from agents.fused_agent import split_metrics
+from agents.micro_batch_agent import MicroBatchAgent, MicroBatchOutputError
+from .executor import StepRunner, output_text, run_agent
+from .registry import AgentSpec
+
+
+class _Request:
+    """One step waiting for its batch"""
+
+    def __init__(self, product_idea: str):
+        self.product_idea = product_idea
+        self.future = Future()
+        self.queued_at = time.monotonic()
+        self.window_wait = 0.0
+
+
+class MicroBatcher:
+    """
+    Step runner for DagExecutor that batches research steps across ideas.
+
+    A step with no inputs, whose agent researches with BaseAgent's own
+    prompt, waits up to `window` seconds for the same step of other ideas,
+    and is sent as soon as `max_size` have gathered. Other steps, and a
+    batch of one, go to `fallback` unchanged.
+
+    A batched result's metrics carry the call's time, tokens and cost,
+    shared out by section length, plus metrics["micro_batch"]: the batch
+    size and the seconds the step waited for the window. An idea re-run
+    on its own also records why under "retried". Batched steps are not
+    streamed; their text is passed to on_chunk in one piece.
+    """
+
+    def __init__(self, window: float = MICRO_BATCH_WINDOW, max_size: int = MICRO_BATCH_MAX_SIZE,
+                 fallback: StepRunner = run_agent):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.window = window
+        self.max_size = max_size
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._open: Dict[str, List[_Request]] = {}  # step name -> batch still gathering
+        self._batch_agents: Dict[tuple, MicroBatchAgent] = {}
+        self.counts = {"steps": 0, "batches": 0, "batched_steps": 0, "retried": 0,
+                       "requests_saved": 0, "window_wait": 0.0}
+
+    def batchable(self, spec: AgentSpec, agent: BaseAgent) -> bool:
+        return (self.max_size > 1 and not spec.inputs and not spec.optional_inputs
+                and type(agent).run is BaseAgent.run and type(agent).research is BaseAgent.research)
+
+    def __call__(self, spec: AgentSpec, agent: BaseAgent, product_idea: str, inputs: Dict[str, str],
+                 on_chunk: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        if inputs or not self.batchable(spec, agent):
+            return self.fallback(spec, agent, product_idea, inputs, on_chunk)
+
+        request = _Request(product_idea)
+        with self._lock:
+            batch = self._open.get(spec.name)
+            if batch is None:
+                batch = self._open[spec.name] = []
+                timer = threading.Timer(self.window, self._flush, (spec, agent, batch))
+                timer.daemon = True
+                timer.start()
+            batch.append(request)
+            full = len(batch) >= self.max_size
+            if full:
+                del self._open[spec.name]
+        if full:
+            self._send(spec, agent, batch)
+
+        result = request.future.result()
+        if on_chunk is not None:
+            on_chunk(output_text(result))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals so far: requests saved and the latency the window added"""
+        with self._lock:
+            counts = dict(self.counts)
+        counts["window_wait"] = round(counts["window_wait"], 3)
+        counts["mean_window_wait"] = round(counts["window_wait"] / counts["steps"], 3) if counts["steps"] else 0.0
+        return counts
+
+    def _flush(self, spec: AgentSpec, agent: BaseAgent, batch: List[_Request]):
+        """Send a batch whose window is over, unless it filled up and was sent already"""
+        with self._lock:
+            if self._open.get(spec.name) is not batch:
+                return
+            del self._open[spec.name]
+        self._send(spec, agent, batch)
+
+    def _send(self, spec: AgentSpec, agent: BaseAgent, batch: List[_Request]):
+        sent_at = time.monotonic()
+        for request in batch:
+            request.window_wait = round(sent_at - request.queued_at, 3)
+        try:
+            results = self._research(spec, agent, batch)
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+
+    def _research(self, spec: AgentSpec, agent: BaseAgent, batch: List[_Request]) -> List[Dict[str, Any]]:
+        """One result per request, from one batched completion plus re-runs of what it missed"""
+        sections, reason, split = {}, None, {}
+        if len(batch) > 1:
+            batch_agent = self._batch_agent(agent, len(batch))
+            metrics = {}
+            try:
+                sections = batch_agent.research_ideas([request.product_idea for request in batch], metrics)
+            except Exception as e:
+                reason = str(e) if isinstance(e, MicroBatchOutputError) else f"{type(e).__name__}: {e}"
+            if sections:
+                split = split_metrics(metrics, sections, marker="micro_batch")
+
+        keys = [str(number) for number in range(1, len(batch) + 1)]
+        missing = [request for key, request in zip(keys, batch) if key not in sections]
+        with ThreadPoolExecutor(max_workers=max(1, len(missing))) as executor:
+            rerun = {request: executor.submit(self.fallback, spec, agent, request.product_idea, {}, None)
+                     for request in missing}
+            results = []
+            for key, request in zip(keys, batch):
+                if key in sections:
+                    result = agent.build_result(request.product_idea, sections[key], split[key])
+                else:
+                    result = rerun[request].result()
+                info = {"batch_size": len(batch), "window_wait": request.window_wait}
+                if len(batch) > 1 and key not in sections:
+                    info["retried"] = reason or "section missing or malformed"
+                result.setdefault("metrics", {})["micro_batch"] = info
+                results.append(result)
+
+        with self._lock:
+            self.counts["steps"] += len(batch)
+            self.counts["window_wait"] += sum(request.window_wait for request in batch)
+            if len(batch) > 1:
+                self.counts["batches"] += 1
+                self.counts["batched_steps"] += len(batch)
+                self.counts["retried"] += len(missing)
+                # n separate requests became one, plus one for every re-run
+                self.counts["requests_saved"] += len(batch) - 1 - len(missing)
+        return results
+
+    def _batch_agent(self, agent: BaseAgent, size: int) -> MicroBatchAgent:
+        with self._lock:
+            key = (id(agent), size)
+            if key not in self._batch_agents:
+                self._batch_agents[key] = MicroBatchAgent(agent, size)
+            return self._batch_agents[key]
@@ -0,0 +1,124 @@
+"""
+Agent Registry
+
+Declarative description of the research pipeline: each agent step names its
+prompt, the steps whose output it reads, how it is evaluated and how long it
+may run. MarketResearchSystem builds its agents and its execution DAG from a
+registry, so adding or removing an agent is one register() call.
+"""
+
+from typing import Dict, Any, Iterator, List, Optional, Sequence
+from config import AGENT_TIMEOUT
+from agents.base_agent import BaseAgent
+from agents.retry import RetryPolicy
+
+
+class AgentSpec:
+    """
+    One step of the pipeline.
+
+    inputs must all succeed for the step to run; of optional_inputs, at
+    least one must succeed if the step has no required inputs. A prompt of
+    None keeps agent_class's own system prompt. criteria are the
+    AgentEvaluator criteria the step is scored on, and keywords adds keyword
+    sets for criteria the evaluator does not know yet. timeout bounds the
+    whole step, retries included. tiered steps are eligible for tiered model
+    routing (see core/routing.py).
+    """
+
+    def __init__(self, name: str, prompt: Optional[str] = None, agent_class: type = BaseAgent,
+                 inputs: Sequence[str] = (), optional_inputs: Sequence[str] = (),
+                 criteria: Sequence[str] = (), keywords: Optional[Dict[str, Sequence[str]]] = None,
+                 title: Optional[str] = None, timeout: float = AGENT_TIMEOUT,
+                 options: Optional[Dict[str, Any]] = None, tiered: bool = True):
+        if prompt is None and agent_class is BaseAgent:
+            raise ValueError(f"Agent {name} needs a prompt or an agent class with its own")
+        self.name = name
+        self.prompt = prompt
+        self.agent_class = agent_class
+        self.inputs = tuple(inputs)
+        self.optional_inputs = tuple(optional_inputs)
+        self.criteria = list(criteria)
+        self.keywords = dict(keywords or {})
+        self.title = title or f"Running {name}..."
+        self.timeout = timeout
+        self.options = dict(options or {})
+        self.tiered = tiered
+
+    @property
+    def dependencies(self) -> tuple:
+        return self.inputs + self.optional_inputs
+
+    def create_agent(self, **options) -> BaseAgent:
+        """The agent for this step; options (cache, client, stream) are passed to it"""
+        if self.prompt is not None:
+            options["system_prompt"] = self.prompt
+        options.setdefault("retry_policy", RetryPolicy(timeout=self.timeout))
+        return self.agent_class(name=self.name, **self.options, **options)
+
+    def __repr__(self) -> str:
+        return f"AgentSpec({self.name!r}, inputs={self.inputs!r}, optional_inputs={self.optional_inputs!r})"
+
+
+class AgentRegistry:
+    """
+    Ordered set of agent specs.
+
+    A spec may only depend on specs registered before it, so registration
+    order is always a valid execution order (and the order results are
+    reported in), and the graph cannot have cycles.
+    """
+
+    def __init__(self, specs: Sequence[AgentSpec] = ()):
+        self._specs: Dict[str, AgentSpec] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: AgentSpec) -> AgentSpec:
+        if spec.name in self._specs:
+            raise ValueError(f"Agent {spec.name} is already registered")
+        unknown = [name for name in spec.dependencies if name not in self._specs]
+        if unknown:
+            raise ValueError(f"Agent {spec.name} depends on unregistered agents: {', '.join(unknown)}")
+        self._specs[spec.name] = spec
+        return spec
+
+    def unregister(self, name: str) -> AgentSpec:
+        dependents = [spec.name for spec in self._specs.values() if name in spec.dependencies]
+        if dependents:
+            raise ValueError(f"Agents depend on {name}: {', '.join(dependents)}")
+        return self._specs.pop(name)
+
+    def get(self, name: str) -> AgentSpec:
+        return self._specs[name]
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def __iter__(self) -> Iterator[AgentSpec]:
+        return iter(list(self._specs.values()))
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+
+def default_registry() -> AgentRegistry:
+    """The standard pipeline: three independent research agents feeding the decision"""
+    from agents import IncumbentsAgent, FundingAgent, GrowthAgent, DecisionAgent
+
+    research = ("Incumbents", "Funding", "Growth")
+    return AgentRegistry([
+        AgentSpec("Incumbents", agent_class=IncumbentsAgent, title="1️⃣  Analyzing Competitors...",
+                  criteria=["completeness", "specificity", "insight_quality"]),
+        AgentSpec("Funding", agent_class=FundingAgent, title="2️⃣  Researching Funding Landscape...",
+                  criteria=["relevance", "recency", "investor_perspective"]),
+        AgentSpec("Growth", agent_class=GrowthAgent, title="3️⃣  Evaluating Growth Potential...",
+                  criteria=["market_sizing", "growth_trends", "revenue_potential"]),
+        # Decides on whatever research succeeded, always on the default model
+        AgentSpec("Decision", agent_class=DecisionAgent, optional_inputs=research,
+                  title="4️⃣  Making Final Recommendation...",
+                  criteria=["synthesis", "clarity", "reasoning"], tiered=False)
+    ])
@@ -0,0 +1,122 @@
+"""
+Tiered Model Routing
+
+Runs each tiered pipeline step on a fast, cheap model first and scores the
+output straight away with AgentEvaluator. Only outputs below
+GOOD_SCORE_THRESHOLD or shorter than MIN_RESPONSE_LENGTH (or failed calls)
+are re-run on the strong model.
+"""
+
+from typing import Dict, Any, Callable, Optional
+from config import FAST_MODEL, STRONG_MODEL, GOOD_SCORE_THRESHOLD, MIN_RESPONSE_LENGTH
+from agents.base_agent import BaseAgent
+from agents.retry import get_latency_tracker
+from agents.tokens import estimate_cost
+from .evaluator import AgentEvaluator
+from .executor import output_text, run_agent
+from .registry import AgentSpec
+
+# Call figures of the fast attempt that are added to an escalated step's metrics,
+# so usage totals include what the fast attempt spent
+ADDED_FIELDS = ("wall_time", "queue_time", "prompt_tokens", "completion_tokens", "cost_usd",
+                "attempts", "retries")
+
+
+class TieredRouter:
+    """
+    Step runner for DagExecutor that routes tiered steps fast model first.
+
+    An accepted fast output is returned as is (when streaming, its text is
+    passed to on_chunk in one piece once it has passed the gate). An
+    escalated step returns the strong model's result, with the fast
+    attempt's time, tokens and cost added to its metrics. Either way
+    metrics["routing"] records the tier, the fast score and the estimated
+    cost and latency saved against running the strong model directly
+    (negative when escalating cost extra). The latency estimate needs
+    earlier strong-model calls of the agent, so it is None until one was
+    made.
+    """
+
+    def __init__(self, evaluator: AgentEvaluator, fast_model: str = FAST_MODEL,
+                 strong_model: str = STRONG_MODEL, threshold: float = GOOD_SCORE_THRESHOLD,
+                 min_length: int = MIN_RESPONSE_LENGTH):
+        self.evaluator = evaluator
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.threshold = threshold
+        self.min_length = min_length
+
+    def __call__(self, spec: AgentSpec, agent: BaseAgent, product_idea: str, inputs: Dict[str, str],
+                 on_chunk: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        if not spec.tiered:
+            return run_agent(spec, agent, product_idea, inputs, on_chunk)
+
+        # Not streamed: text that fails the gate must not reach the console
+        fast = agent.run(product_idea, inputs, None, model=self.fast_model)
+        if fast.get("status") == "circuit_open":
+            return fast  # the strong tier would be refused too
+        score, reason = self.check(agent.name, fast)
+        fast_metrics = fast.get("metrics", {})
+        routing = {
+            "fast_model": self.fast_model,
+            "fast_score": score,
+            "escalated": reason is not None
+        }
+
+        if reason is None:
+            if on_chunk is not None:
+                on_chunk(output_text(fast))
+            fast_metrics["routing"] = {
+                **routing,
+                "tier": "fast",
+                "cost_saved_usd": self._strong_cost_saved(fast_metrics),
+                "latency_saved": self._strong_latency_saved(agent.name, fast_metrics)
+            }
+            return fast
+
+        strong = agent.run(product_idea, inputs, on_chunk, model=self.strong_model)
+        metrics = strong.setdefault("metrics", {})
+        for field in ADDED_FIELDS:
+            if isinstance(fast_metrics.get(field), (int, float)) and isinstance(metrics.get(field), (int, float)):
+                metrics[field] = round(metrics[field] + fast_metrics[field], 6)
+        fast_cost = fast_metrics.get("cost_usd")
+        metrics["routing"] = {
+            **routing,
+            "tier": "strong",
+            "reason": reason,
+            "cost_saved_usd": -fast_cost if fast_cost is not None else None,
+            "latency_saved": -fast_metrics.get("wall_time", 0.0)
+        }
+        return strong
+
+    def check(self, agent_name: str, result: Dict[str, Any]):
+        """(score, reason to escalate or None) for one fast-tier result"""
+        if result.get("status") != "ok":
+            return None, "error"
+        text = output_text(result)
+        evaluation = self.evaluator.evaluate_agent_response(agent_name, result)
+        score = evaluation.get("overall_score")  # None for an agent without criteria
+        if len(text) < self.min_length:
+            return score, f"length {len(text)} < {self.min_length}"
+        if score is not None and score < self.threshold:
+            return score, f"score {score} < {self.threshold}"
+        return score, None
+
+    def _strong_cost_saved(self, metrics: Dict[str, Any]) -> Optional[float]:
+        """What the same tokens would have cost on the strong model, less what they did cost"""
+        if metrics.get("cache") == "hit":
+            return 0.0
+        strong_cost = estimate_cost(self.strong_model, metrics.get("prompt_tokens") or 0,
+                                    metrics.get("completion_tokens") or 0)
+        if strong_cost is None or metrics.get("cost_usd") is None:
+            return None
+        return round(strong_cost - metrics["cost_usd"], 6)
+
+    def _strong_latency_saved(self, agent_name: str, metrics: Dict[str, Any]) -> Optional[float]:
+        """Median strong-model latency of this agent so far, less this call's wall time"""
+        if metrics.get("cache") == "hit":
+            return 0.0
+        strong_latency = get_latency_tracker(f"{agent_name}:{self.strong_model}").percentile(50)
+        if strong_latency is None or metrics.get("wall_time") is None:
+            return None
+        return round(strong_latency - metrics["wall_time"], 3)
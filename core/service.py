@@ -0,0 +1,326 @@
+"""
+Research Service
+
+Long-running local HTTP API around one warm MarketResearchSystem. Research
+runs as asynchronous jobs on a bounded work queue; concurrent requests for
+the same idea (ignoring case and spacing) share one job.
+
+Endpoints:
+  POST /research            {"idea": "..."} -> 202 job (429 when the queue is full,
+                            503 while the circuit breaker is open);
+                            ?wait=SECONDS answers 200 with the result if it finishes in time
+  GET  /jobs/<id>           job status, with the result once done
+  GET  /jobs/<id>/events    NDJSON stream of status and step changes, ending with the result
+  GET  /health              queue depth, counters and circuit breaker state
+"""
+
+import json
+import math
+import time
+import uuid
+import queue
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+from config import (
+    BATCH_MAX_IN_FLIGHT, SERVICE_HOST, SERVICE_PORT, SERVICE_QUEUE_SIZE, SERVICE_JOB_HISTORY
+)
+from agents.circuit_breaker import CircuitBreaker, CircuitOpen, CLOSED, OPEN, get_circuit_breaker
+from .batch import circuit_tripped
+from .store import idea_key
+from .events import ResearchEvent, AgentFinished
+
+# Statuses after which a job never changes again
+FINISHED = ("done", "failed")
+
+# Longest ?wait a client may ask for, and the keep-alive interval of event streams
+MAX_WAIT = 300
+HEARTBEAT_INTERVAL = 15
+
+
+class QueueFull(Exception):
+    """Raised when a new job would exceed the work queue's capacity"""
+
+
+class Job:
+    """One research run, shared by every request for the same idea while it is in flight"""
+
+    def __init__(self, product_idea: str):
+        self.id = uuid.uuid4().hex
+        self.product_idea = product_idea
+        self.key = idea_key(product_idea)
+        self.status = "queued"
+        self.requests = 1
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.steps: Dict[str, str] = {}  # status of every finished step, in completion order
+        self.result = None
+        self.error = None
+        self.version = 0  # bumped on every change
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        job = {
+            "job_id": self.id,
+            "product_idea": self.product_idea,
+            "status": self.status,
+            "requests": self.requests,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "steps": self.steps
+        }
+        if self.error is not None:
+            job["error"] = self.error
+        if include_result and self.result is not None:
+            job["result"] = self.result
+        return job
+
+
+class ResearchService:
+    """
+    Job queue in front of a MarketResearchSystem.
+
+    `workers` ideas are researched at once and at most `queue_size` more
+    wait; beyond that submit() raises QueueFull, so callers get immediate
+    backpressure instead of unbounded latency. Submitting an idea that is
+    already queued or running returns the existing job (single-flight).
+    Finished jobs are kept for polling, up to `history` of them. With a
+    store, every result is also appended to it. While the circuit breaker
+    is open, submit() raises CircuitOpen for new ideas, and a job it
+    refused steps of fails. Safe to share between threads.
+    """
+
+    def __init__(self, system, workers: int = BATCH_MAX_IN_FLIGHT, queue_size: int = SERVICE_QUEUE_SIZE,
+                 history: int = SERVICE_JOB_HISTORY, store=None, circuit_breaker: Optional[CircuitBreaker] = None):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.system = system
+        self.store = store
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else get_circuit_breaker()
+        self.history = history
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._in_flight: Dict[str, Job] = {}  # idea key -> queued or running job
+        self._changed = threading.Condition()
+        self.counts = {"submitted": 0, "coalesced": 0, "rejected": 0, "circuit_rejected": 0,
+                       "completed": 0, "failed": 0}
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, product_idea: str) -> Tuple[Job, bool]:
+        """Queue an idea and return (job, whether it joined a job already in flight)"""
+        key = idea_key(product_idea)
+        if not key:
+            raise ValueError("Empty product idea")
+        with self._changed:
+            job = self._in_flight.get(key)
+            if job is not None:
+                job.requests += 1
+                self.counts["coalesced"] += 1
+                return job, True
+
+            circuit = self.circuit_breaker.snapshot()
+            if circuit["state"] == OPEN:
+                self.counts["circuit_rejected"] += 1
+                raise CircuitOpen(f"API unavailable (circuit breaker open), retry in {circuit['retry_in']:.0f}s",
+                                  circuit["retry_in"])
+
+            job = Job(product_idea.strip())
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.counts["rejected"] += 1
+                raise QueueFull(f"Work queue is full ({self._queue.maxsize} jobs waiting)")
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+            self.counts["submitted"] += 1
+            self._forget_old_jobs()
+            return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def wait(self, job: Job, timeout: float, after_version: Optional[int] = None) -> int:
+        """
+        Block until the job's version passes after_version (by default: until
+        it finishes) or timeout passes, and return its current version.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                changed = job.status in FINISHED if after_version is None else job.version > after_version
+                remaining = deadline - time.monotonic()
+                if changed or remaining <= 0:
+                    return job.version
+                self._changed.wait(remaining)
+
+    def health(self) -> Dict[str, Any]:
+        circuit = self.circuit_breaker.snapshot()
+        with self._changed:
+            running = sum(1 for job in self._in_flight.values() if job.status == "running")
+            return {
+                "status": "ok" if circuit["state"] == CLOSED else "degraded",
+                "circuit": circuit,
+                "workers": len(self._workers),
+                "running": running,
+                "queued": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "jobs_kept": len(self._jobs),
+                **self.counts
+            }
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            self._update(job, status="running", started_at=time.time())
+
+            def on_event(event: ResearchEvent, job: Job = job):
+                if isinstance(event, AgentFinished):
+                    self._update(job, steps={**job.steps, event.agent: event.result.get("status")})
+
+            try:
+                result = self.system.research_product_idea(job.product_idea, on_event=on_event)
+                if self.store is not None:
+                    self.store.add(result)
+                if circuit_tripped(result):
+                    self._update(job, status="failed", result=result, finished_at=time.time(),
+                                 error="API unavailable (circuit breaker open)")
+                else:
+                    self._update(job, status="done", result=result, finished_at=time.time())
+            except Exception as e:
+                self._update(job, status="failed", error=str(e), finished_at=time.time())
+
+    def _update(self, job: Job, **changes):
+        with self._changed:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.version += 1
+            if job.status in FINISHED:
+                self._in_flight.pop(job.key, None)
+                self.counts["completed" if job.status == "done" else "failed"] += 1
+            self._changed.notify_all()
+
+    def _forget_old_jobs(self):
+        """Drop the oldest finished jobs beyond the history limit (lock held)"""
+        excess = len(self._jobs) - self.history
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].status in FINISHED:
+                del self._jobs[job_id]
+                excess -= 1
+
+
+def make_handler(service: ResearchService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/research":
+                self._send_json(404, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                idea = body.get("idea") or body.get("product_idea") if isinstance(body, dict) else None
+                if not isinstance(idea, str) or not idea.strip():
+                    raise ValueError("Body must be a JSON object with an 'idea' string")
+                wait = min(float(parse_qs(url.query).get("wait", ["0"])[0]), MAX_WAIT)
+            except ValueError as e:  # includes invalid JSON
+                self._send_json(400, {"error": str(e)})
+                return
+
+            try:
+                job, coalesced = service.submit(idea)
+            except QueueFull as e:
+                self._send_json(429, {"error": str(e)}, {"Retry-After": "5"})
+                return
+            except CircuitOpen as e:
+                self._send_json(503, {"error": str(e)}, {"Retry-After": str(max(1, math.ceil(e.retry_in)))})
+                return
+
+            if wait > 0:
+                service.wait(job, wait)
+            status = 200 if job.status in FINISHED else 202
+            self._send_json(status, {**job.to_dict(include_result=status == 200), "coalesced": coalesced},
+                            {"Location": f"/jobs/{job.id}"})
+
+        def do_GET(self):
+            parts = urlparse(self.path).path.strip("/").split("/")
+            if parts == ["health"]:
+                self._send_json(200, service.health())
+                return
+            if len(parts) not in (2, 3) or parts[0] != "jobs" or (len(parts) == 3 and parts[2] != "events"):
+                self._send_json(404, {"error": "Not found"})
+                return
+            job = service.get(parts[1])
+            if job is None:
+                self._send_json(404, {"error": "Unknown job (finished jobs expire)"})
+            elif len(parts) == 2:
+                self._send_json(200, job.to_dict())
+            else:
+                self._stream_events(job)
+
+        def _stream_events(self, job: Job):
+            """
+            The job's current state, then one NDJSON line each time its status
+            changes or a step finishes, until it is done; blank lines keep the
+            connection alive.
+            """
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                version = job.version
+                self._send_job(job)
+                while job.status not in FINISHED:
+                    current = service.wait(job, HEARTBEAT_INTERVAL, after_version=version)
+                    if current == version:
+                        self._send_chunk(b"\n")
+                        continue
+                    version = current
+                    self._send_job(job)
+                self._send_chunk(b"")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client went away; the job carries on
+
+        def _send_job(self, job: Job):
+            finished = job.status in FINISHED
+            self._send_chunk((json.dumps(job.to_dict(include_result=finished)) + "\n").encode())
+
+        def _send_chunk(self, data: bytes):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def _send_json(self, status: int, payload: Dict[str, Any],
+                       headers: Optional[Dict[str, str]] = None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default of 5 resets connections in a burst of requests
+
+
+def serve(service: ResearchService, host: str = SERVICE_HOST, port: int = SERVICE_PORT) -> ServiceHTTPServer:
+    """An HTTP server for the service; call serve_forever() on it"""
+    return ServiceHTTPServer((host, port), make_handler(service))
@@ -0,0 +1,241 @@
+"""
+Sharded Batch Runner
+
+Researches a list of ideas across several worker processes, each with its
+own warm MarketResearchSystem. Every finished idea is appended to a durable
+checkpoint log, so a restarted run skips the ideas that are already done.
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+import multiprocessing
+from typing import Dict, Any, Iterable, List, Optional, TextIO, Tuple
+from config import BATCH_MAX_IN_FLIGHT, BATCH_CHECKPOINT_PATH, BATCH_ON_CIRCUIT_OPEN
+from .batch import BatchRunner, is_failed
+from .store import idea_key
+
+# Seconds between checks that the workers are still alive while waiting for results
+LIVENESS_INTERVAL = 1.0
+
+
+class CheckpointLog:
+    """
+    Append-only JSONL log of finished results, one per line, synced to disk
+    after every line. The file is ordinary batch output, so it can also be
+    imported into the result store or re-scored.
+
+    A line cut short by a crash is dropped when the log is opened. The
+    latest line for an idea wins, so a failed idea that is retried later
+    counts as done. Failed ideas (any step that did not succeed, including
+    those the circuit breaker refused) are researched again on resume.
+    """
+
+    def __init__(self, path: str = BATCH_CHECKPOINT_PATH):
+        self.path = path
+        self.records: Dict[str, Tuple[int, int, bool]] = {}  # idea key -> (offset, length, ok)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a+b")
+        self._load()
+
+    def _load(self):
+        self._file.seek(0)
+        offset = 0
+        for line in self._file:
+            if not line.endswith(b"\n"):
+                break  # torn by a crash mid-write
+            try:
+                result = json.loads(line)
+            except ValueError:
+                result = None
+            if isinstance(result, dict) and result.get("product_idea"):
+                self.records[idea_key(result["product_idea"])] = (offset, len(line), not is_failed(result))
+            offset += len(line)
+        self._file.truncate(offset)
+
+    def is_done(self, key: str) -> bool:
+        record = self.records.get(key)
+        return record is not None and record[2]
+
+    def append(self, key: str, line: str, ok: bool):
+        data = line.encode("utf-8")
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.records[key] = (offset, len(data), ok)
+
+    def read(self, key: str) -> bytes:
+        offset, length, _ = self.records[key]
+        self._file.seek(offset)
+        return self._file.read(length)
+
+    def close(self):
+        self._file.close()
+
+
+def worker_system(cache_mode: Optional[str] = None, **options):
+    """The warm system a worker process researches with (options as for MarketResearchSystem)"""
+    from agents.cache import ResponseCache
+    from .system import MarketResearchSystem
+    cache = ResponseCache(mode=cache_mode) if cache_mode else None
+    return MarketResearchSystem(verbose=False, cache=cache, **options)
+
+
+class _WorkerRunner(BatchRunner):
+    """BatchRunner that hands each finished result to the parent process instead of a file"""
+
+    def __init__(self, system, max_in_flight: int, store, results, worker_id: int, on_circuit_open: str):
+        super().__init__(system, max_in_flight=max_in_flight, store=store, on_circuit_open=on_circuit_open)
+        self.results = results
+        self.worker_id = worker_id
+
+    def _write_result(self, result: Dict[str, Any], output: Optional[TextIO]) -> int:
+        failed = is_failed(result)
+        if self.store is not None:
+            self.store.add(result)
+        # Encoded here so JSON work is spread over the workers, not the parent
+        self.results.put(("result", self.worker_id, idea_key(result["product_idea"]),
+                          json.dumps(result) + "\n", failed))
+        return int(failed)
+
+
+def _exit_with_parent(parent_pid: int):
+    """Stop an orphaned worker: without the parent its results cannot be checkpointed"""
+    while os.getppid() == parent_pid:
+        time.sleep(LIVENESS_INTERVAL)
+    os._exit(1)
+
+
+def _worker_main(worker_id: int, tasks, results, system_options: Dict[str, Any],
+                 store_path: Optional[str], max_in_flight: int, on_circuit_open: str, parent_pid: int):
+    """Entry point of a worker process: research ideas from tasks until a None arrives"""
+    threading.Thread(target=_exit_with_parent, args=(parent_pid,), daemon=True).start()
+    store = None
+    if store_path:
+        from .store import ResultStore
+        store = ResultStore(store_path)
+    runner = _WorkerRunner(worker_system(**system_options), max_in_flight, store, results, worker_id,
+                           on_circuit_open)
+    stats = runner.run(iter(tasks.get, None), output=None)
+    if store is not None:
+        store.close()
+    results.put(("stats", worker_id, {"worker": worker_id, "pid": os.getpid(), **stats}))
+
+
+class ShardedBatchRunner:
+    """
+    Runs a batch of ideas on `workers` processes with up to `max_in_flight`
+    ideas each. Each worker has its own circuit breaker and handles it as
+    BatchRunner does (on_circuit_open).
+
+    Ideas are dealt out from a shared queue, so a worker that is slowed
+    down does not hold up the others. Ideas are matched ignoring case and
+    spacing, both against the checkpoint and against each other, so an
+    idea listed twice is researched once. Worker processes are spawned, so
+    system_options must be picklable (see worker_system).
+    """
+
+    def __init__(self, workers: int, checkpoint_path: str = BATCH_CHECKPOINT_PATH,
+                 max_in_flight: int = BATCH_MAX_IN_FLIGHT, system_options: Optional[Dict[str, Any]] = None,
+                 store_path: Optional[str] = None, on_circuit_open: str = BATCH_ON_CIRCUIT_OPEN):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path
+        self.max_in_flight = max_in_flight
+        self.system_options = system_options or {}
+        self.store_path = store_path  # ResultStore the workers also add every result to, if given
+        self.on_circuit_open = on_circuit_open
+
+    def run(self, ideas: Iterable[str], output: TextIO) -> Dict[str, Any]:
+        """
+        Research every idea not already done in the checkpoint, then write
+        the result of every idea as JSONL to output, in input order.
+        """
+        unique: Dict[str, str] = {}
+        for idea in ideas:
+            unique.setdefault(idea_key(idea), idea)
+
+        log = CheckpointLog(self.checkpoint_path)
+        try:
+            todo = [idea for key, idea in unique.items() if not log.is_done(key)]
+            start_time = time.perf_counter()
+            researched, worker_stats = self._research(todo, log) if todo else (0, [])
+            elapsed = time.perf_counter() - start_time
+
+            merged = failed = 0
+            for key in unique:
+                if key in log.records:
+                    output.write(log.read(key).decode("utf-8"))
+                    merged += 1
+                    failed += not log.records[key][2]
+            output.flush()
+        finally:
+            log.close()
+
+        return {
+            "ideas": merged,
+            "failed": failed,
+            "resumed": len(unique) - len(todo),
+            "researched": researched,
+            "unfinished": len(unique) - merged,
+            "elapsed_seconds": round(elapsed, 2),
+            "ideas_per_minute": round(researched / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "workers": worker_stats
+        }
+
+    def _research(self, todo: List[str], log: CheckpointLog) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Research todo on the worker processes, checkpointing each result.
+        Returns (results received, stats of every worker that finished).
+        """
+        context = multiprocessing.get_context("spawn")  # no inherited client threads or connections
+        tasks, results = context.Queue(), context.Queue()
+        workers = min(self.workers, len(todo))
+        for idea in todo:
+            tasks.put(idea)
+        for _ in range(workers):
+            tasks.put(None)
+
+        processes = [
+            context.Process(target=_worker_main, daemon=True,
+                            args=(worker_id, tasks, results, self.system_options,
+                                  self.store_path, self.max_in_flight, self.on_circuit_open, os.getpid()))
+            for worker_id in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        # Results are written as they arrive; a worker that dies loses only its ideas in flight
+        received = 0
+        worker_stats = {}
+        while len(worker_stats) < workers:
+            try:
+                message = results.get(timeout=LIVENESS_INTERVAL)
+            except queue.Empty:
+                if any(process.is_alive() for process in processes):
+                    continue
+                # Every worker has exited (some crashed); what they sent has arrived by now
+                try:
+                    message = results.get(timeout=LIVENESS_INTERVAL)
+                except queue.Empty:
+                    break
+            if message[0] == "result":
+                _, _, key, line, failed = message
+                log.append(key, line, ok=not failed)
+                received += 1
+            else:
+                worker_stats[message[1]] = message[2]
+
+        for process in processes:
+            process.join(timeout=LIVENESS_INTERVAL)
+            if process.is_alive():
+                process.terminate()
+        return received, [worker_stats[worker_id] for worker_id in sorted(worker_stats)]
@@ -0,0 +1,301 @@
+"""
+Result Store
+
+Append-only SQLite store of research results, indexed by idea, time,
+recommendation, overall score and per-agent confidence. Replaces one JSON
+file per idea; existing .json/.jsonl results can be imported.
+
+Usage: python -m core.store import "research_results_*.json" results.jsonl
+       python -m core.store get "AI-powered fitness app"
+       python -m core.store query [--recommendation Good] [--min-score 7] [--since 2024-01-01]
+                                  [--agent Growth --min-confidence 0.8] [--limit 20] [--full]
+       python -m core.store stats
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from config import RESULT_STORE_PATH
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS results ("
+    " id INTEGER PRIMARY KEY,"
+    " idea_key TEXT NOT NULL,"
+    " product_idea TEXT NOT NULL,"
+    " created_at REAL NOT NULL,"
+    " recommendation TEXT,"
+    " overall_score REAL,"
+    " digest TEXT NOT NULL UNIQUE,"
+    " source TEXT,"
+    " payload TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS agent_results ("
+    " result_id INTEGER NOT NULL REFERENCES results (id),"
+    " agent TEXT NOT NULL,"
+    " status TEXT,"
+    " confidence REAL)",
+    "CREATE INDEX IF NOT EXISTS results_idea ON results (idea_key, created_at)",
+    "CREATE INDEX IF NOT EXISTS results_created ON results (created_at)",
+    "CREATE INDEX IF NOT EXISTS results_recommendation ON results (recommendation, created_at)",
+    "CREATE INDEX IF NOT EXISTS results_score ON results (overall_score)",
+    "CREATE INDEX IF NOT EXISTS agent_results_confidence ON agent_results (agent, confidence)",
+    "CREATE INDEX IF NOT EXISTS agent_results_result ON agent_results (result_id)"
+)
+
+# Columns returned for each result when the full payload is not asked for
+SUMMARY_COLUMNS = ("id", "product_idea", "created_at", "recommendation", "overall_score")
+
+# Rows fetched from SQLite at a time while streaming a query
+FETCH_SIZE = 256
+
+
+def idea_key(product_idea: str) -> str:
+    """Lookup key of an idea: case and spacing do not matter"""
+    return " ".join(product_idea.lower().split())
+
+
+def result_recommendation(result: Dict[str, Any]) -> Optional[str]:
+    """The recommendation of the decision step in a result, if it has one"""
+    for agent_result in result.get("research_results", {}).values():
+        if "recommendation" in agent_result:
+            return agent_result["recommendation"]
+    return None
+
+
+class ResultStore:
+    """
+    Research results appended to a SQLite file, never updated in place.
+
+    Every run of an idea is kept; latest() returns the newest. Adding a
+    result identical to a stored one is a no-op, so imports can be re-run.
+    Queries stream rows from their own connection, so a long listing
+    neither loads everything into memory nor blocks writers. Safe to share
+    between threads.
+    """
+
+    def __init__(self, path: str = RESULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            # Readers see a consistent snapshot while results are being appended
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def add(self, result: Dict[str, Any], created_at: Optional[float] = None,
+            source: Optional[str] = None) -> Optional[int]:
+        """Append a result and return its id, or None if the same result is already stored"""
+        product_idea = result.get("product_idea")
+        if not product_idea:
+            raise ValueError("Result has no product_idea")
+        payload = json.dumps(result)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        overall_score = result.get("evaluation", {}).get("system_performance", {}).get("overall_score")
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO results (idea_key, product_idea, created_at, recommendation,"
+                " overall_score, digest, source, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (idea_key(product_idea), product_idea, created_at if created_at is not None else time.time(),
+                 result_recommendation(result), overall_score, digest, source, payload)
+            )
+            if cursor.rowcount == 0:
+                return None
+            result_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO agent_results (result_id, agent, status, confidence) VALUES (?, ?, ?, ?)",
+                [(result_id, agent_name, agent_result.get("status"), agent_result.get("confidence"))
+                 for agent_name, agent_result in result.get("research_results", {}).items()]
+            )
+            self._conn.commit()
+        return result_id
+
+    def import_files(self, paths: Iterable[str]) -> Tuple[int, int]:
+        """
+        Import saved .json/.jsonl results (timestamped with their file's
+        modification time) and return (added, already stored).
+        """
+        from .batch import iter_saved_results
+        added = skipped = 0
+        for path in paths:
+            modified_at = os.path.getmtime(path)
+            for source, result in iter_saved_results([path]):
+                if result.get("product_idea") and self.add(result, modified_at, source) is not None:
+                    added += 1
+                else:
+                    skipped += 1
+        return added, skipped
+
+    def get(self, result_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM results WHERE id = ?", (result_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def latest(self, product_idea: str) -> Optional[Dict[str, Any]]:
+        """The newest result for an idea, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM results WHERE idea_key = ? ORDER BY created_at DESC, id DESC LIMIT 1",
+                (idea_key(product_idea),)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def history(self, product_idea: str, full: bool = False) -> Iterator[Dict[str, Any]]:
+        """Every stored run of an idea, newest first"""
+        return self._stream("WHERE r.idea_key = ?", [idea_key(product_idea)], full=full)
+
+    def query(self, recommendation: Optional[str] = None, min_score: Optional[float] = None,
+              max_score: Optional[float] = None, since: Optional[float] = None,
+              until: Optional[float] = None, agent: Optional[str] = None,
+              min_confidence: Optional[float] = None, max_confidence: Optional[float] = None,
+              limit: Optional[int] = None, full: bool = False,
+              oldest_first: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Stream results matching every given filter, newest first (or oldest
+        first, in the order they were researched).
+
+        since/until are Unix timestamps. The confidence range applies to
+        agent, or to any agent when agent is None. With full=False each item
+        is a summary (SUMMARY_COLUMNS); with full=True it is the stored result.
+        """
+        conditions, params = [], []
+        if recommendation is not None:
+            conditions.append("r.recommendation = ?")
+            params.append(recommendation)
+        for column, operator, value in (("r.overall_score", ">=", min_score), ("r.overall_score", "<=", max_score),
+                                        ("r.created_at", ">=", since), ("r.created_at", "<", until)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        if agent is not None or min_confidence is not None or max_confidence is not None:
+            agent_conditions = ["a.result_id = r.id"]
+            for condition, value in (("a.agent = ?", agent), ("a.confidence >= ?", min_confidence),
+                                     ("a.confidence <= ?", max_confidence)):
+                if value is not None:
+                    agent_conditions.append(condition)
+                    params.append(value)
+            conditions.append(f"EXISTS (SELECT 1 FROM agent_results a WHERE {' AND '.join(agent_conditions)})")
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._stream(where, params, full=full, limit=limit, oldest_first=oldest_first)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            results, ideas, first, last = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT idea_key), MIN(created_at), MAX(created_at) FROM results"
+            ).fetchone()
+            recommendations = dict(self._conn.execute(
+                "SELECT COALESCE(recommendation, 'None'), COUNT(*) FROM results GROUP BY recommendation"
+            ).fetchall())
+        return {"results": results, "ideas": ideas, "first": first, "last": last,
+                "recommendations": recommendations}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _stream(self, where: str, params: List[Any], full: bool, limit: Optional[int] = None,
+                oldest_first: bool = False) -> Iterator[Dict[str, Any]]:
+        columns = ", ".join(f"r.{column}" for column in SUMMARY_COLUMNS + (("payload",) if full else ()))
+        order = "ASC" if oldest_first else "DESC"
+        sql = f"SELECT {columns} FROM results r {where} ORDER BY r.created_at {order}, r.id {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = params + [limit]
+
+        # An in-memory database exists only on its own connection
+        own_connection = self.path != ":memory:"
+        conn = sqlite3.connect(self.path) if own_connection else self._conn
+        try:
+            if own_connection:
+                cursor = conn.execute(sql, params)
+            else:
+                with self._lock:
+                    cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    yield json.loads(row[-1]) if full else dict(zip(SUMMARY_COLUMNS, row))
+        finally:
+            if own_connection:
+                conn.close()
+
+
+def _parse_time(value: str) -> float:
+    """A Unix timestamp from an ISO date/time or a number"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and query stored research results")
+    parser.add_argument("--store", default=RESULT_STORE_PATH, help="store file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="import saved .json/.jsonl results")
+    import_parser.add_argument("patterns", nargs="+", help="files or glob patterns")
+
+    get_parser = commands.add_parser("get", help="print the latest result for an idea")
+    get_parser.add_argument("product_idea")
+    get_parser.add_argument("--history", action="store_true", help="list every run of the idea instead")
+
+    query_parser = commands.add_parser("query", help="stream matching results as JSONL")
+    query_parser.add_argument("--recommendation")
+    query_parser.add_argument("--min-score", type=float)
+    query_parser.add_argument("--max-score", type=float)
+    query_parser.add_argument("--since", type=_parse_time, help="ISO date/time or Unix timestamp")
+    query_parser.add_argument("--until", type=_parse_time, help="ISO date/time or Unix timestamp")
+    query_parser.add_argument("--agent", help="agent the confidence range applies to")
+    query_parser.add_argument("--min-confidence", type=float)
+    query_parser.add_argument("--max-confidence", type=float)
+    query_parser.add_argument("--limit", type=int)
+    query_parser.add_argument("--full", action="store_true", help="print whole results, not summaries")
+
+    commands.add_parser("stats", help="print store totals")
+    args = parser.parse_args()
+
+    store = ResultStore(args.store)
+    if args.command == "import":
+        paths = sorted(path for pattern in args.patterns for path in (glob.glob(pattern) or [pattern]))
+        added, skipped = store.import_files(paths)
+        print(f"Imported {added} results from {len(paths)} files ({skipped} already stored or invalid)")
+    elif args.command == "get":
+        if args.history:
+            for summary in store.history(args.product_idea):
+                print(json.dumps(summary))
+        else:
+            result = store.latest(args.product_idea)
+            if result is None:
+                print(f"No stored result for: {args.product_idea}", file=sys.stderr)
+                sys.exit(1)
+            print(json.dumps(result, indent=2))
+    elif args.command == "query":
+        for item in store.query(args.recommendation, args.min_score, args.max_score, args.since, args.until,
+                                args.agent, args.min_confidence, args.max_confidence, args.limit, args.full):
+            sys.stdout.write(json.dumps(item) + "\n")
+    else:
+        print(json.dumps(store.stats(), indent=2))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,117 +1,266 @@
 """
 Market Research System Orchestrator
 
-Main system class that coordinates all agents and evaluation.
+Main system class that coordinates all agents and evaluation. Progress is
+reported as events (see core/events.py) to subscribers such as the console printer.
 """
 
-from typing import Dict, Any
-from agents import IncumbentsAgent, FundingAgent, GrowthAgent, DecisionAgent
+import queue
+import threading
+from typing import Dict, Any, Callable, Iterator, List, Optional, Sequence
+from agents.cache import ResponseCache
+from agents.client import ConnectionStats, get_shared_client, peek_shared_client
+from agents.fused_agent import FusedAgent, FusedOutputError, split_metrics
+from config import PARALLEL_AGENTS, STREAM_RESPONSES, FUSED_MODE, MODEL_ROUTING, MICRO_BATCHING
 from .evaluator import AgentEvaluator
+from .metrics import MetricsRecorder, summarize_usage
+from .dedup import IdeaIndex, is_reusable
+from .registry import AgentRegistry, AgentSpec, default_registry
+from .executor import DagExecutor, run_agent
+from .routing import TieredRouter
+from .micro_batch import MicroBatcher
+from .console import ConsolePrinter
+from .events import (
+    Subscriber, ResearchEvent, ResearchStarted, IdeaReused, SimilarIdeaFound, FusedStarted, FusedFallback,
+    AgentStarted, AgentChunk, AgentFinished, DecisionMade, EvaluationReady, ResearchFinished
+)
+
+# Emits one event to a run's subscribers; None when nobody is listening
+Emit = Optional[Callable[[ResearchEvent], None]]
 
 
 class MarketResearchSystem:
-    """Main system that orchestrates the 4-agent market research process"""
+    """Main system that orchestrates the registered market research agents"""
     
-    def __init__(self):
-        self.incumbents_agent = IncumbentsAgent()
-        self.funding_agent = FundingAgent()
-        self.growth_agent = GrowthAgent()
-        self.decision_agent = DecisionAgent()
+    def __init__(self, parallel: Optional[bool] = None, verbose: bool = True,
+                 cache: Optional[ResponseCache] = None, client=None, stream: Optional[bool] = None,
+                 metrics_recorder: Optional[MetricsRecorder] = None,
+                 idea_index: Optional[IdeaIndex] = None, registry: Optional[AgentRegistry] = None,
+                 fused: Optional[bool] = None, subscribers: Optional[Sequence[Subscriber]] = None,
+                 routing: Optional[bool] = None, micro_batch: Optional[bool] = None):
+        self.parallel = PARALLEL_AGENTS if parallel is None else parallel
+        self.verbose = verbose  # batch callers turn console output off
+        # Every run's progress events go to these; with none, no events are built at all
+        self.subscribers: List[Subscriber] = ([ConsolePrinter()] if verbose else []) + list(subscribers or [])
+        self.stream = STREAM_RESPONSES if stream is None else stream
+        self.metrics_recorder = metrics_recorder
+        self.idea_index = idea_index  # near-duplicate detection, off when None
+        self.registry = registry if registry is not None else default_registry()
+        
+        # One pooled client shared by all agents. Unless one is given, the
+        # shared client is built on the first API call, not here.
+        self._client = client
+        agent_options = {"cache": cache, "client": client, "stream": self.stream}
+        self.agents = {spec.name: spec.create_agent(**agent_options) for spec in self.registry}
         self.evaluator = AgentEvaluator()
+        for spec in self.registry:
+            if spec.criteria:
+                self.evaluator.register_agent(spec.name, spec.criteria, spec.keywords)
+        
+        # Tiered steps try the fast model first when routing is on
+        routing = MODEL_ROUTING if routing is None else routing
+        self.router = TieredRouter(self.evaluator) if routing else None
+        
+        # Research steps of ideas in flight together share completions when micro-batching
+        micro_batch = MICRO_BATCHING if micro_batch is None else micro_batch
+        if micro_batch and routing:
+            raise ValueError("Micro-batching and tiered model routing cannot be combined")
+        self.micro_batcher = MicroBatcher() if micro_batch else None
+        
+        # Independent steps run concurrently unless parallel is off
+        self.executor = DagExecutor(self.registry, self.agents, max_workers=None if self.parallel else 1,
+                                    step_runner=self.micro_batcher or self.router or run_agent)
+        
+        # Fused mode: one JSON completion for every step, the DAG only as a fallback
+        fused = FUSED_MODE if fused is None else fused
+        self.fused_agent = FusedAgent(
+            {spec.name: self.agents[spec.name].system_prompt for spec in self.registry},
+            {spec.name: spec.dependencies for spec in self.registry},
+            cache=cache, client=client, stream=self.stream
+        ) if fused else None
+    
+    @property
+    def client(self):
+        """The client the agents use (the shared one unless one was given)"""
+        if self._client is None:
+            self._client = get_shared_client()
+        return self._client
     
-    def research_product_idea(self, product_idea: str) -> Dict[str, Any]:
-        """Run complete market research analysis"""
-        print(f"\n Researching product idea: {product_idea}")
-        print("=" * 60)
+    def subscribe(self, subscriber: Subscriber) -> Subscriber:
+        """Send the events of every later run to subscriber"""
+        self.subscribers.append(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.remove(subscriber)
+    
+    def research_product_idea(self, product_idea: str, on_event: Optional[Subscriber] = None) -> Dict[str, Any]:
+        """Run complete market research analysis (on_event also receives this run's events)"""
+        subscribers = tuple(self.subscribers) + ((on_event,) if on_event is not None else ())
+        emit = self._emitter(subscribers)
+        if emit:
+            emit(ResearchStarted(product_idea, self.registry.names()))
         
-        results = {}
+        # Step 0: Answer near-duplicates of earlier ideas without any agent calls
+        similar = self.idea_index.find(product_idea) if self.idea_index is not None else None
+        if similar is not None and self.idea_index.mode == "reuse":
+            result = self.idea_index.reuse(product_idea, similar)
+            if emit:
+                emit(IdeaReused(product_idea, similar, result["reused_from"]["api_calls_avoided"]))
+                emit(EvaluationReady(product_idea, result.get("evaluation", {})))
+                emit(ResearchFinished(product_idea, result))
+            return result
+        
+        connections_before = self.connection_snapshot()
         
-        # Step 1: Run individual research agents
-        print("\n1️⃣  Analyzing Competitors...")
-        incumbents_result = self.incumbents_agent.research(product_idea)
-        results["Incumbents"] = incumbents_result
-        self._print_agent_result("Incumbents", incumbents_result)
-        
-        print("\n2️⃣  Researching Funding Landscape...")
-        funding_result = self.funding_agent.research(product_idea)
-        results["Funding"] = funding_result
-        self._print_agent_result("Funding", funding_result)
-        
-        print("\n3️⃣  Evaluating Growth Potential...")
-        growth_result = self.growth_agent.research(product_idea)
-        results["Growth"] = growth_result
-        self._print_agent_result("Growth", growth_result)
-        
-        # Step 2: Make final decision
-        print("\n4️⃣  Making Final Recommendation...")
-        decision_result = self.decision_agent.make_decision(
-            incumbents_result.get("analysis", ""),
-            funding_result.get("analysis", ""),
-            growth_result.get("analysis", ""),
-            product_idea
-        )
-        results["Decision"] = decision_result
-        self._print_decision_result(decision_result)
+        # Steps 1-2: Run the agents, each as soon as the agents it reads from are done,
+        # unless a single fused completion answered for all of them
+        on_start, on_finish = self._step_callbacks(product_idea, emit)
+        results, fused = (self._run_fused(product_idea, emit, on_start, on_finish)
+                          if self.fused_agent is not None else (None, None))
+        if results is None:
+            results = self.executor.run(product_idea, on_start=on_start, on_finish=on_finish)
         
         # Step 3: Evaluate system performance
-        print("\n📊 System Evaluation")
-        print("-" * 30)
         evaluation = self.evaluator.evaluate_full_research(results)
-        self._print_evaluation(evaluation)
+        evaluation["usage"] = summarize_usage(results)
+        if emit:
+            emit(EvaluationReady(product_idea, evaluation))
         
-        return {
+        result = {
             "research_results": results,
             "evaluation": evaluation,
-            "product_idea": product_idea
+            "product_idea": product_idea,
+            "cache": self._cache_counts(results),
+            "connections": self._connection_usage(connections_before)
         }
+        if fused is not None:
+            result["fused"] = fused
+        if similar is not None:
+            result["similar_to"] = self.idea_index.flag(similar)
+            if emit:
+                emit(SimilarIdeaFound(product_idea, similar))
+        if self.idea_index is not None and is_reusable(result):
+            self.idea_index.add(product_idea, result)
+        if self.metrics_recorder is not None:
+            self.metrics_recorder.record(result)
+        if emit:
+            emit(ResearchFinished(product_idea, result))
+        return result
     
-    def _print_agent_result(self, agent_name: str, result: Dict[str, Any]):
-        """Print formatted agent result"""
-        analysis = result.get("analysis", "No analysis available")
-        confidence = result.get("confidence", 0.0)
+    def iter_research(self, product_idea: str) -> Iterator[ResearchEvent]:
+        """
+        Research an idea on a background thread, yielding its events as they
+        happen. The last one is ResearchFinished with the result; an error
+        in the run is raised here instead.
+        """
+        events = queue.Queue()
+        done = object()
+        
+        def run():
+            try:
+                self.research_product_idea(product_idea, on_event=events.put)
+            except BaseException as e:
+                events.put(e)
+            finally:
+                events.put(done)
         
-        print(f"   Analysis: {analysis[:200]}{'...' if len(analysis) > 200 else ''}")
-        print(f"   Confidence: {confidence:.1f}")
+        threading.Thread(target=run, daemon=True).start()
+        while True:
+            event = events.get()
+            if event is done:
+                return
+            if isinstance(event, BaseException):
+                raise event
+            yield event
     
-    def _print_decision_result(self, result: Dict[str, Any]):
-        """Print formatted decision result"""
-        recommendation = result.get("recommendation", "Unknown")
-        reasoning = result.get("reasoning", "No reasoning available")
-        confidence = result.get("confidence", 0.0)
-        
-        # Color coding for recommendations
-        colors = {
-            "Good": "🟢",
-            "Neutral": "🟡", 
-            "Poor": "🔴",
-            "Error": "⚠️"
-        }
+    @staticmethod
+    def _emitter(subscribers: Sequence[Subscriber]) -> Emit:
+        if not subscribers:
+            return None
         
-        print(f"   {colors.get(recommendation, '❓')} Recommendation: {recommendation}")
-        print(f"   Reasoning: {reasoning[:300]}{'...' if len(reasoning) > 300 else ''}")
-        print(f"   Confidence: {confidence:.1f}")
+        def emit(event: ResearchEvent):
+            for subscriber in subscribers:
+                subscriber(event)
+        return emit
     
-    def _print_evaluation(self, evaluation: Dict[str, Any]):
-        """Print system evaluation summary"""
-        system_perf = evaluation.get("system_performance", {})
-        overall_score = system_perf.get("overall_score", 0)
-        recommendations = evaluation.get("recommendations", [])
-        
-        print(f"   Overall Score: {overall_score}/10")
-        print(f"   Performance: {self._get_performance_label(overall_score)}")
-        
-        if recommendations:
-            print("   Recommendations:")
-            for rec in recommendations[:2]:  # Show top 2
-                print(f"     • {rec}")
+    def _step_callbacks(self, product_idea: str, emit: Emit):
+        """Executor callbacks that turn step progress into events (None, None when nobody listens)"""
+        if not emit:
+            return None, None
+        
+        def on_start(spec: AgentSpec) -> Optional[Callable[[str], None]]:
+            emit(AgentStarted(product_idea, spec.name, spec.title, self.agents[spec.name].output_field))
+            if not self.stream:
+                return None  # an on_chunk callback would turn streaming on
+            return lambda text: emit(AgentChunk(product_idea, spec.name, text))
+        
+        def on_finish(spec: AgentSpec, result: Dict[str, Any]):
+            emit(AgentFinished(product_idea, spec.name, spec.title, result))
+            if "recommendation" in result:
+                emit(DecisionMade(product_idea, spec.name, result["recommendation"], result.get("confidence", 0.0)))
+        
+        return on_start, on_finish
+    
+    def _run_fused(self, product_idea: str, emit: Emit, on_start, on_finish):
+        """
+        Research every step with one fused completion.
+        
+        Returns (results, fused info). Results are None when the reply could
+        not be split into sections; the info then holds the reason and the
+        wasted call's metrics, and the caller falls back to the DAG.
+        """
+        if emit:
+            emit(FusedStarted(product_idea))
+        metrics = {}
+        try:
+            sections = self.fused_agent.research_sections(product_idea, metrics)
+        except Exception as e:
+            reason = str(e) if isinstance(e, FusedOutputError) else f"{type(e).__name__}: {e}"
+            if emit:
+                emit(FusedFallback(product_idea, reason))
+            return None, {"status": "fallback", "reason": reason, "metrics": metrics}
+        
+        section_metrics = split_metrics(metrics, sections)
+        results = {}
+        for spec in self.registry:
+            results[spec.name] = self.agents[spec.name].build_result(
+                product_idea, sections[spec.name], section_metrics[spec.name])
+            if emit:
+                on_start(spec)
+                on_finish(spec, results[spec.name])
+        return results, {"status": "ok"}
     
-    def _get_performance_label(self, score: float) -> str:
-        """Get performance label from score"""
-        if score >= 8.0:
-            return "Excellent ⭐"
-        elif score >= 6.0:
-            return "Good ✅"
-        elif score >= 4.0:
-            return "Adequate ⚠️"
-        else:
-            return "Needs Improvement ❌"
+    def _cache_counts(self, results: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """Count cache hits and misses across the agent calls of one run"""
+        statuses = [result.get("metrics", {}).get("cache") for result in results.values()
+                    if result.get("status") != "skipped"]
+        return {
+            "hits": statuses.count("hit"),
+            "misses": len(statuses) - statuses.count("hit")
+        }
+    
+    def connection_snapshot(self) -> Optional[Dict[str, int]]:
+        """
+        Snapshot the client's connection counters, if it tracks them.
+        
+        Does not build the shared client: until it exists (runs answered
+        from the cache or by reuse never need it) the counters are all zero.
+        """
+        client = self._client if self._client is not None else peek_shared_client()
+        if client is None:
+            return ConnectionStats().snapshot()
+        stats = getattr(client, "connection_stats", None)
+        return stats.snapshot() if stats is not None else None
+    
+    def _connection_usage(self, before: Optional[Dict[str, int]]) -> Optional[Dict[str, Any]]:
+        """
+        Connection reuse during one run.
+        
+        Runs that overlap in batch mode share the client, so their figures
+        include each other's requests.
+        """
+        after = self.connection_snapshot()
+        if before is None or after is None:
+            return None
+        return ConnectionStats.summarize(before, after)
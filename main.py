@@ -3,44 +3,331 @@ Market Research System - Main Execution Script
 
 This script orchestrates the 4-agent market research system:
 1. Incumbents Agent - Analyzes competitors
-2. Funding Agent - Researches funding landscape  
+2. Funding Agent - Researches funding landscape
 3. Growth Agent - Evaluates market growth
 4. Decision Agent - Makes final recommendation
 
 Usage: python3 main.py "product idea"
+       python3 main.py --batch ideas.txt [--output results.jsonl] [--concurrency 8]
+       python3 main.py --batch ideas.txt --workers 4 [--checkpoint batch_checkpoint.jsonl]
+       python3 main.py --serve [--host 127.0.0.1] [--port 8080] [--concurrency 8]
+
+Every result is appended to the result store (see core/store.py).
 """
 
 import sys
+import glob
 import json
-from core import MarketResearchSystem
+import argparse
+import os
+from config import (
+    BATCH_MAX_IN_FLIGHT, BATCH_WORKERS, BATCH_CHECKPOINT_PATH, BATCH_ON_CIRCUIT_OPEN, DEDUP_MODE,
+    RESULT_STORE_PATH, SERVICE_HOST, SERVICE_PORT, SERVICE_QUEUE_SIZE
+)
 
+# The research system is imported inside run_single/run_batch/run_service, so printing
+# usage or --help does not load it
+
+
+def print_usage():
+    print("Usage: python main.py \"your product idea\"")
+    print("       python main.py --batch ideas.txt [--output results.jsonl] [--concurrency N]")
+    print("       python main.py --batch ideas.txt --workers N [--checkpoint FILE]")
+    print("       python main.py --serve [--host HOST] [--port PORT] [--concurrency N]")
+    print("\nExample:")
+    print("python main.py \"AI-powered fitness app\"")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(add_help=True)
+    parser.add_argument("product_idea", nargs="?")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="research every idea in a text or JSONL file ('-' for stdin)")
+    parser.add_argument("--output", metavar="FILE", default="-",
+                        help="JSONL file for batch results (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_MAX_IN_FLIGHT,
+                        help="maximum number of ideas in flight in batch (per worker) and service mode")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS,
+                        help="worker processes in batch mode; results are checkpointed and merged")
+    parser.add_argument("--checkpoint", metavar="FILE",
+                        help=f"checkpoint log of a multi-process batch, re-run to resume "
+                             f"(default: {BATCH_CHECKPOINT_PATH}; implies the multi-process runner)")
+    parser.add_argument("--on-circuit-open", choices=("pause", "drain"), default=BATCH_ON_CIRCUIT_OPEN,
+                        help="while the API is failing, pause the batch and retry ideas, or fail them fast")
+    parser.add_argument("--serve", action="store_true",
+                        help="run a local HTTP research service (see core/service.py)")
+    parser.add_argument("--host", default=SERVICE_HOST, help="service address")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="service port")
+    parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE,
+                        help="jobs that may wait in service mode before new ones are rejected")
+    parser.add_argument("--sequential", action="store_true",
+                        help="run the research agents one after another")
+    parser.add_argument("--stream", action="store_true", default=None,
+                        help="stream completions as they are generated")
+    parser.add_argument("--quiet", action="store_true",
+                        help="print no progress for a single idea, only where the result was saved")
+    parser.add_argument("--fused", action="store_true", default=None,
+                        help="one JSON completion for all agents (cheap triage, per-agent fallback)")
+    parser.add_argument("--route", action="store_true", default=None,
+                        help="run agents on the fast model first, re-running weak outputs on the strong one")
+    parser.add_argument("--micro-batch", action="store_true", default=None,
+                        help="batch and service mode: ideas in flight together share one request per agent")
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument("--no-cache", action="store_const", dest="cache_mode", const="bypass",
+                             help="neither read nor write the response cache")
+    cache_group.add_argument("--refresh-cache", action="store_const", dest="cache_mode", const="refresh",
+                             help="ignore cached responses and store fresh ones")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="append every agent call's latency, tokens and cost to a JSONL trace")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="keep a Prometheus text-format snapshot of agent usage in FILE")
+    parser.add_argument("--dedup", choices=("reuse", "flag"), default=DEDUP_MODE,
+                        help="reuse (or only flag) earlier research for near-duplicate ideas")
+    parser.add_argument("--dedup-from", metavar="FILE", nargs="+", default=[],
+                        help="saved results (.json/.jsonl/store, globs allowed) to match ideas against "
+                             "(default: the result store)")
+    store_group = parser.add_mutually_exclusive_group()
+    store_group.add_argument("--store", metavar="FILE", default=RESULT_STORE_PATH,
+                             help=f"result store to append results to (default: {RESULT_STORE_PATH})")
+    store_group.add_argument("--no-store", action="store_const", dest="store", const=None,
+                             help="do not keep results in the result store")
+    parser.add_argument("--json", metavar="FILE",
+                        help="also write the result of a single idea to a JSON file")
+    args = parser.parse_args()
+    if args.route and args.micro_batch:
+        parser.error("--route and --micro-batch cannot be combined")
+    return args
+
+
+def build_cache(args):
+    """Use the shared response cache unless a cache mode was given on the command line"""
+    from agents.cache import ResponseCache
+    return ResponseCache(mode=args.cache_mode) if args.cache_mode else None
+
+
+def build_metrics_recorder(args):
+    """Record agent usage only when a trace or snapshot file was asked for"""
+    if not (args.trace or args.metrics):
+        return None
+    from agents.circuit_breaker import get_circuit_breaker
+    from core.metrics import MetricsRecorder
+    return MetricsRecorder(trace_path=args.trace, snapshot_path=args.metrics,
+                           circuit_breaker=get_circuit_breaker())
+
+
+def report_circuit_changes():
+    """Print circuit breaker state changes to stderr as they happen"""
+    from agents.circuit_breaker import get_circuit_breaker
+
+    def report(change):
+        print(f" Circuit breaker {change['from']} -> {change['to']}: {change['reason']}", file=sys.stderr)
+    get_circuit_breaker().subscribe(report)
+
+
+def print_circuit_summary(stats):
+    circuit = stats["circuit"]
+    if circuit["opened_total"] or stats["requeued"]:
+        print(f" Circuit breaker: opened {circuit['opened_total']} times, {circuit['rejected_total']} calls "
+              f"refused, paused {stats['paused_seconds']}s, {stats['requeued']} ideas re-queued", file=sys.stderr)
+
+
+def build_idea_index(args):
+    """Near-duplicate index seeded from earlier results, or None when dedup is off"""
+    if not args.dedup:
+        return None
+    from core.dedup import IdeaIndex
+    index = IdeaIndex(mode=args.dedup)
+    patterns = args.dedup_from or ([args.store] if args.store and os.path.exists(args.store) else [])
+    paths = sorted(path for pattern in patterns for path in (glob.glob(pattern) or [pattern]))
+    loaded = index.load(paths)
+    print(f" Dedup: {loaded} earlier results indexed", file=sys.stderr)
+    return index
+
+
+def build_store(args):
+    """The result store results are appended to, or None with --no-store"""
+    if not args.store:
+        return None
+    from core.store import ResultStore
+    return ResultStore(args.store)
+
+
+def run_single(args):
+    from core import MarketResearchSystem
+
+    product_idea = args.product_idea
 
-def main():
-    if len(sys.argv) != 2:      # correct user if they do not provide a product idea
-        print("Usage: python main.py \"your product idea\"")
-        print("\nExample:")
-        print("python main.py \"AI-powered fitness app\"")
-        sys.exit(1)
-    
-    product_idea = sys.argv[1]
-    
     # Initialize system
-    system = MarketResearchSystem()
-    
+    metrics_recorder = build_metrics_recorder(args)
+    system = MarketResearchSystem(parallel=not args.sequential, verbose=not args.quiet,
+                                  cache=build_cache(args), stream=args.stream, fused=args.fused,
+                                  routing=args.route, metrics_recorder=metrics_recorder,
+                                  idea_index=build_idea_index(args))
+
+    store = build_store(args)
+
     try:
         # Run research
         results = system.research_product_idea(product_idea)
-        
-        # Save results to file
-        output_file = f"research_results_{product_idea.replace(' ', '_')[:20]}.json"
-        with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        
-        print(f"\n Results saved to: {output_file}")
-        
+
+        # Save results
+        if store is not None:
+            result_id = store.add(results)
+            print(f"\n Results saved to: {args.store} (result {result_id})")
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"\n Results saved to: {args.json}")
+
     except Exception as e:
         print(f"\n Error: {str(e)}")
         sys.exit(1)
+    finally:
+        if metrics_recorder is not None:
+            metrics_recorder.close()
+        if store is not None:
+            store.close()
+
+
+def run_sharded_batch(args):
+    from core.batch import iter_ideas
+    from core.sharded import ShardedBatchRunner
+
+    if args.trace or args.metrics or args.dedup:
+        print(" Error: --trace, --metrics and --dedup are not supported with --workers", file=sys.stderr)
+        sys.exit(1)
+
+    checkpoint = args.checkpoint or BATCH_CHECKPOINT_PATH
+    system_options = {"parallel": not args.sequential, "stream": args.stream, "fused": args.fused,
+                      "routing": args.route, "micro_batch": args.micro_batch, "cache_mode": args.cache_mode}
+    runner = ShardedBatchRunner(args.workers, checkpoint, max_in_flight=args.concurrency,
+                                system_options=system_options, store_path=args.store,
+                                on_circuit_open=args.on_circuit_open)
+
+    source = sys.stdin if args.batch == "-" else open(args.batch)
+    try:
+        ideas = list(iter_ideas(source))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    output = sys.stdout if args.output == "-" else open(args.output, 'w')
+    try:
+        stats = runner.run(ideas, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    # Summary goes to stderr so stdout stays pure JSONL
+    print(f"\n Batch complete: {stats['ideas']} ideas ({stats['failed']} failed, {stats['resumed']} from "
+          f"checkpoint {checkpoint}) - {stats['researched']} researched in {stats['elapsed_seconds']}s, "
+          f"{stats['ideas_per_minute']} ideas/min", file=sys.stderr)
+    for worker in stats["workers"]:
+        print(f"   Worker {worker['worker']} (pid {worker['pid']}): {worker['ideas']} ideas "
+              f"({worker['failed']} failed), {worker['ideas_per_minute']} ideas/min", file=sys.stderr)
+        print_circuit_summary(worker)
+    if stats["unfinished"]:
+        print(f" {stats['unfinished']} ideas unfinished (a worker exited); re-run to resume", file=sys.stderr)
+        sys.exit(1)
+
+
+def run_batch(args):
+    if args.workers > 1 or args.checkpoint:
+        run_sharded_batch(args)
+        return
+
+    from core import MarketResearchSystem, BatchRunner
+    from core.batch import iter_ideas
+
+    # One warm system shared by every idea in the batch
+    metrics_recorder = build_metrics_recorder(args)
+    system = MarketResearchSystem(parallel=not args.sequential, verbose=False,
+                                  cache=build_cache(args), stream=args.stream, fused=args.fused,
+                                  routing=args.route, micro_batch=args.micro_batch,
+                                  metrics_recorder=metrics_recorder,
+                                  idea_index=build_idea_index(args))
+    store = build_store(args)
+    runner = BatchRunner(system, max_in_flight=args.concurrency, store=store,
+                         on_circuit_open=args.on_circuit_open)
+    report_circuit_changes()
+
+    source = sys.stdin if args.batch == "-" else open(args.batch)
+    output = sys.stdout if args.output == "-" else open(args.output, 'w')
+
+    try:
+        stats = runner.run(iter_ideas(source), output)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+        if metrics_recorder is not None:
+            metrics_recorder.close()
+        if store is not None:
+            store.close()
+
+    # Summary goes to stderr so stdout stays pure JSONL
+    print(f"\n Batch complete: {stats['ideas']} ideas ({stats['failed']} failed) "
+          f"in {stats['elapsed_seconds']}s - {stats['ideas_per_minute']} ideas/min",
+          file=sys.stderr)
+    if stats["connections"]:
+        connections = stats["connections"]
+        print(f" HTTP: {connections['requests']} requests over {connections['new_connections']} "
+              f"connections ({connections['reuse_ratio']:.0%} reused)", file=sys.stderr)
+    if stats["dedup"]:
+        dedup = stats["dedup"]
+        print(f" Dedup: {dedup['matches']} near-duplicate ideas, "
+              f"{dedup['api_calls_avoided']} API calls avoided", file=sys.stderr)
+    if stats["micro_batch"]:
+        batching = stats["micro_batch"]
+        print(f" Micro-batching: {batching['batched_steps']} steps in {batching['batches']} batched requests "
+              f"({batching['retried']} re-run alone), {batching['requests_saved']} requests saved, "
+              f"{batching['mean_window_wait']}s mean window wait", file=sys.stderr)
+    print_circuit_summary(stats)
+
+
+def run_service(args):
+    from core import MarketResearchSystem
+    from core.service import ResearchService, serve
+
+    # One warm system shared by every request
+    metrics_recorder = build_metrics_recorder(args)
+    system = MarketResearchSystem(parallel=not args.sequential, verbose=False,
+                                  cache=build_cache(args), stream=args.stream, fused=args.fused,
+                                  routing=args.route, micro_batch=args.micro_batch,
+                                  metrics_recorder=metrics_recorder,
+                                  idea_index=build_idea_index(args))
+    store = build_store(args)
+    service = ResearchService(system, workers=args.concurrency, queue_size=args.queue_size, store=store)
+    server = serve(service, args.host, args.port)
+    report_circuit_changes()
+
+    print(f" Serving market research on http://{args.host}:{server.server_address[1]} "
+          f"({args.concurrency} workers, queue of {args.queue_size})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if metrics_recorder is not None:
+            metrics_recorder.close()
+        if store is not None:
+            store.close()
+
+
+def main():
+    args = parse_args()
+
+    if args.serve:
+        run_service(args)
+    elif args.batch:
+        run_batch(args)
+    elif args.product_idea:
+        run_single(args)
+    else:      # correct user if they do not provide a product idea
+        print_usage()
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+"""Shared test doubles"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+
+def make_result(idea: str, analysis: str) -> Dict[str, Any]:
+    """A finished research result whose research steps all wrote `analysis`"""
+    steps = {name: {"agent": name, "status": "ok", "analysis": analysis, "metrics": {}}
+             for name in ("Incumbents", "Funding", "Growth")}
+    return {"product_idea": idea, "research_results": steps, "evaluation": {}}
+
+
+class StubClient:
+    """
+    Stands in for openai.OpenAI in non-streamed completions, answering with
+    the given replies in turn (the last one repeats).
+    """
+
+    def __init__(self, replies: List[str]):
+        self.replies = list(replies)
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        content = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=20, total_tokens=30)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                               usage=usage)
+
+
+class FakeClock:
+    """A clock that only moves when told to"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
@@ -0,0 +1,139 @@
+"""Tests for the circuit breaker and how batches react to it"""
+
+import io
+import json
+import threading
+import pytest
+from agents.circuit_breaker import CircuitBreaker, CircuitOpen, CLOSED, OPEN, HALF_OPEN
+from core.batch import BatchRunner
+from tests.helpers import FakeClock
+
+
+def fail(breaker, times=1):
+    for _ in range(times):
+        breaker.before_call()
+        breaker.after_call(ConnectionError("API down"))
+
+
+def test_opens_after_consecutive_failures_and_closes_after_a_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30, probe_calls=1, clock=clock)
+    changes = []
+    breaker.subscribe(changes.append)
+
+    fail(breaker, 2)
+    assert breaker.state == CLOSED
+    fail(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpen) as refused:
+        breaker.before_call()
+    assert refused.value.retry_in == 30
+
+    clock.advance(30)
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()  # the probe
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()  # only one probe at a time
+    breaker.after_call()
+    assert breaker.state == CLOSED
+    assert [change["to"] for change in changes] == [OPEN, HALF_OPEN, CLOSED]
+    assert breaker.snapshot()["rejected_total"] == 2
+
+
+def test_failed_probe_opens_for_another_cooldown():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30, clock=clock)
+    fail(breaker)
+    clock.advance(30)
+    assert breaker.state == HALF_OPEN
+    fail(breaker)
+    assert breaker.state == OPEN
+    clock.advance(29)
+    assert breaker.state == OPEN
+    clock.advance(1)
+    assert breaker.state == HALF_OPEN
+
+
+def test_opens_on_error_rate_over_the_window():
+    breaker = CircuitBreaker(failure_threshold=100, error_rate=0.5, window=10, min_calls=4,
+                             clock=FakeClock())
+    for _ in range(3):
+        breaker.before_call()
+        breaker.after_call()
+        fail(breaker)
+        if breaker.state == OPEN:
+            break
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["opened_total"] == 1
+
+
+def test_invalid_requests_do_not_count_as_failures():
+    import httpx
+    import openai
+    request = httpx.Request("POST", "http://localhost/v1/chat/completions")
+    error = openai.BadRequestError("bad", response=httpx.Response(400, request=request), body=None)
+    breaker = CircuitBreaker(failure_threshold=1, clock=FakeClock())
+    breaker.before_call()
+    breaker.after_call(error)
+    assert breaker.state == CLOSED
+
+
+class OutageSystem:
+    """Stands in for MarketResearchSystem: the first `failures` API calls fail"""
+
+    def __init__(self, breaker, failures):
+        self.breaker = breaker
+        self.failures = failures
+        self._lock = threading.Lock()
+
+    def research_product_idea(self, idea):
+        try:
+            self.breaker.before_call()
+        except CircuitOpen as e:
+            return self.result(idea, "circuit_open", str(e))
+        with self._lock:
+            failing = self.failures > 0
+            self.failures -= 1
+        if failing:
+            self.breaker.after_call(ConnectionError("API down"))
+            return self.result(idea, "error", "Error: API down")
+        self.breaker.after_call()
+        return self.result(idea, "ok", "analysis")
+
+    @staticmethod
+    def result(idea, status, analysis):
+        steps = {"Growth": {"status": status, "analysis": analysis}}
+        return {"product_idea": idea, "research_results": steps}
+
+
+def run_batch(breaker, on_circuit_open, ideas, max_in_flight=2):
+    output = io.StringIO()
+    runner = BatchRunner(OutageSystem(breaker, failures=3), max_in_flight=max_in_flight,
+                         circuit_breaker=breaker, on_circuit_open=on_circuit_open, max_pause=10)
+    stats = runner.run(ideas, output)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    return stats, results
+
+
+def test_batch_pauses_and_requeues_refused_ideas():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=0.2, probe_calls=1)
+    ideas = [f"idea {number}" for number in range(8)]
+    stats, results = run_batch(breaker, "pause", ideas)
+
+    assert sorted(result["product_idea"] for result in results) == ideas
+    assert stats["failed"] == 3  # only the calls that actually failed
+    assert stats["paused_seconds"] > 0
+    assert breaker.state == CLOSED
+    assert all(result["research_results"]["Growth"]["status"] != "circuit_open" for result in results)
+
+
+def test_batch_drains_refused_ideas_as_failed():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+    ideas = [f"idea {number}" for number in range(8)]
+    stats, results = run_batch(breaker, "drain", ideas, max_in_flight=1)
+
+    assert len(results) == len(ideas)
+    assert stats["failed"] == len(ideas)
+    assert stats["requeued"] == 0
+    assert stats["paused_seconds"] == 0
+    assert sum(result["research_results"]["Growth"]["status"] == "circuit_open" for result in results) == 5
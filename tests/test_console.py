@@ -0,0 +1,31 @@
+"""Tests for the console subscriber"""
+
+import io
+from core.console import ConsolePrinter
+from core.events import AgentChunk, AgentFinished, AgentStarted, ResearchStarted
+
+IDEA = "Smart water bottle"
+
+
+def test_streamed_decision_prints_its_recommendation_before_its_reasoning():
+    out = io.StringIO()
+    printer = ConsolePrinter(out)
+    printer(ResearchStarted(IDEA, ["Growth", "Decision"]))
+
+    printer(AgentStarted(IDEA, "Growth", "Evaluating growth...", "analysis"))
+    printer(AgentChunk(IDEA, "Growth", "Growing "))
+    assert out.getvalue().endswith("Analysis: Growing ")  # research text streams as it arrives
+    printer(AgentFinished(IDEA, "Growth", "Evaluating growth...",
+                          {"analysis": "Growing market", "confidence": 0.8, "status": "ok"}))
+
+    printer(AgentStarted(IDEA, "Decision", "Making final recommendation...", "reasoning"))
+    printer(AgentChunk(IDEA, "Decision", "RECOMMENDATION: Good. Strong demand"))
+    printer(AgentFinished(IDEA, "Decision", "Making final recommendation...",
+                          {"recommendation": "Good", "reasoning": "RECOMMENDATION: Good. Strong demand",
+                           "confidence": 0.9, "status": "ok"}))
+
+    text = out.getvalue()
+    decision = text[text.index("Making final recommendation..."):]
+    assert decision.index("Recommendation: Good") < decision.index("Reasoning: RECOMMENDATION: Good")
+    assert decision.count("Reasoning:") == 1
+    assert decision.index("Reasoning:") < decision.index("Confidence: 0.9")
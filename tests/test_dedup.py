@@ -0,0 +1,21 @@
+"""Tests for near-duplicate idea detection"""
+
+from core.dedup import IdeaIndex
+from core.store import ResultStore
+from tests.helpers import make_result
+
+
+def test_load_from_store_reuses_the_latest_run_of_an_idea(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    idea = "AI-powered fitness app for busy parents"
+    store = ResultStore(path)
+    store.add(make_result(idea, "Older analysis"), created_at=1000)
+    store.add(make_result(idea, "Newer analysis"), created_at=2000)
+    assert store.latest(idea)["research_results"]["Growth"]["analysis"] == "Newer analysis"
+    store.close()
+
+    index = IdeaIndex(mode="reuse")
+    assert index.load([path]) == 2
+    match = index.find(idea)
+    assert match is not None
+    assert match["result"]["research_results"]["Growth"]["analysis"] == "Newer analysis"
@@ -0,0 +1,95 @@
+"""Tests for the dependency-graph executor"""
+
+import time
+from agents.cache import ResponseCache
+from core import executor as executor_module
+from core.executor import DagExecutor
+from core.registry import AgentRegistry, AgentSpec, default_registry
+
+
+class StubRunner:
+    """Step runner that succeeds, fails or hangs per step, recording each step's inputs"""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.inputs = {}
+
+    def __call__(self, spec, agent, product_idea, inputs, on_chunk=None):
+        self.inputs[spec.name] = dict(inputs)
+        outcome = self.outcomes.get(spec.name, "ok")
+        if outcome == "error":
+            raise RuntimeError(f"{spec.name} failed")
+        if outcome == "hang":
+            time.sleep(5)
+        return agent.build_result(product_idea, f"{spec.name} analysis", {})
+
+
+def make_executor(specs, outcomes):
+    registry = AgentRegistry(specs)
+    cache = ResponseCache(path=":memory:")
+    agents = {spec.name: spec.create_agent(cache=cache, stream=False) for spec in registry}
+    runner = StubRunner(outcomes)
+    return DagExecutor(registry, agents, step_runner=runner), runner
+
+
+def statuses(results):
+    return {name: result["status"] for name, result in results.items()}
+
+
+def test_step_is_skipped_when_a_required_input_fails():
+    specs = [AgentSpec("Incumbents", prompt="a"), AgentSpec("Funding", prompt="b"),
+             AgentSpec("Positioning", prompt="c", inputs=["Incumbents", "Funding"]),
+             AgentSpec("Pitch", prompt="d", inputs=["Positioning"])]
+    executor, runner = make_executor(specs, {"Funding": "error"})
+
+    results = executor.run("Smart water bottle")
+    assert statuses(results) == {"Incumbents": "ok", "Funding": "error",
+                                 "Positioning": "skipped", "Pitch": "skipped"}
+    assert results["Positioning"]["analysis"] == "Skipped: input failed (Funding)"
+    assert "Positioning" not in runner.inputs and "Pitch" not in runner.inputs
+
+
+def test_step_runs_while_any_optional_input_succeeded():
+    specs = [AgentSpec("Incumbents", prompt="a"), AgentSpec("Growth", prompt="b"),
+             AgentSpec("Decision", prompt="c", optional_inputs=["Incumbents", "Growth"])]
+    executor, runner = make_executor(specs, {"Incumbents": "error"})
+
+    results = executor.run("Smart water bottle")
+    assert results["Decision"]["status"] == "ok"
+    assert runner.inputs["Decision"] == {"Growth": "Growth analysis"}
+
+
+def test_step_is_skipped_when_every_optional_input_fails():
+    specs = [AgentSpec("Incumbents", prompt="a"), AgentSpec("Growth", prompt="b"),
+             AgentSpec("Decision", prompt="c", optional_inputs=["Incumbents", "Growth"])]
+    executor, runner = make_executor(specs, {"Incumbents": "error", "Growth": "error"})
+
+    results = executor.run("Smart water bottle")
+    assert results["Decision"]["status"] == "skipped"
+    assert "Decision" not in runner.inputs
+
+
+def test_decision_is_skipped_only_when_all_research_fails():
+    all_failed = {"Incumbents": "error", "Funding": "error", "Growth": "error"}
+    executor, _ = make_executor(list(default_registry()), all_failed)
+    assert executor.run("Smart water bottle")["Decision"]["status"] == "skipped"
+
+    executor, runner = make_executor(list(default_registry()), dict(all_failed, Growth="ok"))
+    assert executor.run("Smart water bottle")["Decision"]["status"] == "ok"
+    assert list(runner.inputs["Decision"]) == ["Growth"]
+
+
+def test_step_that_overruns_its_timeout_fails_after_the_grace_period(monkeypatch):
+    monkeypatch.setattr(executor_module, "TIMEOUT_GRACE", 0.1)
+    specs = [AgentSpec("Incumbents", prompt="a", timeout=0.2), AgentSpec("Growth", prompt="b"),
+             AgentSpec("Positioning", prompt="c", inputs=["Incumbents"])]
+    executor, _ = make_executor(specs, {"Incumbents": "hang"})
+
+    start_time = time.monotonic()
+    results = executor.run("Smart water bottle")
+    elapsed = time.monotonic() - start_time
+    assert 0.3 <= elapsed < 2
+    assert results["Incumbents"]["status"] == "error"
+    assert results["Incumbents"]["metrics"]["error"] == "TimeoutError"
+    assert results["Growth"]["status"] == "ok"
+    assert results["Positioning"]["status"] == "skipped"
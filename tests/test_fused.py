@@ -0,0 +1,51 @@
+"""Tests for the fused single-completion agent"""
+
+import json
+import pytest
+from agents.cache import ResponseCache
+from agents.circuit_breaker import CircuitBreaker
+from agents.fused_agent import FusedAgent, FusedOutputError
+from tests.helpers import StubClient
+
+
+def make_agent(tmp_path, client):
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite3"), mode="use")
+    return FusedAgent({"Incumbents": "List the incumbents.", "Growth": "Estimate growth."},
+                      cache=cache, client=client, stream=False,
+                      circuit_breaker=CircuitBreaker(enabled=False))
+
+
+def test_malformed_reply_is_not_cached(tmp_path):
+    good = json.dumps({"Incumbents": "Strava, Peloton", "Growth": "12% a year"})
+    client = StubClient(["Sorry, here is some prose", good])
+    agent = make_agent(tmp_path, client)
+
+    metrics = {}
+    with pytest.raises(FusedOutputError):
+        agent.research_sections("Smart water bottle", metrics)
+    assert metrics["cache"] == "miss"
+
+    metrics = {}
+    sections = agent.research_sections("Smart water bottle", metrics)
+    assert sections["Growth"] == "12% a year"
+    assert metrics["cache"] == "miss"
+    assert len(client.calls) == 2
+
+    metrics = {}
+    assert agent.research_sections("Smart water bottle", metrics) == sections
+    assert metrics["cache"] == "hit"
+    assert len(client.calls) == 2
+
+
+def test_malformed_cached_reply_is_not_served(tmp_path):
+    good = json.dumps({"Incumbents": "Strava, Peloton", "Growth": "12% a year"})
+    client = StubClient([good])
+    agent = make_agent(tmp_path, client)
+    key = agent.cache.make_key(agent.model, agent.system_prompt,
+                               "Research this product idea: Smart water bottle", 0.5, agent.max_tokens)
+    agent.cache.put(key, "not json")
+
+    metrics = {}
+    assert agent.research_sections("Smart water bottle", metrics)["Incumbents"] == "Strava, Peloton"
+    assert metrics["cache"] == "miss"
+    assert len(client.calls) == 1
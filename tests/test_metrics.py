@@ -0,0 +1,29 @@
+"""Tests for per-run usage summaries"""
+
+from core.metrics import summarize_usage
+
+
+def step(status, **metrics):
+    return {"status": status, "metrics": metrics}
+
+
+def test_steps_without_a_call_cost_nothing():
+    results = {
+        "Incumbents": step("ok", model="gpt-4o", prompt_tokens=100, completion_tokens=200, cost_usd=0.0025),
+        "Funding": step("error", model="gpt-4o", error="Timeout"),
+        "Growth": step("circuit_open", model="gpt-4o"),
+        "Decision": step("skipped")
+    }
+    total = summarize_usage(results)["total"]
+    assert total["cost_usd"] == 0.0025
+    assert total["skipped"] == 1
+    assert total["circuit_open"] == 1
+
+
+def test_unknown_pricing_makes_the_cost_unknown():
+    results = {
+        "Incumbents": step("ok", model="gpt-4o", prompt_tokens=100, completion_tokens=200, cost_usd=0.0025),
+        "Growth": step("ok", model="local-llama", prompt_tokens=100, completion_tokens=200, cost_usd=None),
+        "Decision": step("skipped")
+    }
+    assert summarize_usage(results)["total"]["cost_usd"] is None
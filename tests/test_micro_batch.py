@@ -0,0 +1,38 @@
+"""Tests for cross-idea micro-batching"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from agents.base_agent import BaseAgent
+from agents.cache import ResponseCache
+from agents.circuit_breaker import CircuitBreaker
+from core.micro_batch import MicroBatcher
+from core.registry import AgentSpec
+from tests.helpers import StubClient
+
+IDEAS = ["Smart water bottle", "AI-powered fitness app for busy parents"]
+
+
+def run_batch(batcher, spec, agent):
+    with ThreadPoolExecutor(max_workers=len(IDEAS)) as executor:
+        futures = [executor.submit(batcher, spec, agent, idea, {}) for idea in IDEAS]
+        return [future.result() for future in futures]
+
+
+def test_malformed_batch_reply_is_not_cached(tmp_path):
+    good = json.dumps({"1": "Bottle analysis", "2": "Fitness analysis"})
+    client = StubClient(["Sorry, here is some prose", "Solo analysis", "Solo analysis", good])
+    spec = AgentSpec("Growth", prompt="Estimate growth.")
+    agent = spec.create_agent(cache=ResponseCache(path=str(tmp_path / "responses.sqlite3"), mode="use"),
+                              client=client, stream=False, circuit_breaker=CircuitBreaker(enabled=False))
+    batcher = MicroBatcher(window=5.0, max_size=len(IDEAS))
+
+    results = run_batch(batcher, spec, agent)
+    assert [result["analysis"] for result in results] == ["Solo analysis"] * 2
+    assert all("retried" in result["metrics"]["micro_batch"] for result in results)
+    assert len(client.calls) == 3  # the batch, then each idea on its own
+
+    results = run_batch(batcher, spec, agent)
+    assert [result["analysis"] for result in results] == ["Bottle analysis", "Fitness analysis"]
+    assert results[0]["metrics"]["cache"] == "miss"
+    assert len(client.calls) == 4
+    assert batcher.stats()["retried"] == 2
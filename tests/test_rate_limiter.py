@@ -0,0 +1,96 @@
+"""Tests for the token-bucket rate limiter"""
+
+import threading
+import time
+import pytest
+from agents.rate_limiter import RateLimiter, DECISION_PRIORITY, RESEARCH_PRIORITY
+from agents.retry import DeadlineExceeded
+from tests.helpers import FakeClock
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_token_bucket_refills_at_the_quota_rate():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=None, tokens_per_minute=600, clock=clock)
+    limiter.acquire(600, timeout=0)
+    with pytest.raises(DeadlineExceeded):
+        limiter.acquire(100, timeout=0)
+
+    clock.advance(5)  # 10 tokens a second
+    with pytest.raises(DeadlineExceeded):
+        limiter.acquire(100, timeout=0)
+    clock.advance(5)
+    limiter.acquire(100, timeout=0)
+
+
+def test_bucket_never_holds_more_than_one_minute_of_quota():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=None, clock=clock)
+    clock.advance(3600)
+    limiter.acquire(1, timeout=0)
+    limiter.acquire(1, timeout=0)
+    with pytest.raises(DeadlineExceeded):
+        limiter.acquire(1, timeout=0)
+
+
+def test_settle_returns_unused_tokens():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=None, tokens_per_minute=600, clock=clock)
+    limiter.acquire(600, timeout=0)
+    limiter.settle(600, 200)
+    limiter.acquire(400, timeout=0)
+
+
+def test_decision_calls_go_ahead_of_queued_research_calls():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=None, clock=clock)
+    limiter.acquire(1, timeout=0)
+
+    served = []
+
+    def call(name, priority):
+        limiter.acquire(1, priority)
+        served.append(name)
+
+    threads = [threading.Thread(target=call, args=("research", RESEARCH_PRIORITY))]
+    threads[0].start()
+    wait_for(lambda: len(limiter._waiters) == 1)
+    threads.append(threading.Thread(target=call, args=("decision", DECISION_PRIORITY)))
+    threads[1].start()
+    wait_for(lambda: len(limiter._waiters) == 2)
+
+    for count in (1, 2):
+        clock.advance(60)  # budget for one more request
+        limiter.pause(0)  # wakes the waiters to check the clock again
+        wait_for(lambda: len(served) == count)
+    for thread in threads:
+        thread.join(timeout=5)
+    assert served == ["decision", "research"]
+
+
+def test_pause_after_429_holds_back_every_caller():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=None, clock=clock)
+    limiter.pause(5)
+    with pytest.raises(DeadlineExceeded):
+        limiter.acquire(1, timeout=0)
+    clock.advance(4)
+    with pytest.raises(DeadlineExceeded):
+        limiter.acquire(1, timeout=0)
+    clock.advance(1)
+    limiter.acquire(1, timeout=0)
+
+
+def test_timed_out_caller_leaves_the_queue():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=None, clock=clock)
+    limiter.acquire(1, timeout=0)
+    with pytest.raises(DeadlineExceeded):
+        limiter.acquire(1, timeout=0)
+    assert limiter._waiters == []
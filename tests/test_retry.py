@@ -0,0 +1,133 @@
+"""Tests for deadline-aware retries and hedged requests"""
+
+import time
+import threading
+from types import SimpleNamespace
+import httpx
+import openai
+import pytest
+from agents.retry import DeadlineExceeded, LatencyTracker, RetryPolicy
+
+
+def connection_error(retry_after=None):
+    error = openai.APIConnectionError(request=httpx.Request("POST", "http://localhost/v1/chat/completions"))
+    if retry_after is not None:
+        error.response = SimpleNamespace(headers={"retry-after": str(retry_after)})
+    return error
+
+
+def policy(**options):
+    options.setdefault("hedge", False)
+    options.setdefault("backoff_base", 0.001)
+    return RetryPolicy(**options)
+
+
+def test_transient_errors_are_retried():
+    outcomes = [connection_error(), connection_error(), "done"]
+
+    def fn(timeout):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    metrics = {}
+    assert policy(max_retries=3).call(fn, LatencyTracker(), metrics) == "done"
+    assert metrics["attempts"] == 3
+    assert metrics["retries"] == 2
+    assert len(metrics["latencies"]) == 3
+
+
+def test_permanent_errors_are_not_retried():
+    def fn(timeout):
+        raise ValueError("bad request")
+
+    metrics = {}
+    with pytest.raises(ValueError):
+        policy(max_retries=3).call(fn, LatencyTracker(), metrics)
+    assert metrics["attempts"] == 1
+
+
+def test_attempts_share_one_deadline():
+    timeouts = []
+
+    def fn(timeout):
+        timeouts.append(timeout)
+        time.sleep(0.02)
+        raise connection_error()
+
+    start_time = time.monotonic()
+    with pytest.raises((openai.APIConnectionError, DeadlineExceeded)):
+        policy(timeout=0.3, max_retries=100, backoff_base=0.01, backoff_max=0.02).call(
+            fn, LatencyTracker(), {})
+    assert time.monotonic() - start_time < 0.6
+    assert len(timeouts) > 1
+    assert timeouts[0] <= 0.3
+    assert timeouts == sorted(timeouts, reverse=True)  # each attempt gets only what is left
+
+
+def test_backoff_past_the_deadline_gives_up_without_sleeping():
+    def fn(timeout):
+        raise connection_error(retry_after=10)
+
+    metrics = {}
+    start_time = time.monotonic()
+    with pytest.raises(openai.APIConnectionError):
+        policy(timeout=1.0, max_retries=3).call(fn, LatencyTracker(), metrics)
+    assert time.monotonic() - start_time < 0.5
+    assert metrics["attempts"] == 1
+
+
+def test_backoff_is_full_jitter_capped_and_respects_retry_after():
+    retry = RetryPolicy(backoff_base=0.5, backoff_max=4.0)
+    for attempt in range(1, 8):
+        ceiling = min(4.0, 0.5 * 2 ** (attempt - 1))
+        delays = [retry._backoff_delay(attempt, connection_error()) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        assert max(delays) > ceiling / 2  # jitter spreads over the whole range
+    assert retry._backoff_delay(1, connection_error(retry_after=7)) == 7.0
+
+
+def test_hedge_takes_the_first_reply_and_discards_the_slow_one():
+    latencies = LatencyTracker()
+    for _ in range(10):
+        latencies.record(0.02)
+    calls = []
+    lock = threading.Lock()
+    slow_finished = threading.Event()
+
+    def fn(timeout):
+        with lock:
+            calls.append(timeout)
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.5)
+            slow_finished.set()
+            return "slow"
+        return "fast"
+
+    metrics = {}
+    retry = policy(hedge=True, hedge_min_delay=0.01, hedge_min_samples=5)
+    start_time = time.monotonic()
+    assert retry.call(fn, latencies, metrics) == "fast"
+    assert time.monotonic() - start_time < 0.4
+    assert metrics["hedged"] is True
+    assert metrics["attempts"] == 1
+    assert len(calls) == 2
+    assert slow_finished.wait(2)
+    assert len(calls) == 2  # the late reply was dropped, not retried or returned
+
+
+def test_no_hedge_without_latency_history():
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        time.sleep(0.05)
+        return "done"
+
+    metrics = {}
+    retry = policy(hedge=True, hedge_min_delay=0.01, hedge_min_samples=5)
+    assert retry.call(fn, LatencyTracker(), metrics) == "done"
+    assert metrics["hedged"] is False
+    assert len(calls) == 1
@@ -0,0 +1,151 @@
+"""Tests for the research service's job queue and HTTP API"""
+
+import json
+import threading
+import http.client
+import pytest
+from agents.circuit_breaker import CircuitBreaker, CircuitOpen
+from core.service import QueueFull, ResearchService, serve
+from tests.helpers import FakeClock
+
+
+class StubSystem:
+    """Stands in for MarketResearchSystem; runs block until release is set"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.ideas = []
+
+    def research_product_idea(self, product_idea, on_event=None):
+        self.ideas.append(product_idea)
+        self.release.wait(10)
+        return {"product_idea": product_idea, "research_results": {"Growth": {"status": "ok"}}}
+
+
+@pytest.fixture
+def stub():
+    system = StubSystem()
+    yield system
+    system.release.set()
+
+
+def make_service(system, **options):
+    options.setdefault("circuit_breaker", CircuitBreaker(clock=FakeClock()))
+    return ResearchService(system, **options)
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(service):
+        httpd = serve(service, "127.0.0.1", 0)
+        threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(httpd)
+        return httpd.server_address[1]
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def request(port, method, path, body=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    payload = body if isinstance(body, (bytes, type(None))) else json.dumps(body).encode()
+    connection.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    data = json.loads(response.read() or b"null")
+    connection.close()
+    return response.status, dict(response.getheaders()), data
+
+
+def test_same_idea_in_flight_shares_one_job(stub):
+    service = make_service(stub, workers=1)
+    job, coalesced = service.submit("Smart water bottle")
+    again, coalesced_again = service.submit("  smart WATER   bottle ")
+    assert again is job
+    assert (coalesced, coalesced_again) == (False, True)
+
+    stub.release.set()
+    service.wait(job, 5)
+    assert job.status == "done"
+    assert job.requests == 2
+    assert stub.ideas == ["Smart water bottle"]
+
+    # Once finished, the same idea is researched again
+    later, coalesced = service.submit("Smart water bottle")
+    assert later is not job and not coalesced
+
+
+def test_full_queue_is_rejected_with_429(stub, server):
+    service = make_service(stub, workers=1, queue_size=1)
+    running, _ = service.submit("Smart water bottle")
+    service.wait(running, 5, after_version=0)  # picked up by the only worker
+    service.submit("AI-powered fitness app")
+    with pytest.raises(QueueFull):
+        service.submit("Meal kit for students")
+
+    status, headers, body = request(server(service), "POST", "/research", {"idea": "Plant watering robot"})
+    assert status == 429
+    assert headers["Retry-After"] == "5"
+    assert "full" in body["error"]
+    assert service.health()["rejected"] == 2
+
+
+def test_open_circuit_is_rejected_with_503(stub, server):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30, clock=clock)
+    breaker.before_call()
+    breaker.after_call(ConnectionError("API down"))
+    service = make_service(stub, circuit_breaker=breaker)
+    with pytest.raises(CircuitOpen):
+        service.submit("Smart water bottle")
+
+    port = server(service)
+    status, headers, _ = request(port, "POST", "/research", {"idea": "Smart water bottle"})
+    assert status == 503
+    assert headers["Retry-After"] == "30"
+    status, _, health = request(port, "GET", "/health")
+    assert status == 200
+    assert health["status"] == "degraded"
+    assert health["circuit"]["state"] == "open"
+    assert health["circuit_rejected"] == 2
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/research", b"not json"),
+    ("/research", {"name": "Smart water bottle"}),
+    ("/research", {"idea": "   "}),
+    ("/research", ["Smart water bottle"]),
+    ("/research?wait=soon", {"idea": "Smart water bottle"}),
+])
+def test_bad_requests_are_rejected_with_400(stub, server, path, body):
+    service = make_service(stub)
+    status, _, response = request(server(service), "POST", path, body)
+    assert status == 400
+    assert "error" in response
+    assert stub.ideas == []
+
+
+def test_wait_answers_with_the_result_once_done(stub, server):
+    service = make_service(stub)
+    port = server(service)
+    stub.release.set()
+    status, headers, job = request(port, "POST", "/research?wait=5", {"idea": "Smart water bottle"})
+    assert status == 200
+    assert job["status"] == "done"
+    assert job["result"]["product_idea"] == "Smart water bottle"
+
+    status, _, polled = request(port, "GET", headers["Location"])
+    assert status == 200
+    assert polled["job_id"] == job["job_id"]
+
+
+def test_without_wait_a_job_is_accepted_with_202(stub, server):
+    service = make_service(stub)
+    status, headers, job = request(server(service), "POST", "/research", {"idea": "Smart water bottle"})
+    assert status == 202
+    assert job["status"] in ("queued", "running")
+    assert "result" not in job
+    assert headers["Location"] == f"/jobs/{job['job_id']}"
@@ -0,0 +1,54 @@
+"""Tests for the checkpointed, multi-process batch runner"""
+
+import io
+import json
+from benchmarks.mock_openai import MockOpenAIServer
+from core.batch import is_failed
+from core.sharded import CheckpointLog, ShardedBatchRunner
+from core.store import idea_key
+
+
+def make_result(idea, status="ok"):
+    steps = {name: {"agent": name, "status": status} for name in ("Incumbents", "Funding", "Growth")}
+    steps["Decision"] = {"agent": "Decision", "status": "ok" if status == "ok" else "skipped"}
+    return {"product_idea": idea, "research_results": steps}
+
+
+def test_result_with_failed_steps_is_failed():
+    assert not is_failed(make_result("a"))
+    assert is_failed(make_result("a", status="error"))
+    assert is_failed({"product_idea": "a", "error": "boom"})
+
+    only_decision_skipped = make_result("a")
+    only_decision_skipped["research_results"]["Decision"]["status"] = "skipped"
+    assert is_failed(only_decision_skipped)
+
+
+def test_resume_retries_ideas_whose_steps_all_failed(tmp_path, monkeypatch):
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    done, dead = "Smart plant watering app", "Drone delivery for groceries"
+    with open(checkpoint, "w") as f:
+        f.write(json.dumps(make_result(done)) + "\n")
+        f.write(json.dumps(make_result(dead, status="error")) + "\n")
+
+    log = CheckpointLog(str(checkpoint))
+    assert log.is_done(idea_key(done))
+    assert not log.is_done(idea_key(dead))
+    log.close()
+
+    # Workers open their response cache under the working directory
+    monkeypatch.chdir(tmp_path)
+    with MockOpenAIServer(latency=0.01, jitter=0) as server:
+        # Spawned workers read these when they build their shared client
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        monkeypatch.setenv("OPENAI_API_KEY", "mock")
+        runner = ShardedBatchRunner(1, str(checkpoint), system_options={"cache_mode": "bypass"})
+        output = io.StringIO()
+        stats = runner.run([done, dead], output)
+
+    assert stats["resumed"] == 1
+    assert stats["researched"] == 1
+    assert stats["failed"] == 0
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [result["product_idea"] for result in results] == [done, dead]
+    assert all(step["status"] == "ok" for step in results[1]["research_results"].values())
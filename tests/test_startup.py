@@ -0,0 +1,12 @@
+"""Start-up time budgets of the CLI and worker entry points"""
+
+import pytest
+from benchmarks.bench_startup import SCENARIOS, check
+
+
+@pytest.mark.parametrize("name, code, budget, forbidden", SCENARIOS,
+                         ids=[scenario[0] for scenario in SCENARIOS])
+def test_entry_point_stays_within_its_startup_budget(tmp_path, name, code, budget, forbidden):
+    # Run in a scratch directory so the response cache file stays out of the project
+    ms, problems = check(code, budget, forbidden, runs=3, workdir=str(tmp_path))
+    assert not problems, f"{name} took {ms:.1f} ms (budget {budget:.0f} ms): {'; '.join(problems)}"
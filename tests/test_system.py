@@ -0,0 +1,21 @@
+"""Tests for the research system's runs"""
+
+from agents import client as client_module
+from agents.cache import ResponseCache
+from core.dedup import IdeaIndex
+from core.system import MarketResearchSystem
+from tests.helpers import make_result
+
+
+def test_reused_run_does_not_build_the_shared_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(client_module, "_shared_client", None)
+    idea = "AI-powered fitness app for busy parents"
+    index = IdeaIndex(mode="reuse")
+    index.add(idea, make_result(idea, "Earlier analysis"))
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite3"))
+    system = MarketResearchSystem(verbose=False, cache=cache, idea_index=index)
+
+    result = system.research_product_idea(idea)
+    assert "reused_from" in result
+    assert system.connection_snapshot() == {"requests": 0, "connections": 0, "tls_handshakes": 0}
+    assert client_module.peek_shared_client() is None